@@ -1,21 +1,49 @@
 # YouTubeTranscriptAPI Imports
-from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, VideoUnavailable, TooManyRequests, \
-    TranscriptsDisabled, NoTranscriptAvailable
+from youtube_transcript_api import NoTranscriptFound, VideoUnavailable, TooManyRequests, TranscriptsDisabled, \
+    NoTranscriptAvailable
 from youtube_transcript_api.formatters import TextFormatter
 
 # Flask Imports
-from flask import Flask, jsonify, request, send_from_directory, render_template, redirect
-
-# NLTK Imports
-import nltk
+from flask import Flask, Response, g, jsonify, request, send_from_directory, render_template, redirect, url_for, \
+    stream_with_context
 
 # Other Imports
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hmac
+import json
 import os
 import sys
+import time
 
 # Summarizer Import (Our Another File: summarizer.py)
-from summarizer import gensim_summarize, spacy_summarize, nltk_summarize, sumy_lsa_summarize, sumy_luhn_summarize, \
-    sumy_text_rank_summarize
+from summarizer import RANKERS, SUMMARIZERS, SummarizerRegistry, prepare_document
+
+# Summary Length Budget Import (Our Another File: selection.py)
+from selection import BUDGET_ARGUMENTS, SummaryBudget, SentenceRanking
+
+# Preprocessed Document Import (Our Another File: document.py)
+from document import TranscriptDocument
+
+# Transcript Index Import (Our Another File: transcript_index.py)
+from transcript_index import TranscriptIndex
+
+# Transcript and Result Cache Import (Our Another File: cache.py)
+from cache import TranscriptCache, ResultCache
+
+# Summarizer Process Pool Import (Our Another File: workers.py)
+from workers import SummarizerPool, SummarizerTimeout
+
+# Resource Guard Import (Our Another File: guard.py)
+from guard import ResourceGuard, ResourceBudgetExceeded
+
+# Background Jobs Import (Our Another File: jobs.py)
+from jobs import JobManager, JobQueueFull
+
+# Transcript Fetcher Import (Our Another File: fetcher.py)
+from fetcher import TranscriptFetcher, FetcherBusy
+
+# Metrics Import (Our Another File: metrics.py)
+from metrics import Metrics, server_timing_header
 
 # Waitress Import for Serving at Heroku
 from waitress import serve
@@ -25,166 +53,758 @@ def create_app():
     # Creating Flask Object and returning it.
     app = Flask(__name__)
 
-    # "Punkt" download before nltk tokenization
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        print('Downloading punkt')
-        nltk.download('punkt', quiet=True)
-
-    # "Wordnet" download before nltk tokenization
-    try:
-        nltk.data.find('corpora/wordnet')
-    except LookupError:
-        print('Downloading wordnet')
-        nltk.download('wordnet')
-
-    # "Stopwords" download before nltk tokenization
-    try:
-        nltk.data.find('corpora/stopwords')
-    except LookupError:
-        print('Downloading Stopwords')
-        nltk.download("stopwords", quiet=True)
+    # NLTK data (punkt, wordnet, stopwords: nltk.txt) is downloaded at build time, by the Heroku buildpack or by
+    # running nltk_setup.py. NLTK_DATA_CHECK=1 checks for it (and downloads what is missing) at startup instead.
+    app.config['NLTK_DATA_CHECK'] = os.environ.get('NLTK_DATA_CHECK', '0').lower() in ('1', 'true', 'yes')
+    if app.config['NLTK_DATA_CHECK']:
+        from nltk_setup import ensure_nltk_data
+        ensure_nltk_data()
+
+    # Summarizer Registry: heavy summarizer objects (spaCy model, stop words, sumy summarizers) are built once per
+    # worker process and shared by all request threads. Set SUMMARIZER_PRELOAD=1 to build them at startup instead of
+    # on the first request that needs them.
+    app.config['SUMMARIZER_PRELOAD'] = os.environ.get('SUMMARIZER_PRELOAD', '0').lower() in ('1', 'true', 'yes')
+    # Above LONG_DOCUMENT_SENTENCES sentences, TextRank and LSA switch to their sparse long document mode.
+    app.config['LONG_DOCUMENT_SENTENCES'] = int(os.environ.get('LONG_DOCUMENT_SENTENCES', 1000))
+    registry_options = {'spacy_model': os.environ.get('SPACY_MODEL', 'en_core_web_sm'),
+                        'long_document_sentences': app.config['LONG_DOCUMENT_SENTENCES']}
+    registry = SummarizerRegistry(**registry_options)
+    app.extensions['summarizer_registry'] = registry
+    if app.config['SUMMARIZER_PRELOAD']:
+        print('Summarizer registry warmed up in {:.2f}s'.format(registry.warm_up()))
+    else:
+        print('Summarizer registry created, objects will be loaded on first use')
+    sys.stdout.flush()
+
+    # Transcript Cache: transcripts are kept (by video id and language) so that changing only percent or choice does
+    # not fetch the same transcript again. TRANSCRIPT_CACHE_PATH enables an SQLite file shared by all worker processes.
+    app.config['TRANSCRIPT_CACHE_SIZE'] = int(os.environ.get('TRANSCRIPT_CACHE_SIZE', 256))
+    app.config['TRANSCRIPT_CACHE_TTL'] = int(os.environ.get('TRANSCRIPT_CACHE_TTL', 6 * 60 * 60))
+    app.config['TRANSCRIPT_CACHE_NEGATIVE_TTL'] = int(os.environ.get('TRANSCRIPT_CACHE_NEGATIVE_TTL', 15 * 60))
+    app.config['TRANSCRIPT_CACHE_PATH'] = os.environ.get('TRANSCRIPT_CACHE_PATH')
+    # Sentence rankings of every algorithm are kept apart, RANKING_CACHE_SIZE of them (room for all six per video).
+    app.config['RANKING_CACHE_SIZE'] = int(os.environ.get('RANKING_CACHE_SIZE',
+                                                          6 * app.config['TRANSCRIPT_CACHE_SIZE']))
+    transcript_cache = TranscriptCache(max_entries=app.config['TRANSCRIPT_CACHE_SIZE'],
+                                       ttl=app.config['TRANSCRIPT_CACHE_TTL'],
+                                       negative_ttl=app.config['TRANSCRIPT_CACHE_NEGATIVE_TTL'],
+                                       path=app.config['TRANSCRIPT_CACHE_PATH'],
+                                       max_ranking_entries=app.config['RANKING_CACHE_SIZE'])
+    app.extensions['transcript_cache'] = transcript_cache
+
+    # Result Cache: successful summaries are kept by video id, budget and choice. Responses of /summarize/ carry an
+    # ETag and "Cache-Control: public, max-age=RESULT_CACHE_MAX_AGE" so browsers and CDNs can answer repeats too.
+    # POST /cache/purge/ needs the CACHE_PURGE_TOKEN (in an X-Purge-Token header) and is disabled without it.
+    app.config['RESULT_CACHE_SIZE'] = int(os.environ.get('RESULT_CACHE_SIZE', 1024))
+    app.config['RESULT_CACHE_TTL'] = int(os.environ.get('RESULT_CACHE_TTL', 6 * 60 * 60))
+    app.config['RESULT_CACHE_PATH'] = os.environ.get('RESULT_CACHE_PATH')
+    app.config['RESULT_CACHE_MAX_AGE'] = int(os.environ.get('RESULT_CACHE_MAX_AGE', 60 * 60))
+    app.config['CACHE_PURGE_TOKEN'] = os.environ.get('CACHE_PURGE_TOKEN')
+    result_cache = ResultCache(max_entries=app.config['RESULT_CACHE_SIZE'], ttl=app.config['RESULT_CACHE_TTL'],
+                               path=app.config['RESULT_CACHE_PATH'])
+    app.extensions['result_cache'] = result_cache
+
+    # Summarizer Process Pool: runs several algorithms on one transcript in parallel (choice=all or a list of choices).
+    # Worker processes are started on the first such request, each algorithm is given SUMMARIZER_TIMEOUT seconds.
+    app.config['SUMMARIZER_POOL_WORKERS'] = int(os.environ.get('SUMMARIZER_POOL_WORKERS', 0)) or None
+    app.config['SUMMARIZER_TIMEOUT'] = float(os.environ.get('SUMMARIZER_TIMEOUT', 60))
+    summarizer_pool = SummarizerPool(max_workers=app.config['SUMMARIZER_POOL_WORKERS'],
+                                     registry_options=registry_options,
+                                     preload=app.config['SUMMARIZER_PRELOAD'])
+    app.extensions['summarizer_pool'] = summarizer_pool
+
+    # Resource Guard: the memory and time of every algorithm are estimated from the transcript length before it runs.
+    # One which would need over GUARD_MEMORY_MB (MB) or GUARD_TIME_SECONDS is replaced by a cheaper algorithm, or the
+    # request fails with HTTP 413 when none fits. With GUARD_ISOLATION=auto the costly ones run in a forked subprocess,
+    # stopped as soon as it goes over the budgets ("always" isolates every algorithm, "never" none). The guard starts
+    # the helper process forking them, so it is created before any thread.
+    app.config['GUARD_MEMORY_MB'] = int(os.environ.get('GUARD_MEMORY_MB', 512))
+    app.config['GUARD_TIME_SECONDS'] = float(os.environ.get('GUARD_TIME_SECONDS', app.config['SUMMARIZER_TIMEOUT']))
+    app.config['GUARD_ISOLATION'] = os.environ.get('GUARD_ISOLATION', 'auto').lower()
+    resource_guard = ResourceGuard(registry, memory_mb=app.config['GUARD_MEMORY_MB'],
+                                   seconds=app.config['GUARD_TIME_SECONDS'],
+                                   isolation=app.config['GUARD_ISOLATION'])
+    app.extensions['resource_guard'] = resource_guard
+
+    # Background Jobs: POST /summarize/ runs the summarization in JOB_WORKERS background threads. At most
+    # JOB_QUEUE_SIZE jobs wait or run at once, further requests get HTTP 429 with a Retry-After of JOB_RETRY_AFTER
+    # seconds. Finished jobs can be read for JOB_RETENTION seconds.
+    app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))
+    app.config['JOB_QUEUE_SIZE'] = int(os.environ.get('JOB_QUEUE_SIZE', 16))
+    app.config['JOB_RETENTION'] = int(os.environ.get('JOB_RETENTION', 10 * 60))
+    app.config['JOB_RETRY_AFTER'] = int(os.environ.get('JOB_RETRY_AFTER', 30))
+    job_manager = JobManager(max_workers=app.config['JOB_WORKERS'], max_pending=app.config['JOB_QUEUE_SIZE'],
+                             retention=app.config['JOB_RETENTION'])
+    app.extensions['job_manager'] = job_manager
+
+    # Transcript Fetcher: every transcript missing from the cache is fetched over one pooled HTTP session, at most
+    # FETCH_RATE requests per second (FETCH_BURST at once) and FETCH_CONCURRENCY videos at the same time. Failed or
+    # rate limited fetches are retried FETCH_RETRIES times with a jittered backoff starting at FETCH_BACKOFF seconds,
+    # and concurrent requests for the same video share one fetch. A fetch waiting more than FETCH_QUEUE_TIMEOUT seconds
+    # for its turn fails with HTTP 503. YOUTUBE_WATCH_URL replaces YouTube's watch page URL (a local stub server).
+    app.config['FETCH_RATE'] = float(os.environ.get('FETCH_RATE', 5))
+    app.config['FETCH_BURST'] = int(os.environ.get('FETCH_BURST', 10))
+    app.config['FETCH_CONCURRENCY'] = int(os.environ.get('FETCH_CONCURRENCY', 8))
+    app.config['FETCH_RETRIES'] = int(os.environ.get('FETCH_RETRIES', 3))
+    app.config['FETCH_BACKOFF'] = float(os.environ.get('FETCH_BACKOFF', 0.5))
+    app.config['FETCH_QUEUE_TIMEOUT'] = float(os.environ.get('FETCH_QUEUE_TIMEOUT', 30))
+    app.config['YOUTUBE_WATCH_URL'] = os.environ.get('YOUTUBE_WATCH_URL')
+    transcript_fetcher = TranscriptFetcher(pool_size=app.config['FETCH_CONCURRENCY'],
+                                           rate=app.config['FETCH_RATE'],
+                                           burst=app.config['FETCH_BURST'],
+                                           retries=app.config['FETCH_RETRIES'],
+                                           backoff=app.config['FETCH_BACKOFF'],
+                                           queue_timeout=app.config['FETCH_QUEUE_TIMEOUT'],
+                                           watch_url=app.config['YOUTUBE_WATCH_URL'])
+    app.extensions['transcript_fetcher'] = transcript_fetcher
+
+    # Batch Requests: POST /summarize/batch/ summarizes up to BATCH_MAX_VIDEOS videos. Their transcripts are fetched
+    # by BATCH_CONCURRENCY threads (shared by all batch requests), then summarized in the summarizer process pool.
+    app.config['BATCH_MAX_VIDEOS'] = int(os.environ.get('BATCH_MAX_VIDEOS', 50))
+    app.config['BATCH_CONCURRENCY'] = int(os.environ.get('BATCH_CONCURRENCY', 4))
+    batch_executor = ThreadPoolExecutor(max_workers=app.config['BATCH_CONCURRENCY'],
+                                        thread_name_prefix='summarize-batch')
+
+    # Metrics: time spent in each stage (fetch, format, tokenize, summarize) and errors by exception type, served at
+    # /metrics in the Prometheus text format. SERVER_TIMING=1 also sends the stages of /summarize/ requests in a
+    # Server-Timing header, shown by the network panel of browsers.
+    app.config['SERVER_TIMING'] = os.environ.get('SERVER_TIMING', '0').lower() in ('1', 'true', 'yes')
+    metrics = Metrics()
+    metrics.register('ytsum_fetch_queue_depth', 'Transcript fetches waiting for the rate limit or a free connection.',
+                     lambda: transcript_fetcher.queue_depth)
+    metrics.register('ytsum_fetch_active', 'Transcript fetches sent to YouTube and not answered yet.',
+                     lambda: transcript_fetcher.active)
+    metrics.register('ytsum_fetch_upstream_total', 'Transcript fetch attempts sent to YouTube.',
+                     lambda: transcript_fetcher.upstream_fetches, 'counter')
+    metrics.register('ytsum_fetch_coalesced_total', 'Transcript fetches served by a fetch of the same video.',
+                     lambda: transcript_fetcher.coalesced, 'counter')
+    metrics.register('ytsum_fetch_retries_total', 'Transcript fetches retried after a failed attempt.',
+                     lambda: transcript_fetcher.retried, 'counter')
+    metrics.register('ytsum_guard_fallbacks_total', 'Algorithms replaced by a cheaper one to fit in the budgets.',
+                     lambda: resource_guard.fallbacks, 'counter')
+    metrics.register('ytsum_guard_rejected_total', 'Summaries refused as no algorithm fits in the budgets.',
+                     lambda: resource_guard.rejected, 'counter')
+    metrics.register('ytsum_guard_killed_total', 'Isolated algorithms stopped for going over the budgets.',
+                     lambda: resource_guard.killed, 'counter')
+    app.extensions['metrics'] = metrics
+
+    def build_document(transcript, timings=None):
+        # Using Formatter to format received subtitles into one line, then tokenizing it once for every summarizer.
+        with metrics.stage('format', timings=timings):
+            formatted_text = TextFormatter().format_transcript(transcript).replace("\n", " ")
+        # The document also keeps the timestamps of the segments (TranscriptIndex), so summary sentences are linked to
+        # the time they are spoken at without going through the transcript again.
+        with metrics.stage('tokenize', timings=timings):
+            return prepare_document(formatted_text, registry, transcript).to_dict()
+
+    def timed_fetch(fetch=None, timings=None):
+        # Transcript fetch function (the transcript fetcher by default) recording its time as "fetch".
+        fetch = fetch or transcript_fetcher.fetch
+
+        def fetch_transcript(video_id, languages):
+            with metrics.stage('fetch', timings=timings):
+                return fetch(video_id, languages=languages)
+        return fetch_transcript
+
+    def get_document(video_id, fetch=None, timings=None):
+        # Preprocessed document (formatted text, sentences and word tokens) of the video. It is built once per
+        # transcript and cached next to it, so changing percent or choice skips tokenization entirely.
+        return TranscriptDocument.from_dict(transcript_cache.get_document(
+            video_id, lambda transcript: build_document(transcript, timings), fetch=timed_fetch(fetch, timings)))
+
+    def summary_response(document, summary_sentences, fallback=None):
+        # Response object of the summary of one algorithm. fallback is the algorithm which ran in place of the
+        # requested one (see guard.py), if any.
+        summary = ' '.join(summary_sentences)
+        response_list = {
+            # 'fetched_transcript': formatted_text,
+            'processed_summary': summary,
+            'length_original': len(document.text),
+            'length_summary': len(summary),
+            'sentence_original': len(document.sentences),
+            'sentence_summary': len(summary_sentences)
+        }
+        timeline = document.timeline(summary_sentences)
+        if timeline is not None:
+            # Summary sentences in spoken order, with the time (seconds) of the video they start at.
+            response_list['timeline'] = timeline
+        if fallback is not None:
+            response_list['fallback'] = fallback
+        return response_list
+
+    def shareable(response_list):
+        # Whether a summary response may be cached and sent as public: every requested algorithm succeeded and none
+        # was replaced by a fallback. A timed out algorithm may finish next time, and a fallback (chosen after a
+        # transient kill, or for a budget) must not be served as the requested choice's summary.
+        items = response_list['summaries'].values() if 'summaries' in response_list else [response_list]
+        return all(item.get('success', True) and 'fallback' not in item for item in items)
+
+    def parse_choices(choice):
+        # Choice can also be "all" or a comma separated list of choices: those are summarized in parallel.
+        return list(SUMMARIZERS) if choice == "all" else list(dict.fromkeys(choice.split(",")))
+
+    def budget_arguments(arguments):
+        # Budget arguments present in the request arguments: percent, max_sentences, max_chars and max_tokens.
+        return {name: arguments.get(name) for name in BUDGET_ARGUMENTS if arguments.get(name) not in (None, '')}
+
+    def check_arguments(video_id, budget, choice):
+        # Checking the request arguments. Returns None if they are usable, else the (response body, status code) error.
+        # budget holds the budget arguments of the request (budget_arguments()), at least one of them is needed.
+        # JSON requests can send any type: id and choice must be text (the budget values are checked by
+        # SummaryBudget.from_arguments).
+        if not isinstance(video_id, (str, type(None))) or not isinstance(choice, (str, type(None))):
+            return dict(success=False,
+                        message="Invalid Arguments: id and choice must be strings.",
+                        response=None), 400
+        # Checking whether all parameters exist or not
+        if video_id and budget and choice:
+            # Every parameter exists here: checking validity of the budget, then of choice
+            try:
+                SummaryBudget.from_arguments(budget)
+            except ValueError:
+                return dict(success=False,
+                            message="Invalid Length: percent, max_sentences, max_chars and max_tokens must be "
+                                    "positive whole numbers.",
+                            response=None), 400
+            choice_list = list(SUMMARIZERS)
+            if all(item in choice_list for item in parse_choices(choice)):
+                return None
+            else:
+                return dict(success=False,
+                            message="Invalid Choice: Please create your request with correct choice.",
+                            response=None), 400
+        elif video_id is None or len(video_id) <= 0:
+            # video_id parameter doesn't exist in the request.
+            return dict(success=False,
+                        message="Video ID is not present in the request. "
+                                "Please check that you have added id in your request correctly.",
+                        response=None), 400
+        elif not budget:
+            # Neither percent nor another length parameter exists.
+            return dict(success=False,
+                        message="No Percentage value is present in the request (or max_sentences, max_chars or "
+                                "max_tokens). Please check whether your request is correct.",
+                        response=None), 400
+        elif choice is None or len(choice) <= 0:
+            # choice parameter for the summary type doesn't exist here.
+            return dict(success=False,
+                        message="No Choice parameter is present in the request. "
+                                "Please request along with your choice correctly.",
+                        response=None), 400
+        else:
+            # Some another edge case happened. Return this message for preventing exception throw.
+            return dict(success=False,
+                        message="Please request the server with your arguments correctly.",
+                        response=None), 400
+
+    def check_document(document, budget):
+        # Checking that the transcript can be summarized within budget. Returns None if so, else the (response body,
+        # status code) error.
+        # Checking the length of sentences in formatted_text string, before summarizing it.
+        num_sent_text = len(document.sentences)
+
+        # Pre-check if the summary will have at least one line .
+        select_length = budget.sentence_limit(num_sent_text)
+        if select_length <= 0:
+            return dict(success=False,
+                        message="Number of lines in the subtitles of your video is not "
+                                "enough to generate a summary. Number of sentences in your video: {}"
+                        .format(num_sent_text),
+                        response=None), 400
+        elif num_sent_text <= 1:
+            return dict(success=False,
+                        message="Subtitles are not formatted properly for this video. Unable to "
+                                "summarize. There is a possibility that there is no punctuation in "
+                                "subtitles of your video.",
+                        response=None), 400
+        return None
+
+    def check_summary(summary_sentences):
+        # Checking that at least one sentence was selected: max_chars or max_tokens smaller than every sentence of
+        # the ranking leave none. Returns None if so, else the (response body, status code) error.
+        if not summary_sentences:
+            return dict(success=False,
+                        message="No sentence of the summary fits in max_chars or max_tokens. "
+                                "Please request a larger summary length.",
+                        response=None), 400
+        return None
+
+    def error_response(error):
+        # Response body and status code of an exception raised while fetching or summarizing.
+        metrics.count_error(error)
+        if isinstance(error, VideoUnavailable):
+            return dict(success=False, message="VideoUnavailable: The video is no longer available.",
+                        response=None), 400
+        elif isinstance(error, TooManyRequests):
+            return dict(success=False,
+                        message="TooManyRequests: YouTube is receiving too many requests from this IP."
+                                " Wait until the ban on server has been lifted.",
+                        response=None), 500
+        elif isinstance(error, TranscriptsDisabled):
+            return dict(success=False, message="TranscriptsDisabled: Subtitles are disabled for this video.",
+                        response=None), 400
+        elif isinstance(error, NoTranscriptAvailable):
+            return dict(success=False,
+                        message="NoTranscriptAvailable: No transcripts are available for this video.",
+                        response=None), 400
+        elif isinstance(error, NoTranscriptFound):
+            return dict(success=False, message="NoTranscriptAvailable: No transcripts were found.",
+                        response=None), 400
+        elif isinstance(error, FetcherBusy):
+            return dict(success=False,
+                        message="Server is busy: too many transcripts are being fetched. Try again later.",
+                        response=None), 503
+        elif isinstance(error, SummarizerTimeout):
+            return dict(success=False, message="SummarizerTimeout: {}".format(error), response=None), 500
+        elif isinstance(error, ResourceBudgetExceeded):
+            return dict(success=False, message="ResourceBudgetExceeded: {}".format(error), response=None), 413
+        else:
+            # Prevent server error by returning this message to all other un-expected errors.
+            print(error)
+            sys.stdout.flush()
+            return dict(success=False,
+                        message="Some error occurred."
+                                " Contact the administrator if it is happening too frequently.",
+                        response=None), 500
+
+    def compute_rankings(video_id, document, algorithms, in_pool=False, timings=None):
+        # Sentence rankings of the document by every algorithm in algorithms: {algorithm: (ranking, seconds)}, where a
+        # failed algorithm has its exception in place of the SentenceRanking. Rankings are cached next to the
+        # transcript, so another budget for the same video only selects sentences again, and only missing ones are
+        # computed: the costly ones in an isolated subprocess (guard.py), the others in the summarizer process pool
+        # when in_pool is set, else directly.
+        rankings = {}
+        missing = []
+        for algorithm in algorithms:
+            ranking = transcript_cache.get_ranking(video_id, algorithm)
+            if ranking is None:
+                missing.append(algorithm)
+            else:
+                rankings[algorithm] = (SentenceRanking.from_dict(ranking, document), 0.0)
+
+        isolated = [algorithm for algorithm in missing if resource_guard.isolates(algorithm, document)]
+        pooled = [algorithm for algorithm in missing if algorithm not in isolated]
+        results = {}
+        if pooled and in_pool:
+            results.update(summarizer_pool.run_many(pooled, document, app.config['SUMMARIZER_TIMEOUT']))
+        elif pooled:
+            start_time = time.perf_counter()
+            with metrics.stage('summarize', pooled[0], timings):
+                ranking = RANKERS[pooled[0]](document.text, registry, document)
+            transcript_cache.set_ranking(video_id, pooled[0], ranking.to_dict())
+            rankings[pooled[0]] = (ranking, time.perf_counter() - start_time)
+
+        # Isolated algorithms run one after another within one time budget, so that a request never holds more than
+        # its memory budget at once.
+        start_time = time.perf_counter()
+        for algorithm in isolated:
+            seconds = max(resource_guard.seconds - (time.perf_counter() - start_time), 0)
+            results[algorithm] = resource_guard.run_isolated(algorithm, document, seconds)
+
+        for algorithm, (ranking, time_taken) in results.items():
+            metrics.observe_stage('summarize', time_taken, algorithm, timings)
+            if not isinstance(ranking, Exception):
+                transcript_cache.set_ranking(video_id, algorithm, ranking)
+                ranking = SentenceRanking.from_dict(ranking, document)
+            rankings[algorithm] = (ranking, time_taken)
+        return {algorithm: rankings[algorithm] for algorithm in algorithms}
+
+    def get_rankings(video_id, document, choices, in_pool=False, timings=None):
+        # Sentence rankings of the document for every choice: {choice: (ranking, seconds, algorithm)}. The resource
+        # guard picks the algorithm run for each choice: the choice itself, or a cheaper fallback when its estimated
+        # cost does not fit in the budgets (ResourceBudgetExceeded in place of the ranking when none does). Several
+        # choices, or in_pool, run in the summarizer process pool.
+        results = {}
+        algorithms = {}
+        for choice in choices:
+            try:
+                algorithms[choice] = resource_guard.plan(choice, document)
+            except ResourceBudgetExceeded as error:
+                results[choice] = (error, 0.0, choice)
+        in_pool = in_pool or len(choices) > 1
+
+        # Estimates are approximate: an algorithm stopped for going over the budgets is replaced by its fallback, and
+        # that one by its own fallback in turn, until one runs within the budgets or no fallback is left.
+        pending = algorithms
+        while pending:
+            rankings = compute_rankings(video_id, document, list(dict.fromkeys(pending.values())), in_pool, timings)
+            fallbacks = {}
+            for choice, algorithm in pending.items():
+                ranking, time_taken = rankings[algorithm]
+                fallback = None
+                if isinstance(ranking, (ResourceBudgetExceeded, SummarizerTimeout)):
+                    fallback = resource_guard.fallback(algorithm, document)
+                    if fallback is None and algorithm != choice:
+                        # The error is about the requested choice, not about the last fallback tried for it.
+                        ranking = type(ranking)('{} could not be summarized within the budgets, by itself or its '
+                                                'fallbacks (last tried {}: {})'.format(choice, algorithm, ranking))
+                if fallback is None:
+                    results[choice] = (ranking, time_taken, algorithm)
+                else:
+                    fallbacks[choice] = fallback
+            pending = fallbacks
+
+        return {choice: results[choice] for choice in choices}
+
+    def summarize_video(video_id, budget, choices, progress=None, fetch=None, in_pool=False, timings=None):
+        # Transcript Fetch and its Summarization within budget (a SummaryBudget), for checked arguments. Shared by the
+        # /summarize/ route, the background jobs and batches, returns (response body, status code). progress, if
+        # given, is called with each stage name. fetch replaces the transcript fetcher on a cache miss,
+        # and in_pool runs a single choice in the summarizer process pool too (several choices always are). timings,
+        # if given, receives the seconds spent in each stage.
+        progress = progress or (lambda stage: None)
+
+        # Same video, budget and choice summarized before: returning the cached summary.
+        response_list = result_cache.get(video_id, budget, choices)
+        if response_list is not None:
+            return dict(success=True,
+                        message="Subtitles for this video was fetched and summarized successfully.",
+                        response=response_list), 200
+
+        try:
+            progress('fetching')
+            document = get_document(video_id, fetch, timings)
+            formatted_text = document.text
+            num_sent_text = len(document.sentences)
+
+            # Summary will have at least 1 line: otherwise returning the reason.
+            error = check_document(document, budget)
+            if error is not None:
+                return error
+            progress('summarizing')
+
+            # Ranking the sentences with every requested algorithm (or using their cached rankings), then selecting
+            # the best sentences which fit in the budget.
+            rankings = get_rankings(video_id, document, choices, in_pool, timings)
+            if len(choices) > 1:
+
+                # Returning Result: one entry per algorithm, with the time it took.
+                summaries = {}
+                for item, (ranking, time_taken, algorithm) in rankings.items():
+                    if isinstance(ranking, Exception):
+                        metrics.count_error(ranking)
+                        # Failed or timed out algorithm: the other algorithms are still returned.
+                        if isinstance(ranking, (SummarizerTimeout, ResourceBudgetExceeded)):
+                            message = str(ranking)
+                        else:
+                            print(ranking)
+                            sys.stdout.flush()
+                            message = "Some error occurred."
+                        summaries[item] = {
+                            'success': False,
+                            'message': message,
+                            'time_taken': round(time_taken, 4)
+                        }
+                    else:
+                        summary_sentences = ranking.select(budget)
+                        error = check_summary(summary_sentences)
+                        if error is not None:
+                            # Budget too small for the sentences of this algorithm: the others may still fit.
+                            summaries[item] = {
+                                'success': False,
+                                'message': error[0]['message'],
+                                'time_taken': round(time_taken, 4)
+                            }
+                            continue
+                        summary = ' '.join(summary_sentences)
+                        summaries[item] = {
+                            'success': True,
+                            'processed_summary': summary,
+                            'length_summary': len(summary),
+                            'sentence_summary': len(summary_sentences),
+                            'time_taken': round(time_taken, 4)
+                        }
+                        timeline = document.timeline(summary_sentences)
+                        if timeline is not None:
+                            summaries[item]['timeline'] = timeline
+                        if algorithm != item:
+                            summaries[item]['fallback'] = algorithm
+
+                response_list = {
+                    'length_original': len(formatted_text),
+                    'sentence_original': num_sent_text,
+                    'summaries': summaries
+                }
+                # Caching only complete results, summarized by the requested algorithms.
+                if shareable(response_list):
+                    result_cache.set(video_id, budget, choices, response_list)
+
+                return dict(success=True,
+                            message="Subtitles for this video was fetched and summarized successfully.",
+                            response=response_list), 200
+
+            else:
+
+                # Summarizing Formatted Text based upon the request's choice, as a list of sentences.
+                ranking, time_taken, algorithm = rankings[choices[0]]
+                if isinstance(ranking, Exception):
+                    raise ranking
+                summary_sentences = ranking.select(budget)
+                error = check_summary(summary_sentences)
+                if error is not None:
+                    return error
+                response_list = summary_response(document, summary_sentences,
+                                                 algorithm if algorithm != choices[0] else None)
+                if shareable(response_list):
+                    result_cache.set(video_id, budget, choices, response_list)
+
+                return dict(success=True,
+                            message="Subtitles for this video was fetched and summarized successfully.",
+                            response=response_list), 200
+
+        # Catching Exceptions
+        except Exception as e:
+            return error_response(e)
 
     # Processing Function for below route.
     @app.route('/summarize/', methods=['GET'])
     def transcript_fetched_query():
         # Getting argument from the request
         video_id = request.args.get('id')  # video_id of the YouTube Video
-        percent = request.args.get('percent')  # percentage of the summary
+        budget = budget_arguments(request.args)  # percentage of the summary, and/or its largest length
         choice = request.args.get('choice')  # summarization choice
 
-        # Checking whether all parameters exist or not
-        if video_id and percent and choice:
-            # Every parameter exists here: checking validity of choice
-            choice_list = ["gensim-sum", "spacy-sum", "nltk-sum", "sumy-lsa-sum", "sumy-luhn-sum", "sumy-text-rank-sum"]
-            if choice in choice_list:
-                # Choice Correct: Proceeding with Transcript Fetch and its Summarization
-                try:
-                    # Using Formatter to store and format received subtitles properly.
-                    formatter = TextFormatter()
-                    transcript = YouTubeTranscriptApi.get_transcript(video_id)
-                    formatted_text = formatter.format_transcript(transcript).replace("\n", " ")
-
-                    # Checking the length of sentences in formatted_text string, before summarizing it.
-                    num_sent_text = len(nltk.sent_tokenize(formatted_text))
-
-                    # Pre-check if the summary will have at least one line .
-                    select_length = int(num_sent_text * (int(percent) / 100))
-
-                    # Summary will have at least 1 line. Proceed to summarize.
-                    if select_length > 0:
-
-                        # Condition satisfied for summarization, summarizing the formatted_text based on choice.
-                        if num_sent_text > 1:
-
-                            # Summarizing Formatted Text based upon the request's choice
-                            if choice == "gensim-sum":
-                                summary = gensim_summarize(formatted_text,
-                                                           percent)  # Gensim Library for TextRank Based Summary.
-                            elif choice == "spacy-sum":
-                                summary = spacy_summarize(formatted_text,
-                                                          percent)  # Spacy Library for frequency-based summary.
-                            elif choice == "nltk-sum":
-                                summary = nltk_summarize(formatted_text,
-                                                         percent)  # NLTK Library used for frequency-based summary.
-                            elif choice == "sumy-lsa-sum":
-                                summary = sumy_lsa_summarize(formatted_text,
-                                                             percent)  # Sumy for extractive summary using LSA.
-                            elif choice == "sumy-luhn-sum":
-                                summary = sumy_luhn_summarize(formatted_text,
-                                                              percent)  # Sumy Library for TF-IDF Based Summary.
-                            elif choice == "sumy-text-rank-sum":
-                                summary = sumy_text_rank_summarize(formatted_text,
-                                                                   percent)  # Sumy for Text Rank Based Summary.
-                            else:
-                                summary = None
-
-                            # Checking the length of sentences in summary string.
-                            num_sent_summary = len(nltk.sent_tokenize(summary))
-
-                            # Returning Result
-                            response_list = {
-                                # 'fetched_transcript': formatted_text,
-                                'processed_summary': summary,
-                                'length_original': len(formatted_text),
-                                'length_summary': len(summary),
-                                'sentence_original': num_sent_text,
-                                'sentence_summary': num_sent_summary
-                            }
+        error = check_arguments(video_id, budget, choice)
+        if error is not None:
+            body, status = error
+            return jsonify(body), status
 
-                            return jsonify(success=True,
-                                           message="Subtitles for this video was fetched and summarized successfully.",
-                                           response=response_list), 200
+        g.timings = {}
+        body, status = summarize_video(video_id, SummaryBudget.from_arguments(budget), parse_choices(choice),
+                                       timings=g.timings)
+        response = jsonify(body)
+        response.status_code = status
+        if status == 200 and shareable(body['response']):
+            # Summaries of the same request are identical (until their cache entry expires): the ETag lets a client
+            # revalidate with If-None-Match and receive 304 Not Modified instead of the whole summary.
+            response.add_etag()
+            response.cache_control.public = True
+            response.cache_control.max_age = app.config['RESULT_CACHE_MAX_AGE']
+            response = response.make_conditional(request)
+        elif status == 200:
+            # Incomplete or fallback summary: neither browsers nor CDNs keep it.
+            response.cache_control.no_store = True
+        return response
 
-                        else:
-                            return jsonify(success=False,
-                                           message="Subtitles are not formatted properly for this video. Unable to "
-                                                   "summarize. There is a possibility that there is no punctuation in "
-                                                   "subtitles of your video.",
-                                           response=None), 400
+    def server_sent_event(event, data):
+        # One event of a text/event-stream response, data sent as JSON.
+        return 'event: {}\ndata: {}\n\n'.format(event, json.dumps(data))
 
-                    else:
-                        return jsonify(success=False,
-                                       message="Number of lines in the subtitles of your video is not "
-                                               "enough to generate a summary. Number of sentences in your video: {}"
-                                       .format(num_sent_text),
-                                       response=None), 400
-
-                # Catching Exceptions
-                except VideoUnavailable:
-                    return jsonify(success=False, message="VideoUnavailable: The video is no longer available.",
-                                   response=None), 400
-                except TooManyRequests:
-                    return jsonify(success=False,
-                                   message="TooManyRequests: YouTube is receiving too many requests from this IP."
-                                           " Wait until the ban on server has been lifted.",
-                                   response=None), 500
-                except TranscriptsDisabled:
-                    return jsonify(success=False, message="TranscriptsDisabled: Subtitles are disabled for this video.",
-                                   response=None), 400
-                except NoTranscriptAvailable:
-                    return jsonify(success=False,
-                                   message="NoTranscriptAvailable: No transcripts are available for this video.",
-                                   response=None), 400
-                except NoTranscriptFound:
-                    return jsonify(success=False, message="NoTranscriptAvailable: No transcripts were found.",
-                                   response=None), 400
-                except Exception as e:
-                    # Prevent server error by returning this message to all other un-expected errors.
-                    print(e)
-                    sys.stdout.flush()
-                    return jsonify(success=False,
-                                   message="Some error occurred."
-                                           " Contact the administrator if it is happening too frequently.",
-                                   response=None), 500
-            else:
-                return jsonify(success=False,
-                               message="Invalid Choice: Please create your request with correct choice.",
-                               response=None), 400
-        elif video_id is None or len(video_id) <= 0:
-            # video_id parameter doesn't exist in the request.
+    def event_stream(events):
+        # text/event-stream response sending events (an iterable of server_sent_event strings).
+        response = Response(events, mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        # Asking reverse proxies not to buffer the events.
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
+    @app.route('/summarize/stream/', methods=['GET'])
+    def summarize_stream():
+        # Server-Sent Events version of /summarize/ (one choice), used by the web page to show progress and the
+        # summary as soon as it is known. Events sent:
+        #  * stage: {"stage": "fetched", "tokenized" or "scoring", ...} as the summarization goes on;
+        #  * sentence: {"index", "text", "start"} for every summary sentence in transcript order, start in seconds;
+        #  * summary: the body /summarize/ returns, once every sentence was sent;
+        #  * failure: the error body /summarize/ returns, with its status_code, when the video can not be summarized.
+        # Invalid arguments are answered with a single failure event: EventSource can not read the body of an error
+        # status, so the stream itself is always sent with status 200.
+        video_id = request.args.get('id')
+        budget = budget_arguments(request.args)
+        choice = request.args.get('choice')
+
+        error = check_arguments(video_id, budget, choice)
+        if error is None and len(parse_choices(choice)) > 1:
+            error = dict(success=False,
+                         message="Invalid Choice: Streaming summaries are available for one choice at a time.",
+                         response=None), 400
+        if error is not None:
+            body, status = error
+            return event_stream([server_sent_event('failure', dict(body, status_code=status))])
+        budget = SummaryBudget.from_arguments(budget)
+
+        def generate():
+            try:
+                transcript = transcript_cache.get_transcript(video_id, fetch=timed_fetch())
+                yield server_sent_event('stage', {'stage': 'fetched', 'segments': len(transcript)})
+
+                # Document built from the transcript fetched above (cached documents are used as they are).
+                document = get_document(video_id, fetch=lambda fetched_video_id, languages: transcript)
+                if document.index is None:
+                    # Document cached before timestamps were kept with it.
+                    document.index = TranscriptIndex.build(transcript, document.text, document.sentences)
+                yield server_sent_event('stage', {'stage': 'tokenized', 'sentences': len(document.sentences),
+                                                  'characters': len(document.text)})
+                error = check_document(document, budget)
+                if error is not None:
+                    body, status = error
+                    yield server_sent_event('failure', dict(body, status_code=status))
+                    return
+
+                yield server_sent_event('stage', {'stage': 'scoring', 'algorithm': choice})
+                ranking, time_taken, algorithm = get_rankings(video_id, document, [choice])[choice]
+                if isinstance(ranking, Exception):
+                    raise ranking
+                summary_sentences = ranking.select(budget)
+                error = check_summary(summary_sentences)
+                if error is not None:
+                    body, status = error
+                    yield server_sent_event('failure', dict(body, status_code=status))
+                    return
+                response_list = summary_response(document, summary_sentences,
+                                                 algorithm if algorithm != choice else None)
+                for item in response_list['timeline']:
+                    yield server_sent_event('sentence', item)
+
+                if shareable(response_list):
+                    result_cache.set(video_id, budget, [choice], response_list)
+                yield server_sent_event('summary', dict(
+                    success=True, message="Subtitles for this video was fetched and summarized successfully.",
+                    response=response_list))
+            except Exception as e:
+                body, status = error_response(e)
+                yield server_sent_event('failure', dict(body, status_code=status))
+
+        return event_stream(stream_with_context(generate()))
+
+    # Asynchronous Jobs: POST /summarize/ answers at once with a job id, the summarization runs in the background job
+    # pool and GET /summarize/jobs/<job_id>/ reports its progress, then its result.
+    @app.route('/summarize/', methods=['POST'])
+    def summarize_job_submit():
+        # Arguments can be sent in the query string, as a form or as a JSON object.
+        arguments = request.get_json(silent=True) if request.is_json else None
+        arguments = arguments if isinstance(arguments, dict) else request.values
+        video_id = arguments.get('id')
+        budget = budget_arguments(arguments)
+        choice = arguments.get('choice')
+
+        error = check_arguments(video_id, budget, choice)
+        if error is not None:
+            body, status = error
+            return jsonify(body), status
+
+        choices = parse_choices(choice)
+        budget = SummaryBudget.from_arguments(budget)
+        # Same video, budget and choices: a job already queued or running is shared instead of starting another one.
+        key = (video_id, budget.key(), tuple(choices))
+        try:
+            job, created = job_manager.submit(
+                key, lambda job: summarize_video(video_id, budget, choices, progress=job.set_stage))
+        except JobQueueFull:
+            response = jsonify(success=False,
+                               message="Server is busy: too many summarizations are waiting. Try again later.",
+                               response=None)
+            response.headers['Retry-After'] = str(app.config['JOB_RETRY_AFTER'])
+            return response, 429
+
+        response = jsonify(success=True,
+                           message="Summarization job was created." if created else
+                           "Same summarization is already in progress, returning its job.",
+                           response=dict(job.to_dict(), status_url=url_for('summarize_job_status', job_id=job.id)))
+        response.headers['Location'] = url_for('summarize_job_status', job_id=job.id)
+        return response, 202
+
+    @app.route('/summarize/batch/', methods=['POST'])
+    def summarize_batch():
+        # Batch of videos: a JSON object {"ids": [...], "percent": ..., "choice": ...}, max_sentences, max_chars and
+        # max_tokens being accepted as with /summarize/. The answer is streamed as NDJSON, one line per video in the
+        # order they finish: {"index", "id", "status_code"} along with the success/message/response of /summarize/ for
+        # that video. An error of one video does not stop the others.
+        arguments = request.get_json(silent=True)
+        arguments = arguments if isinstance(arguments, dict) else {}
+        video_ids = arguments.get('ids')
+        budget = budget_arguments(arguments)
+        choice = arguments.get('choice')
+
+        # Checking the list of video ids, then budget and choice (which are the same for every video). check_arguments
+        # checks the type of choice before parse_choices splits it.
+        if not isinstance(video_ids, list) or not video_ids:
             return jsonify(success=False,
-                           message="Video ID is not present in the request. "
-                                   "Please check that you have added id in your request correctly.",
+                           message="Video IDs are not present in the request. "
+                                   "Please send a JSON object with a non-empty list of video ids in ids.",
                            response=None), 400
-        elif percent is None or len(percent) <= 0:
-            # percent parameter doesn't exist.
+        if not all(isinstance(video_id, str) and video_id for video_id in video_ids):
             return jsonify(success=False,
-                           message="No Percentage value is present in the request. "
-                                   "Please check whether your request is correct.",
+                           message="Invalid Video IDs: every video id in ids must be a non-empty string.",
                            response=None), 400
-        elif choice is None or len(choice) <= 0:
-            # choice parameter for the summary type doesn't exist here.
+        if len(video_ids) > app.config['BATCH_MAX_VIDEOS']:
             return jsonify(success=False,
-                           message="No Choice parameter is present in the request. "
-                                   "Please request along with your choice correctly.",
+                           message="Too many video IDs: at most {} videos can be summarized in one request."
+                           .format(app.config['BATCH_MAX_VIDEOS']),
                            response=None), 400
-        else:
-            # Some another edge case happened. Return this message for preventing exception throw.
+        error = check_arguments(video_ids[0], budget, choice)
+        if error is not None:
+            body, status = error
+            return jsonify(body), status
+
+        choices = parse_choices(choice)
+        budget = SummaryBudget.from_arguments(budget)
+        futures = {batch_executor.submit(summarize_video, video_id, budget, choices, in_pool=True): (index, video_id)
+                   for index, video_id in enumerate(video_ids)}
+
+        def generate():
+            try:
+                for future in as_completed(futures):
+                    index, video_id = futures[future]
+                    body, status = future.result()
+                    yield json.dumps(dict(body, index=index, id=video_id, status_code=status)) + '\n'
+            finally:
+                # Client gone before the end: videos not started yet are dropped.
+                for future in futures:
+                    future.cancel()
+
+        return Response(stream_with_context(generate()), status=200, mimetype='application/x-ndjson')
+
+    @app.route('/summarize/jobs/<job_id>/', methods=['GET'])
+    def summarize_job_status(job_id):
+        # Status of a job: its stage and progress, and once finished the same body and status code /summarize/ gives.
+        job = job_manager.get(job_id)
+        if job is None:
             return jsonify(success=False,
-                           message="Please request the server with your arguments correctly.",
-                           response=None), 400
+                           message="Job not found. Finished jobs are kept for {} seconds."
+                           .format(app.config['JOB_RETENTION']),
+                           response=None), 404
+        return jsonify(success=True, message="Job {}.".format(job.state), response=job.to_dict()), 200
+
+    @app.route('/cache/stats/', methods=['GET'])
+    def cache_stats():
+        # Hits, misses, entries and evictions of the transcript and result caches, the queue depth and counters of the
+        # transcript fetcher, the budgets and counters of the resource guard, and the background job counts. They are
+        # those of the worker process answering (pid) only, apart from the entries of the SQLite caches.
+        return jsonify(success=True, message="Cache statistics.",
+                       response={'pid': os.getpid(),
+                                 'transcript_cache': transcript_cache.stats(),
+                                 'result_cache': result_cache.stats(),
+                                 'fetcher': transcript_fetcher.stats(),
+                                 'guard': resource_guard.stats(),
+                                 'jobs': job_manager.stats()}), 200
+
+    @app.route('/cache/purge/', methods=['POST'])
+    def cache_purge():
+        # Removes the cached transcript and summaries of one video (id argument), or of every video without it.
+        # Other worker processes see the purge through the SQLite files (TRANSCRIPT_CACHE_PATH, RESULT_CACHE_PATH),
+        # without them it only empties the caches of this process.
+        token = app.config['CACHE_PURGE_TOKEN']
+        if not token:
+            return jsonify(success=False, message="Cache purge is disabled on this server.", response=None), 403
+        if not hmac.compare_digest(request.headers.get('X-Purge-Token', ''), token):
+            return jsonify(success=False, message="Invalid purge token.", response=None), 403
+
+        arguments = request.get_json(silent=True) if request.is_json else None
+        arguments = arguments if isinstance(arguments, dict) else request.values
+        video_id = arguments.get('id') or None
+        if video_id is None:
+            transcript_cache.purge()
+        else:
+            transcript_cache.purge(video_id)
+        result_cache.purge(video_id)
+        return jsonify(success=True,
+                       message="Cache purged for video {}.".format(video_id) if video_id else "Cache purged.",
+                       response=None), 200
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        # Prometheus scrape endpoint.
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
     @app.route('/favicon.ico')
     # Favicon is stored in static folder, browsers request it to display along with tab title.
@@ -219,6 +839,26 @@ def create_app():
                 code = 301
                 return redirect(url, code=code)
 
+    @app.before_request
+    def start_request_timer():
+        g.start_time = time.perf_counter()
+
+    @app.after_request
+    # After Request Function: recording the request duration, and sending the stage timings if enabled.
+    def record_request_metrics(response):
+        # No start time when an earlier before_request function (the HTTPS redirect) answered the request.
+        if 'start_time' not in g:
+            return response
+        elapsed = time.perf_counter() - g.start_time
+        # Route pattern (not the URL) as label, so that job ids or unknown URLs do not create new series.
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.request_seconds.observe(elapsed, endpoint=endpoint, method=request.method,
+                                        status=response.status_code)
+        if app.config['SERVER_TIMING'] and 'timings' in g:
+            g.timings['total'] = elapsed
+            response.headers['Server-Timing'] = server_timing_header(g.timings)
+        return response
+
     return app
 
 
@@ -0,0 +1,91 @@
+# Benchmark Corpus
+# Transcripts used by the benchmarks, from a one minute clip to a six hour conference stream. They are generated from
+# fixed seeds, so every run (and every machine) gets exactly the same transcripts without storing megabytes of text in
+# the repository or reaching YouTube. Real transcripts can be added too: JSON files holding the list of segments
+# returned by YouTubeTranscriptApi.get_transcript, loaded with load_corpus(directory).
+
+# Other Imports
+import json
+import os
+import random
+
+# Vocabulary of the synthetic transcripts: a few topics, so that sentences of the same topic are similar.
+TOPICS = [
+    'model training data loss gradient layer network weights accuracy epoch batch',
+    'market price stock trade investor growth revenue profit quarter economy',
+    'recipe flour sugar butter oven bake dough minutes taste kitchen',
+    'planet star orbit telescope galaxy light gravity space mission rocket',
+    'guitar chord song melody rhythm band stage album music concert',
+]
+FILLERS = 'the a we you it is was this that so and then really just like what about'.split()
+
+# Bundled corpus: (video id, duration in minutes). Speech is about 150 words, or 12 sentences, a minute.
+CORPUS = [
+    ('short-clip', 1),
+    ('tutorial', 10),
+    ('lecture', 45),
+    ('podcast', 120),
+    ('conference-stream', 360),
+]
+WORDS_PER_MINUTE = 150
+
+
+def rare_words(count, seed=0):
+    # Made up words standing for the long tail of a real transcript vocabulary (names, rare terms).
+    random_generator = random.Random(seed)
+    return [''.join(random_generator.choice('bcdfghklmnprstvz') + random_generator.choice('aeiou')
+                    for _ in range(random_generator.randint(2, 4))) for _ in range(count)]
+
+
+RARE_WORDS = rare_words(5000)
+
+
+def synthetic_sentences(sentences, seed=0):
+    # Returns the given number of sentences, topics changing every few dozen sentences.
+    random_generator = random.Random(seed)
+    lines = []
+    for index in range(sentences):
+        topic = TOPICS[(index // 40) % len(TOPICS)].split()
+        words = [random_generator.choice(topic if random_generator.random() < 0.6 else FILLERS)
+                 for _ in range(random_generator.randint(6, 18))]
+        words.extend(random_generator.sample(RARE_WORDS, random_generator.randint(1, 3)))
+        random_generator.shuffle(words)
+        lines.append(' '.join(words).capitalize() + '.')
+    return lines
+
+
+def synthetic_transcript(sentences, seed=0):
+    # Returns a transcript text of the given number of sentences.
+    return ' '.join(synthetic_sentences(sentences, seed))
+
+
+def synthetic_segments(minutes, seed=0):
+    # Transcript of the given duration as YouTubeTranscriptApi.get_transcript returns it: short caption segments
+    # ({'text', 'start', 'duration'}) which, like real captions, start and end in the middle of sentences.
+    words = ' '.join(synthetic_sentences(minutes * WORDS_PER_MINUTE // 12, seed)).split(' ')
+    random_generator = random.Random(seed)
+    seconds_per_word = 60 / WORDS_PER_MINUTE
+    segments = []
+    position = 0
+    while position < len(words):
+        length = random_generator.randint(5, 12)
+        segments.append({'text': ' '.join(words[position:position + length]),
+                         'start': round(position * seconds_per_word, 3),
+                         'duration': round(length * seconds_per_word, 3)})
+        position += length
+    return segments
+
+
+def load_corpus(directory=None, max_minutes=None):
+    # Returns {video id: segments}: the bundled corpus (entries up to max_minutes long), then every *.json file of
+    # directory, named by its file name.
+    corpus = {}
+    for seed, (video_id, minutes) in enumerate(CORPUS):
+        if max_minutes is None or minutes <= max_minutes:
+            corpus[video_id] = synthetic_segments(minutes, seed)
+    if directory:
+        for file_name in sorted(os.listdir(directory)):
+            if file_name.endswith('.json'):
+                with open(os.path.join(directory, file_name)) as file:
+                    corpus[file_name[:-len('.json')]] = json.load(file)
+    return corpus
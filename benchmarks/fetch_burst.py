@@ -0,0 +1,100 @@
+# Transcript Fetch Burst Benchmark
+# Sends a burst of concurrent transcript fetches through the transcript fetcher (fetcher.py) to the local stub
+# transcript server (benchmarks/stub_server.py), which rate limits and fails some of them on purpose. Reports how many
+# fetches succeeded, their p50/p99 latency, the largest queue depth seen, and how many upstream requests were saved by
+# coalescing or spent on retries. No network access is needed.
+# Run from the repository root:  python -m benchmarks.fetch_burst --requests 200 --threads 50 --rate-limit-every 7
+
+# Transcript Fetcher Import (fetcher.py)
+from fetcher import TranscriptFetcher
+
+# Benchmark Imports (benchmarks/corpus.py, benchmarks/stub_server.py)
+from benchmarks.corpus import load_corpus
+from benchmarks.stub_server import StubTranscriptServer
+
+# NumPy Import
+import numpy as np
+
+# Other Imports
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import random
+import threading
+import time
+
+
+def timed_fetch(fetcher, video_id):
+    # Returns (seconds, exception type name or None) of one fetch.
+    start_time = time.perf_counter()
+    try:
+        fetcher.fetch(video_id)
+        error = None
+    except Exception as exception:
+        error = type(exception).__name__
+    return time.perf_counter() - start_time, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the transcript fetcher against a local stub server.')
+    parser.add_argument('--requests', type=int, default=200, help='fetches in the burst')
+    parser.add_argument('--threads', type=int, default=50, help='fetches sent at the same time')
+    parser.add_argument('--videos', type=int, default=20, help='distinct video ids the fetches are spread over')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds the stub server takes to answer')
+    parser.add_argument('--rate-limit-every', type=int, default=7)
+    parser.add_argument('--error-rate', type=float, default=0.02)
+    parser.add_argument('--rate', type=float, default=20, help='outbound requests per second of the fetcher')
+    parser.add_argument('--burst', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--backoff', type=float, default=0.1)
+    parser.add_argument('--queue-timeout', type=float, default=30)
+    arguments = parser.parse_args()
+
+    # The same short transcript served under several ids, so that the benchmark measures fetching only.
+    segments = load_corpus(max_minutes=1)['short-clip']
+    transcripts = {'video-{}'.format(index): segments for index in range(arguments.videos)}
+    random_generator = random.Random(0)
+    video_ids = [random_generator.choice(list(transcripts)) for _ in range(arguments.requests)]
+
+    with StubTranscriptServer(transcripts, latency=arguments.latency, rate_limit_every=arguments.rate_limit_every,
+                              error_rate=arguments.error_rate) as stub:
+        fetcher = TranscriptFetcher(pool_size=arguments.concurrency, rate=arguments.rate, burst=arguments.burst,
+                                    retries=arguments.retries, backoff=arguments.backoff,
+                                    queue_timeout=arguments.queue_timeout, watch_url=stub.watch_url)
+
+        # Sampling the queue depth while the burst runs.
+        depths = []
+        running = threading.Event()
+        running.set()
+
+        def sample():
+            while running.is_set():
+                depths.append(fetcher.queue_depth)
+                time.sleep(0.01)
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=arguments.threads) as executor:
+            results = list(executor.map(lambda video_id: timed_fetch(fetcher, video_id), video_ids))
+        elapsed = time.perf_counter() - start_time
+        running.clear()
+        sampler.join()
+        fetcher.close()
+
+    latencies = [seconds for seconds, _ in results]
+    errors = Counter(error for _, error in results if error is not None)
+    stats = fetcher.stats()
+    print('fetches          : {} in {:.2f}s ({} succeeded)'.format(len(results), elapsed,
+                                                                   len(results) - sum(errors.values())))
+    print('latency p50/p99  : {:.3f}s / {:.3f}s'.format(np.percentile(latencies, 50), np.percentile(latencies, 99)))
+    print('errors           : {}'.format(dict(errors) or 'none'))
+    print('max queue depth  : {}'.format(max(depths, default=0)))
+    print('upstream fetches : {} (coalesced {}, retried {}, rejected {})'.format(
+        stats['upstream_fetches'], stats['coalesced'], stats['retried'], stats['rejected']))
+    print('stub server      : {}'.format(stub.counts))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Long Document Mode Benchmark
+# Compares time and peak memory of the default TextRank/LSA summarizers with their long document mode
+# (long_document.py) on synthetic transcripts of growing sentence count. No network access is needed.
+# Run from the repository root:  python -m benchmarks.long_document --sizes 500 1000 2000 4000 8000
+
+# Summarizer Imports (Our Other Files)
+from summarizer import SummarizerRegistry, prepare_document, sumy_lsa_summarize, sumy_text_rank_summarize, \
+    gensim_summarize
+
+# Synthetic Transcripts Import (benchmarks/corpus.py)
+from benchmarks.corpus import synthetic_transcript
+
+# Other Imports
+import argparse
+import time
+import tracemalloc
+
+
+def measure(function):
+    # Runs function once, returns (seconds, peak traced memory in MB).
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start_time
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the long document mode of TextRank and LSA.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000, 4000])
+    parser.add_argument('--percent', type=int, default=20)
+    parser.add_argument('--dense-limit', type=int, default=4000,
+                        help='largest sentence count run with the default (dense) algorithms')
+    arguments = parser.parse_args()
+
+    # One registry never switching to long document mode, one always switching.
+    dense_registry = SummarizerRegistry(long_document_sentences=float('inf'))
+    sparse_registry = SummarizerRegistry(long_document_sentences=0)
+    algorithms = [('sumy-text-rank-sum', sumy_text_rank_summarize), ('sumy-lsa-sum', sumy_lsa_summarize),
+                  ('gensim-sum', gensim_summarize)]
+
+    print('{:>9} {:<20} {:>12} {:>12} {:>12} {:>12}'.format('sentences', 'algorithm', 'dense s', 'dense MB',
+                                                            'long s', 'long MB'))
+    for size in arguments.sizes:
+        document = prepare_document(synthetic_transcript(size), dense_registry)
+        for name, function in algorithms:
+            row = [size, name]
+            for registry in (dense_registry, sparse_registry):
+                if registry is dense_registry and size > arguments.dense_limit:
+                    row.extend(['-', '-'])
+                    continue
+                elapsed, peak = measure(lambda: function(document.text, arguments.percent, registry, document))
+                row.extend(['{:.3f}'.format(elapsed), '{:.1f}'.format(peak)])
+            print('{:>9} {:<20} {:>12} {:>12} {:>12} {:>12}'.format(*row))
+
+
+if __name__ == '__main__':
+    main()
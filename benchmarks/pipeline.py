@@ -0,0 +1,272 @@
+# Summarization Pipeline Benchmark
+# Measures every algorithm of summarizer.py on the benchmark corpus (benchmarks/corpus.py), without network access:
+#  * in-process: the *_summarize functions on an already tokenized document, and the tokenization itself;
+#  * end-to-end: GET /summarize/ through the Flask test client, with YouTubeTranscriptApi replaced by the corpus
+#    (benchmarks/stub_api.py) and the caches disabled, so every request formats, tokenizes and summarizes again.
+# Every algorithm runs in a process of its own, so that its peak RSS is not hidden by the others. The report has
+# throughput, p50/p99 latency, peak RSS and how time grows with the sentence count (the exponent of a power law fit),
+# and --output saves it as JSON so that two runs can be compared. Run from the repository root:
+#   python -m benchmarks.pipeline run --output before.json
+#   python -m benchmarks.pipeline run --output after.json
+#   python -m benchmarks.pipeline compare before.json after.json
+
+# Benchmark Corpus Imports (benchmarks/corpus.py, benchmarks/stub_api.py)
+from benchmarks.corpus import load_corpus
+from benchmarks.stub_api import patch_transcript_api
+
+# NumPy Import
+import numpy as np
+
+# Other Imports
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows: peak RSS is not reported there.
+    resource = None
+
+MODES = ['in-process', 'end-to-end']
+# Pseudo algorithm of the in-process mode: formatting and tokenizing the transcript (prepare_document).
+TOKENIZE = 'tokenize'
+
+
+def peak_rss_mb():
+    # Peak resident set size of the current process in MB (ru_maxrss is in kB on Linux, in bytes on macOS).
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def latency_summary(name, sentences, characters, latencies):
+    latencies = np.array(latencies)
+    return {
+        'name': name,
+        'sentences': sentences,
+        'characters': characters,
+        'repeats': len(latencies),
+        'mean': float(latencies.mean()),
+        'p50': float(np.percentile(latencies, 50)),
+        'p99': float(np.percentile(latencies, 99)),
+        'sentences_per_second': float(sentences / latencies.mean()) if latencies.mean() > 0 else None,
+        # Peak RSS of the process up to this point: transcripts are run from the shortest, so it is the peak reached
+        # on this transcript (or an earlier, smaller one).
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def scaling_exponent(corpus_results):
+    # Exponent k of the fit time ~ sentences ** k over the transcripts: 1 is linear, 2 quadratic.
+    points = [(item['sentences'], item['p50']) for item in corpus_results if item['sentences'] > 0 and item['p50'] > 0]
+    if len(points) < 2:
+        return None
+    sentences, seconds = zip(*points)
+    return float(np.polyfit(np.log(sentences), np.log(seconds), 1)[0])
+
+
+def format_segments(segments):
+    # The formatting done by app.py before tokenization.
+    from youtube_transcript_api.formatters import TextFormatter
+    return TextFormatter().format_transcript(segments).replace("\n", " ")
+
+
+def repeat(function, repeats):
+    # Seconds taken by each of repeats calls of function.
+    latencies = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start_time)
+    return latencies
+
+
+def measure_in_process(algorithm, corpus, percent, repeats):
+    from summarizer import SUMMARIZERS, SummarizerRegistry, prepare_document
+
+    registry = SummarizerRegistry(spacy_model=os.environ.get('SPACY_MODEL', 'en_core_web_sm'))
+    results = []
+    for video_id, segments in corpus.items():
+        text = format_segments(segments)
+        document = prepare_document(text, registry)
+        if algorithm == TOKENIZE:
+            def function():
+                prepare_document(format_segments(segments), registry)
+        else:
+            def function():
+                SUMMARIZERS[algorithm](text, percent, registry, document, split=True)
+        # Warm-up run: loads the models and summarizer objects used by the algorithm.
+        function()
+        results.append(latency_summary(video_id, len(document.sentences), len(text), repeat(function, repeats)))
+    return results
+
+
+def measure_end_to_end(algorithm, corpus, percent, repeats):
+    # Caches disabled (size 0): every request goes through fetch, format, tokenize and summarize.
+    os.environ['TRANSCRIPT_CACHE_SIZE'] = '0'
+    os.environ['RESULT_CACHE_SIZE'] = '0'
+    os.environ.pop('TRANSCRIPT_CACHE_PATH', None)
+    os.environ.pop('RESULT_CACHE_PATH', None)
+    from app import create_app
+
+    results = []
+    with patch_transcript_api(corpus):
+        client = create_app().test_client()
+        for video_id in corpus:
+            url = '/summarize/?id={}&percent={}&choice={}'.format(video_id, percent, algorithm)
+            # Warm-up request, which also gives the sentence count of the transcript.
+            response = client.get(url)
+            body = response.get_json()
+            if response.status_code != 200:
+                raise RuntimeError('{} on {}: {}'.format(algorithm, video_id, body['message']))
+            results.append(latency_summary(video_id, body['response']['sentence_original'],
+                                           body['response']['length_original'],
+                                           repeat(lambda: client.get(url), repeats)))
+    return results
+
+
+def measure_algorithm(mode, algorithm, corpus_directory, max_minutes, percent, repeats):
+    # Runs in a new process: measures one algorithm on every transcript of the corpus, shortest first.
+    corpus = load_corpus(corpus_directory, max_minutes)
+    corpus = dict(sorted(corpus.items(), key=lambda item: sum(len(segment['text']) for segment in item[1])))
+    baseline_rss = peak_rss_mb()
+    if mode == 'in-process':
+        corpus_results = measure_in_process(algorithm, corpus, percent, repeats)
+    else:
+        corpus_results = measure_end_to_end(algorithm, corpus, percent, repeats)
+    return {
+        'mode': mode,
+        'algorithm': algorithm,
+        'baseline_rss_mb': baseline_rss,
+        'scaling_exponent': scaling_exponent(corpus_results),
+        'corpus': corpus_results
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print('{:<11} {:<19} {:<18} {:>9} {:>10} {:>10} {:>12} {:>9}'.format(
+        'mode', 'algorithm', 'transcript', 'sentences', 'p50 s', 'p99 s', 'sentences/s', 'RSS MB'))
+    for result in results:
+        for item in result['corpus']:
+            print('{:<11} {:<19} {:<18} {:>9} {:>10.4f} {:>10.4f} {:>12.0f} {:>9}'.format(
+                result['mode'], result['algorithm'], item['name'], item['sentences'], item['p50'], item['p99'],
+                item['sentences_per_second'] or 0,
+                '-' if item['peak_rss_mb'] is None else '{:.0f}'.format(item['peak_rss_mb'])))
+        if result['scaling_exponent'] is not None:
+            print('{:<11} {:<19} time ~ sentences ^ {:.2f}'.format(result['mode'], result['algorithm'],
+                                                                   result['scaling_exponent']))
+
+
+def run(arguments):
+    from summarizer import SUMMARIZERS
+
+    algorithms = arguments.algorithms or list(SUMMARIZERS)
+    results = []
+    for mode in arguments.modes:
+        for algorithm in ([TOKENIZE] if mode == 'in-process' else []) + algorithms:
+            print('Measuring {} {}'.format(mode, algorithm))
+            sys.stdout.flush()
+            # A new process for each algorithm: its peak RSS, its imports and its models only.
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                results.append(executor.submit(measure_algorithm, mode, algorithm, arguments.corpus_dir,
+                                               arguments.max_minutes, arguments.percent, arguments.repeats).result())
+
+    print_results(results)
+    report = {
+        'metadata': {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'percent': arguments.percent,
+            'repeats': arguments.repeats
+        },
+        'results': results
+    }
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print('Results saved to {}'.format(arguments.output))
+
+
+def compare(arguments):
+    # Prints the p50 latency and peak RSS change of every (mode, algorithm, transcript) measured in both runs.
+    # Exits with status 1 when a p50 latency grew by more than threshold.
+    with open(arguments.baseline) as file:
+        baseline = json.load(file)
+    with open(arguments.current) as file:
+        current = json.load(file)
+
+    def index(report):
+        return {(result['mode'], result['algorithm'], item['name']): item
+                for result in report['results'] for item in result['corpus']}
+
+    baseline_items = index(baseline)
+    current_items = index(current)
+    regressions = 0
+    print('{:<11} {:<19} {:<18} {:>10} {:>10} {:>8} {:>9}'.format('mode', 'algorithm', 'transcript', 'before s',
+                                                                  'after s', 'change', 'RSS MB'))
+    for key, item in current_items.items():
+        if key not in baseline_items:
+            continue
+        before = baseline_items[key]
+        change = item['p50'] / before['p50'] - 1 if before['p50'] > 0 else 0
+        rss = '-'
+        if item['peak_rss_mb'] is not None and before['peak_rss_mb'] is not None:
+            rss = '{:+.0f}'.format(item['peak_rss_mb'] - before['peak_rss_mb'])
+        flag = ''
+        if change > arguments.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print('{:<11} {:<19} {:<18} {:>10.4f} {:>10.4f} {:>+7.1%} {:>9}{}'.format(
+            key[0], key[1], key[2], before['p50'], item['p50'], change, rss, flag))
+    print('{} regression(s) above {:.0%}'.format(regressions, arguments.threshold))
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the summarization pipeline on the bundled corpus.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='measure the algorithms')
+    run_parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    run_parser.add_argument('--algorithms', nargs='+', help='summarizer choices (default: all of them)')
+    run_parser.add_argument('--percent', type=int, default=20)
+    run_parser.add_argument('--repeats', type=int, default=5, help='measured runs per transcript')
+    run_parser.add_argument('--max-minutes', type=int, help='leave out bundled transcripts longer than this')
+    run_parser.add_argument('--corpus-dir', help='directory of extra transcripts (*.json lists of segments)')
+    run_parser.add_argument('--output', help='JSON file receiving the results')
+
+    compare_parser = subparsers.add_parser('compare', help='compare two saved runs')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='p50 latency growth reported as a regression (default 0.10 = 10%%)')
+
+    arguments = parser.parse_args()
+    if arguments.command == 'run':
+        run(arguments)
+    else:
+        sys.exit(compare(arguments))
+
+
+if __name__ == '__main__':
+    main()
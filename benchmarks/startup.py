@@ -0,0 +1,158 @@
+# Cold Start Benchmark
+# Measures, each in a new Python process: the time to import app.py and run create_app(), the peak RSS after it, and
+# the same with SUMMARIZER_PRELOAD=1 (every model loaded). Then starts serve.py with several pre-forked workers, sends
+# it multi-choice requests (transcripts served by the local stub server) so that the workers start their summarizer
+# process pools, and reports the memory of each worker and of its pool processes: RSS, and on Linux their PSS
+# (proportional set size, which counts pages shared with the parent and the other workers only partly) along with
+# their shared and private parts, and the PSS of all the processes together.
+# Run from the repository root:  python -m benchmarks.startup --workers 4
+
+# Benchmark Imports (benchmarks/corpus.py, benchmarks/stub_server.py)
+from benchmarks.corpus import load_corpus
+from benchmarks.stub_server import StubTranscriptServer
+
+# Other Imports
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+# Runs in a new process: prints the import and create_app times and the peak RSS as JSON.
+STARTUP_CODE = '''
+import json, resource, sys, time
+start_time = time.perf_counter()
+import app
+import_time = time.perf_counter() - start_time
+start_time = time.perf_counter()
+app.create_app()
+create_time = time.perf_counter() - start_time
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'import_s': import_time, 'create_app_s': create_time, 'modules': len(sys.modules),
+                  'peak_rss_mb': peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024}))
+'''
+
+
+def measure_startup(preload, repeats):
+    # Best of repeats cold starts (the first one also pays for reading the files from disk).
+    environment = dict(os.environ, SUMMARIZER_PRELOAD='1' if preload else '0')
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', STARTUP_CODE], capture_output=True, text=True, check=True,
+                                env=environment).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run['import_s'] + run['create_app_s'])
+
+
+def memory_of(pid):
+    # RSS, PSS, shared and private memory of a process in MB, from /proc (Linux only).
+    values = {}
+    try:
+        with open('/proc/{}/smaps_rollup'.format(pid)) as file:
+            for line in file:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    except OSError:
+        return None
+    return {
+        'rss_mb': values.get('Rss'),
+        'pss_mb': values.get('Pss'),
+        'shared_mb': values.get('Shared_Clean', 0) + values.get('Shared_Dirty', 0),
+        'private_mb': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    }
+
+
+def child_pids(parent_pid):
+    pids = []
+    for name in os.listdir('/proc'):
+        if name.isdigit():
+            try:
+                with open('/proc/{}/stat'.format(name)) as file:
+                    # Fields after the command name (which may contain spaces): state, ppid, ...
+                    if int(file.read().rsplit(')', 1)[1].split()[1]) == parent_pid:
+                        pids.append(int(name))
+            except (OSError, IndexError, ValueError):
+                pass
+    return pids
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def measure_prefork(workers, pool_requests, timeout=300):
+    # Starts serve.py with workers pre-forked workers, waits until it answers, sends it pool_requests concurrent
+    # choice=all requests so that the workers start their summarizer pools, then reads the memory of every process.
+    port = free_port()
+    transcripts = {'short-clip': load_corpus(max_minutes=1)['short-clip']}
+    with StubTranscriptServer(transcripts) as stub:
+        server = subprocess.Popen([sys.executable, 'serve.py', '--host', '127.0.0.1', '--port', str(port),
+                                   '--workers', str(workers)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                  env=dict(os.environ, YOUTUBE_WATCH_URL=stub.watch_url))
+        try:
+            deadline = time.time() + timeout
+            while True:
+                try:
+                    urllib.request.urlopen('http://127.0.0.1:{}/api/'.format(port), timeout=5).read()
+                    break
+                except OSError:
+                    if time.time() > deadline or server.poll() is not None:
+                        raise RuntimeError('serve.py did not start')
+                    time.sleep(0.5)
+
+            url = 'http://127.0.0.1:{}/summarize/?id=short-clip&percent=20&choice=all'.format(port)
+            with ThreadPoolExecutor(max_workers=max(pool_requests, 1)) as executor:
+                list(executor.map(lambda _: urllib.request.urlopen(url, timeout=timeout).read(), range(pool_requests)))
+
+            # Pool processes (and their resource tracker) are the children of each worker.
+            return {'parent': memory_of(server.pid),
+                    'workers': [{'memory': memory_of(pid),
+                                 'pool': [memory for memory in map(memory_of, child_pids(pid)) if memory is not None]}
+                                for pid in child_pids(server.pid)]}
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold start time and memory per worker.')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=4, help='pre-forked workers started (0 to skip)')
+    parser.add_argument('--pool-requests', type=int, help='choice=all requests sent to start the summarizer pools '
+                                                          '(default: two per worker)')
+    parser.add_argument('--output', help='JSON file receiving the results')
+    arguments = parser.parse_args()
+
+    results = {'lazy': measure_startup(False, arguments.repeats),
+               'preload': measure_startup(True, arguments.repeats)}
+    for name in ('lazy', 'preload'):
+        result = results[name]
+        print('{:<8} import {:.3f}s  create_app {:.3f}s  modules {:>5}  peak RSS {:.0f} MB'.format(
+            name, result['import_s'], result['create_app_s'], result['modules'], result['peak_rss_mb']))
+
+    if arguments.workers > 0 and sys.platform.startswith('linux'):
+        pool_requests = 2 * arguments.workers if arguments.pool_requests is None else arguments.pool_requests
+        prefork = results['prefork'] = measure_prefork(arguments.workers, pool_requests)
+        processes = [('parent', prefork['parent'])]
+        for worker in prefork['workers']:
+            processes += [('worker', worker['memory'])] + [('  pool', memory) for memory in worker['pool']]
+        for name, memory in processes:
+            print('{:<8} RSS {:>6.0f} MB  PSS {:>6.0f} MB  shared {:>6.0f} MB  private {:>6.0f} MB'.format(
+                name, memory['rss_mb'], memory['pss_mb'], memory['shared_mb'], memory['private_mb']))
+        print('total    PSS {:>6.0f} MB in {} processes'.format(sum(memory['pss_mb'] for _, memory in processes),
+                                                                len(processes)))
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
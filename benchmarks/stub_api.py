@@ -0,0 +1,48 @@
+# Local Stand-in for YouTubeTranscriptApi
+# Serves the transcripts of a corpus (benchmarks/corpus.py) in place of YouTube, so the whole application can be
+# benchmarked offline: video ids are the corpus names, any other id raises TranscriptsDisabled.
+
+# YouTubeTranscriptAPI Imports
+from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled
+
+# Transcript Fetcher Import (fetcher.py)
+from fetcher import TranscriptFetcher
+
+# Other Imports
+from contextlib import contextmanager
+from unittest import mock
+import time
+
+
+class StubTranscriptApi:
+    # get_transcript has the signature of YouTubeTranscriptApi.get_transcript. latency seconds are slept on every
+    # call to imitate the round trips to YouTube.
+    def __init__(self, transcripts, latency=0):
+        self.transcripts = transcripts
+        self.latency = latency
+        self.calls = 0
+
+    def get_transcript(self, video_id, languages=('en',), proxies=None, cookies=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if video_id not in self.transcripts:
+            raise TranscriptsDisabled(video_id)
+        # Copies, as the real API returns new segments every time.
+        return [dict(segment) for segment in self.transcripts[video_id]]
+
+
+@contextmanager
+def patch_transcript_api(transcripts, latency=0):
+    # Within the with statement, TranscriptFetcher.fetch (every fetch of the application) and
+    # YouTubeTranscriptApi.get_transcript serve transcripts without any HTTP request, for benchmarks of the pipeline.
+    # benchmarks/stub_server.py serves them over HTTP instead, to exercise the fetcher itself. Yields the
+    # StubTranscriptApi.
+    stub = StubTranscriptApi(transcripts, latency)
+
+    def fetch(fetcher, video_id, languages=('en',)):
+        return stub.get_transcript(video_id, languages)
+
+    with mock.patch.object(YouTubeTranscriptApi, 'get_transcript', stub.get_transcript), \
+            mock.patch.object(TranscriptFetcher, 'fetch', fetch):
+        yield stub
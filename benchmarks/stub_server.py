@@ -0,0 +1,178 @@
+# Local Stub Transcript Server
+# An HTTP server answering like YouTube does to youtube_transcript_api: a watch page holding the caption tracks of the
+# video, and the transcript itself as timedtext XML. It serves the transcripts of a corpus (benchmarks/corpus.py), so
+# the transcript fetcher (fetcher.py) and the whole application can be run against it offline, with failures
+# injected on purpose: a latency, every Nth watch page answered with YouTube's rate limit page (TooManyRequests) and
+# a fraction of the requests answered with HTTP 503. Video ids are the corpus names, any other id has no transcript.
+# Run from the repository root, then point the application at it:
+#   python -m benchmarks.stub_server --port 8001 --rate-limit-every 5
+#   YOUTUBE_WATCH_URL="http://127.0.0.1:8001/watch?v={video_id}" python serve.py
+
+# Benchmark Corpus Import (benchmarks/corpus.py)
+from benchmarks.corpus import load_corpus
+
+# Other Imports
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape, quoteattr
+import argparse
+import json
+import random
+import threading
+import time
+
+# Page YouTube sends when it rate limits a client, recognized by youtube_transcript_api (which raises TooManyRequests).
+RATE_LIMIT_PAGE = '<html><body><form><div class="g-recaptcha"></div></form></body></html>'
+
+
+class StubTranscriptServer:
+    # Serves transcripts ({video id: list of segments}) on host:port (0 picks a free port). Usable as a context
+    # manager, which starts the server in a background thread and stops it on exit.
+    def __init__(self, transcripts, host='127.0.0.1', port=0, latency=0, rate_limit_every=0, error_rate=0, seed=0):
+        self.transcripts = transcripts
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # Requests received, by kind: watch pages, transcripts, rate limited and failed answers.
+        self.counts = {'watch': 0, 'timedtext': 0, 'rate_limited': 0, 'errors': 0}
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    @property
+    def watch_url(self):
+        # Value for TranscriptFetcher(watch_url=...) and YOUTUBE_WATCH_URL.
+        return self.base_url + '/watch?v={video_id}'
+
+    def _count(self, kind):
+        with self._lock:
+            self.counts[kind] += 1
+            return self.counts[kind]
+
+    def _failure(self, kind):
+        # Status and body of an injected failure for this request, or None.
+        with self._lock:
+            failed = self.error_rate and self._random.random() < self.error_rate
+        if failed:
+            self._count('errors')
+            return 503, 'Service Unavailable'
+        if kind == 'watch' and self.rate_limit_every and self.counts['watch'] % self.rate_limit_every == 0:
+            self._count('rate_limited')
+            return 200, RATE_LIMIT_PAGE
+        return None
+
+    def watch_page(self, video_id):
+        # Watch page of video_id: its caption track points back to this server. Videos outside of the corpus have a
+        # player but no captions, which youtube_transcript_api reports as TranscriptsDisabled.
+        player = {'playabilityStatus': {'status': 'OK'}}
+        if video_id in self.transcripts:
+            player['captions'] = {'playerCaptionsTracklistRenderer': {
+                'captionTracks': [{
+                    'baseUrl': '{}/api/timedtext?v={}'.format(self.base_url, video_id),
+                    'name': {'simpleText': 'English'},
+                    'languageCode': 'en',
+                    'isTranslatable': False,
+                }],
+                'translationLanguages': [],
+            }}
+        player['videoDetails'] = {'videoId': video_id}
+        return '<html><body><script>var ytInitialPlayerResponse = {};</script></body></html>'.format(
+            json.dumps(player, separators=(',', ':')))
+
+    def timedtext(self, video_id):
+        # Transcript of video_id as YouTube's timedtext XML.
+        lines = ['<?xml version="1.0" encoding="utf-8" ?><transcript>']
+        for segment in self.transcripts.get(video_id, []):
+            lines.append('<text start={} dur={}>{}</text>'.format(
+                quoteattr(str(segment['start'])), quoteattr(str(segment.get('duration', 0))), escape(segment['text'])))
+        lines.append('</transcript>')
+        return ''.join(lines)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                video_id = parse_qs(url.query).get('v', [''])[0]
+                if url.path == '/watch':
+                    kind, content_type = 'watch', 'text/html; charset=utf-8'
+                elif url.path == '/api/timedtext':
+                    kind, content_type = 'timedtext', 'text/xml; charset=utf-8'
+                elif url.path == '/stats':
+                    return self.answer(200, json.dumps(stub.counts), 'application/json')
+                else:
+                    return self.answer(404, 'Not Found', 'text/plain')
+
+                stub._count(kind)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                failure = stub._failure(kind)
+                if failure is not None:
+                    return self.answer(failure[0], failure[1], 'text/html; charset=utf-8')
+                body = stub.watch_page(video_id) if kind == 'watch' else stub.timedtext(video_id)
+                self.answer(200, body, content_type)
+
+            def answer(self, status, body, content_type):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                # Quiet: benchmarks send thousands of requests.
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name='stub-transcript-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the benchmark corpus like YouTube serves transcripts.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=0, help='seconds slept before every answer')
+    parser.add_argument('--rate-limit-every', type=int, default=0, help='answer every Nth watch page as rate limited')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests answered with HTTP 503')
+    parser.add_argument('--max-minutes', type=int, help='leave out bundled transcripts longer than this')
+    parser.add_argument('--corpus-dir', help='directory of extra transcripts (*.json lists of segments)')
+    arguments = parser.parse_args()
+
+    stub = StubTranscriptServer(load_corpus(arguments.corpus_dir, arguments.max_minutes), arguments.host,
+                                arguments.port, arguments.latency, arguments.rate_limit_every, arguments.error_rate)
+    print('Serving {} transcripts, YOUTUBE_WATCH_URL={}'.format(len(stub.transcripts), stub.watch_url))
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,334 @@
+# Cache Backends, Transcript Cache and Result Cache (Used by app.py)
+# YouTubeTranscriptAPI Imports
+from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled, \
+    NoTranscriptAvailable
+
+# Other Imports
+from collections import OrderedDict
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class MemoryBackend:
+    # In-process store with a size limit, per-entry expiry and least-recently-used eviction.
+    # Values are kept as they are, so they must not be modified by the caller after being stored.
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # Returns (value, expires_at) or None if the key is missing or expired.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return None
+            # Marking entry as most recently used
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            # Evicting least recently used entries above the size limit
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskBackend:
+    # SQLite store that survives restarts and is shared by every worker process using the same file.
+    # Values are stored as JSON, entries are evicted by last access time once above the size limit. Stores sharing a
+    # file use tables of their own, each with its own size limit.
+    def __init__(self, path, max_entries, table='entries'):
+        self.path = path
+        self.max_entries = max_entries
+        self.table = table
+        self.evictions = 0
+        # SQLite connections can not be shared between threads, each waitress thread opens its own.
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            self._execute(connection, 'CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                                      'expires_at REAL NOT NULL, accessed_at REAL NOT NULL)')
+            self._execute(connection, 'CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)')
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            # Write-ahead logging lets readers in other processes continue while one process writes.
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def _execute(self, connection, statement, parameters=()):
+        # Runs statement on the table of this store ({table} in statement).
+        return connection.execute(statement.format(table=self.table), parameters)
+
+    def get(self, key):
+        now = time.time()
+        with self._connection() as connection:
+            row = self._execute(connection, 'SELECT value, expires_at FROM {table} WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._execute(connection, 'DELETE FROM {table} WHERE key = ?', (key,))
+                return None
+            self._execute(connection, 'UPDATE {table} SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0]), row[1]
+
+    def expires_at(self, key):
+        # Expiry time of key, or None if it is missing. Reads no value and updates nothing.
+        row = self._execute(self._connection(), 'SELECT expires_at FROM {table} WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, key, value, expires_at):
+        with self._connection() as connection:
+            self._execute(connection, 'INSERT OR REPLACE INTO {table} (key, value, expires_at, accessed_at) '
+                                      'VALUES (?, ?, ?, ?)', (key, json.dumps(value), expires_at, time.time()))
+            # Evicting least recently used entries above the size limit
+            overflow = self._execute(connection, 'SELECT COUNT(*) FROM {table}').fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._execute(connection, 'DELETE FROM {table} WHERE key IN '
+                                          '(SELECT key FROM {table} ORDER BY accessed_at ASC LIMIT ?)', (overflow,))
+                self.evictions += overflow
+
+    def delete(self, key):
+        with self._connection() as connection:
+            self._execute(connection, 'DELETE FROM {table} WHERE key = ?', (key,))
+
+    def delete_prefix(self, prefix):
+        # substr rather than LIKE, since "_" (common in video ids) is a LIKE wildcard.
+        with self._connection() as connection:
+            self._execute(connection, 'DELETE FROM {table} WHERE substr(key, 1, ?) = ?', (len(prefix), prefix))
+
+    def clear(self):
+        with self._connection() as connection:
+            self._execute(connection, 'DELETE FROM {table}')
+
+    def __len__(self):
+        return self._execute(self._connection(), 'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+
+class TieredCache:
+    # Memory backend in front of an optional disk backend. Disk hits are copied into memory for the remaining lifetime.
+    # With a disk backend, a memory hit is only used while the disk holds the same entry (the same expiry time): entries
+    # deleted or purged by another worker process, or replaced by it, are not served from this process's memory.
+    # Without one, each worker process has its own cache and deletes only reach the process handling them.
+    def __init__(self, max_entries, path=None, max_disk_entries=None, table='entries'):
+        self.memory = MemoryBackend(max_entries)
+        self.disk = DiskBackend(path, max_disk_entries or max_entries * 16, table) if path else None
+
+    def get(self, key):
+        entry = self.get_with_expiry(key)
+        return None if entry is None else entry[0]
+
+    def get_with_expiry(self, key):
+        # Returns (value, expires_at) or None.
+        entry = self.memory.get(key)
+        if entry is not None and self.disk is not None and self.disk.expires_at(key) != entry[1]:
+            self.memory.delete(key)
+            entry = None
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, entry[0], entry[1])
+        return entry
+
+    def set(self, key, value, ttl):
+        self.set_until(key, value, time.time() + ttl)
+
+    def set_until(self, key, value, expires_at):
+        self.memory.set(key, value, expires_at)
+        if self.disk is not None:
+            self.disk.set(key, value, expires_at)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def delete_prefix(self, prefix):
+        # Removes every entry whose key starts with prefix.
+        self.memory.delete_prefix(prefix)
+        if self.disk is not None:
+            self.disk.delete_prefix(prefix)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        stats = {'memory_entries': len(self.memory), 'memory_evictions': self.memory.evictions}
+        if self.disk is not None:
+            stats.update(disk_entries=len(self.disk), disk_evictions=self.disk.evictions)
+        return stats
+
+
+# Errors which will not change for a while: these are cached (with a shorter lifetime) so that repeated requests for
+# the same video do not reach YouTube again. Each entry rebuilds the exception raised on a cache hit.
+NEGATIVE_CACHE_ERRORS = {
+    'TranscriptsDisabled': lambda video_id, languages: TranscriptsDisabled(video_id),
+    'NoTranscriptAvailable': lambda video_id, languages: NoTranscriptAvailable(video_id),
+    'NoTranscriptFound': lambda video_id, languages: NoTranscriptFound(video_id, languages, []),
+}
+
+
+class TranscriptCache:
+    # Cache in front of YouTubeTranscriptApi.get_transcript, keyed by video id and requested languages. Sentence
+    # rankings (one per algorithm and video) are kept in a store of their own, with its own size limit
+    # (max_ranking_entries), so that they do not evict the transcripts they were computed from.
+    def __init__(self, max_entries=256, ttl=6 * 60 * 60, negative_ttl=15 * 60, path=None, max_disk_entries=None,
+                 max_ranking_entries=1536):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.store = TieredCache(max_entries, path, max_disk_entries)
+        self.rankings = TieredCache(max_ranking_entries, path, table='rankings')
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(video_id, languages):
+        return 'transcript:{}:{}'.format(video_id, ','.join(languages))
+
+    def _count(self, counter):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _get_entry(self, video_id, languages, fetch):
+        # Returns (key, entry, expires_at) of video_id, fetching (and caching) the transcript on a miss with fetch,
+        # which defaults to YouTubeTranscriptApi.get_transcript. Cached errors are raised again like it would.
+        languages = tuple(languages)
+        key = self.make_key(video_id, languages)
+
+        cached = self.store.get_with_expiry(key)
+        if cached is not None:
+            entry, expires_at = cached
+            if 'error' in entry:
+                self._count('negative_hits')
+                raise NEGATIVE_CACHE_ERRORS[entry['error']](video_id, languages)
+            self._count('hits')
+            return key, entry, expires_at
+
+        self._count('misses')
+        if fetch is None:
+            fetch = YouTubeTranscriptApi.get_transcript
+        try:
+            transcript = fetch(video_id, languages=languages)
+        except (TranscriptsDisabled, NoTranscriptAvailable, NoTranscriptFound) as error:
+            self.store.set(key, {'error': type(error).__name__}, self.negative_ttl)
+            raise
+        entry = {'transcript': transcript}
+        expires_at = time.time() + self.ttl
+        self.store.set_until(key, entry, expires_at)
+        return key, entry, expires_at
+
+    def get_transcript(self, video_id, languages=('en',), fetch=None):
+        # Returns the cached transcript of video_id.
+        return self._get_entry(video_id, languages, fetch)[1]['transcript']
+
+    def get_document(self, video_id, build, languages=('en',), fetch=None):
+        # Returns the preprocessed document of video_id. It is built once with build(transcript), which must return a
+        # JSON serializable value, and stored next to the transcript until the transcript expires.
+        key, entry, expires_at = self._get_entry(video_id, languages, fetch)
+        if 'document' not in entry:
+            entry = dict(entry, document=build(entry['transcript']))
+            self.store.set_until(key, entry, expires_at)
+        return entry['document']
+
+    def get_ranking(self, video_id, choice, languages=('en',)):
+        # Returns the cached sentence ranking of video_id by the choice algorithm (see selection.py), or None.
+        return self.rankings.get('ranking:{}:{}:{}'.format(video_id, ','.join(languages), choice))
+
+    def set_ranking(self, video_id, choice, ranking, languages=('en',)):
+        # Stores a sentence ranking (a JSON serializable dict) until the transcript of video_id expires. Rankings are
+        # kept apart from the transcript entry, which is not written again for each algorithm.
+        cached = self.store.get_with_expiry(self.make_key(video_id, tuple(languages)))
+        if cached is not None:
+            self.rankings.set_until('ranking:{}:{}:{}'.format(video_id, ','.join(languages), choice), ranking,
+                                    cached[1])
+
+    def purge(self, video_id=None, languages=('en',)):
+        # Removes one video (and its rankings) from the cache, or everything when no video id is given.
+        if video_id is None:
+            self.store.clear()
+            self.rankings.clear()
+        else:
+            self.store.delete(self.make_key(video_id, tuple(languages)))
+            self.rankings.delete_prefix('ranking:{}:{}:'.format(video_id, ','.join(languages)))
+
+    def stats(self):
+        stats = {'hits': self.hits, 'misses': self.misses, 'negative_hits': self.negative_hits}
+        stats.update(self.store.stats())
+        stats['rankings'] = self.rankings.stats()
+        return stats
+
+
+class ResultCache:
+    # Cache of successful summaries (the response object of /summarize/), keyed by video id, budget and choices.
+    # Repeated requests for a popular video with the same settings skip the transcript cache and the summarizers.
+    def __init__(self, max_entries=1024, ttl=6 * 60 * 60, path=None, max_disk_entries=None):
+        self.ttl = ttl
+        self.store = TieredCache(max_entries, path, max_disk_entries)
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(video_id, budget, choices):
+        # budget is a SummaryBudget (selection.py): "20" and "020" percent share their entry.
+        return 'result:{}:{}:{}'.format(video_id, budget.key(), ','.join(choices))
+
+    def _count(self, counter):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, video_id, budget, choices):
+        # Returns the cached response object, or None.
+        response = self.store.get(self.make_key(video_id, budget, choices))
+        self._count('misses' if response is None else 'hits')
+        return response
+
+    def set(self, video_id, budget, choices, response):
+        self.store.set(self.make_key(video_id, budget, choices), response, self.ttl)
+
+    def purge(self, video_id=None):
+        # Removes every result of one video (whatever budget and choice), or everything when no video id is given.
+        if video_id is None:
+            self.store.clear()
+        else:
+            self.store.delete_prefix('result:{}:'.format(video_id))
+
+    def stats(self):
+        stats = {'hits': self.hits, 'misses': self.misses}
+        stats.update(self.store.stats())
+        return stats
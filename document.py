@@ -0,0 +1,69 @@
+# Preprocessed Transcript Document (Used by app.py and summarizer.py)
+# Transcript Index Import (Our Another File: transcript_index.py)
+from transcript_index import TranscriptIndex
+
+
+class TranscriptDocument:
+    # Sentence and word tokenization of one transcript, done once and shared by every summarizer.
+    # Word tokens are stored flat: the tokens of sentence i are tokens[sentence_bounds[i]:sentence_bounds[i + 1]].
+    # Every field is a plain list, so the document can be stored as JSON next to the cached transcript. index holds the
+    # timestamps of the segments the text was formatted from (TranscriptIndex), when they are known.
+    def __init__(self, text, sentences, tokens, lower_tokens, stop_mask, sentence_bounds, index=None):
+        self.text = text
+        self.sentences = sentences
+        self.tokens = tokens
+        self.lower_tokens = lower_tokens
+        self.stop_mask = stop_mask
+        self.sentence_bounds = sentence_bounds
+        self.index = index
+
+    @classmethod
+    def from_text(cls, text, stop_words, segments=None):
+        # Sentence tokenizing the text, then word tokenizing each sentence. Since word_tokenize() sentence tokenizes
+        # before splitting words, the flat token list is the same as word_tokenize(text) would return.
+        # NLTK is imported on first use (see summarizer.py), loading the punkt model along with it.
+        from nltk.tokenize import sent_tokenize, word_tokenize
+        sentences = sent_tokenize(text)
+        tokens = []
+        sentence_bounds = [0]
+        for sentence in sentences:
+            tokens.extend(word_tokenize(sentence, preserve_line=True))
+            sentence_bounds.append(len(tokens))
+
+        # Lowercase forms and stop word mask, computed once for all the frequency based summarizers.
+        lower_tokens = [token.lower() for token in tokens]
+        stop_mask = [token in stop_words for token in lower_tokens]
+        index = TranscriptIndex.build(segments, text, sentences) if segments is not None else None
+        return cls(text, sentences, tokens, lower_tokens, stop_mask, sentence_bounds, index)
+
+    def sentence_tokens(self, index):
+        # Word tokens of the sentence at index.
+        return self.tokens[self.sentence_bounds[index]:self.sentence_bounds[index + 1]]
+
+    def timeline(self, summary_sentences):
+        # Summary sentences with the time they are spoken at (see TranscriptIndex.timeline), or None when the document
+        # has no index (documents cached before it was added).
+        if self.index is None:
+            return None
+        return self.index.timeline(self, summary_sentences)
+
+    def __len__(self):
+        # Number of sentences in the document.
+        return len(self.sentences)
+
+    def to_dict(self):
+        return {
+            'text': self.text,
+            'sentences': self.sentences,
+            'tokens': self.tokens,
+            'lower_tokens': self.lower_tokens,
+            'stop_mask': self.stop_mask,
+            'sentence_bounds': self.sentence_bounds,
+            'index': self.index.to_dict() if self.index is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        index = TranscriptIndex.from_dict(data['index']) if data.get('index') else None
+        return cls(data['text'], data['sentences'], data['tokens'], data['lower_tokens'], data['stop_mask'],
+                   data['sentence_bounds'], index)
@@ -0,0 +1,208 @@
+# Transcript Fetcher (Used by app.py)
+# YouTubeTranscriptApi.get_transcript opens a new requests.Session (new TCP and TLS connections) for every video, and
+# calls YouTube as often as it is called: a burst of requests turns straight into TooManyRequests errors. Every
+# transcript fetch of the application goes through one TranscriptFetcher instead, which:
+#  * keeps one Session for all of them, reusing pooled keep-alive connections to YouTube;
+#  * limits outbound HTTP requests with a token bucket (rate per second, with bursts) and the number of transcripts
+#    fetched at the same time, callers waiting their turn in between;
+#  * retries rate limited (TooManyRequests, HTTP 429), failed (HTTP 5xx) and broken requests after an exponential
+#    backoff with full jitter, so that waiting callers do not all retry at the same moment;
+#  * coalesces concurrent fetches of the same video: one upstream fetch, whose result (or error) every caller gets;
+#  * reports its queue depth and counters (stats()).
+# watch_url points it at another server than YouTube, such as benchmarks/stub_server.py.
+
+# YouTubeTranscriptAPI Imports
+from youtube_transcript_api import TooManyRequests, YouTubeRequestFailed
+from youtube_transcript_api._settings import WATCH_URL
+from youtube_transcript_api._transcripts import TranscriptListFetcher
+
+# Requests Imports
+import requests
+from requests.adapters import HTTPAdapter
+
+# Other Imports
+from concurrent.futures import Future
+import random
+import threading
+import time
+
+
+class FetcherBusy(Exception):
+    # Raised when a fetch waited longer than queue_timeout for the rate limit or for a free connection.
+    pass
+
+
+class TokenBucket:
+    # Allows rate acquisitions per second on average, and up to burst of them at once after a quiet period.
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        # Takes one token, waiting for it if needed. Returns False if none was available within timeout seconds.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                if now + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+
+def is_retryable(error):
+    # Errors worth another try: rate limiting, server errors and network failures. Missing transcripts are not.
+    if isinstance(error, (TooManyRequests, requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, YouTubeRequestFailed):
+        # Raised while handling the requests.HTTPError, which holds the response (the transcript API swaps the
+        # arguments of YouTubeRequestFailed, so its reason is not the HTTP error).
+        response = getattr(error.__context__, 'response', None)
+        return response is not None and (response.status_code == 429 or response.status_code >= 500)
+    return False
+
+
+class TranscriptFetcher:
+    # fetch has the same signature and result as YouTubeTranscriptApi.get_transcript, so it can be given to
+    # TranscriptCache as its fetch function.
+    #  * pool_size: connections kept open per host, and transcripts fetched at the same time;
+    #  * rate, burst: outbound HTTP requests per second, and how many can be sent at once (a fetch sends two);
+    #  * retries, backoff, max_backoff: attempts after the first one, and the bounds (seconds) of the backoff, which
+    #    doubles after each attempt;
+    #  * queue_timeout: seconds a fetch may wait for its turn before FetcherBusy is raised.
+    def __init__(self, pool_size=10, timeout=30, rate=5.0, burst=10, retries=3, backoff=0.5, max_backoff=8.0,
+                 queue_timeout=30, watch_url=None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.queue_timeout = queue_timeout
+        self.watch_url = watch_url
+        self.bucket = TokenBucket(rate, burst)
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._random = random.Random()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Every request of the session waits for a token and is sent with the timeout (the transcript API sets none).
+        self.session.request = self._limited_request(self.session.request)
+
+        # Fetches in progress by (video id, languages), and the counters reported by stats().
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.upstream_fetches = 0
+        self.coalesced = 0
+        self.retried = 0
+        self.rejected = 0
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _limited_request(self, request):
+        watch_prefix = WATCH_URL.format(video_id='')
+
+        def limited_request(method, url, **kwargs):
+            if self.watch_url and url.startswith(watch_prefix):
+                url = self.watch_url.format(video_id=url[len(watch_prefix):])
+            self._count('queued')
+            try:
+                acquired = self.bucket.acquire(self.queue_timeout)
+            finally:
+                self._count('queued', -1)
+            if not acquired:
+                self._count('rejected')
+                raise FetcherBusy('Rate limit queue is full.')
+            kwargs.setdefault('timeout', self.timeout)
+            return request(method, url, **kwargs)
+        return limited_request
+
+    def _fetch_upstream(self, video_id, languages):
+        # One attempt: the watch page, then the transcript itself.
+        return TranscriptListFetcher(self.session).fetch(video_id).find_transcript(languages).fetch()
+
+    def _fetch_with_retries(self, video_id, languages):
+        attempt = 0
+        while True:
+            self._count('queued')
+            try:
+                acquired = self._slots.acquire(timeout=self.queue_timeout)
+            finally:
+                self._count('queued', -1)
+            if not acquired:
+                self._count('rejected')
+                raise FetcherBusy('No free connection to fetch transcripts.')
+
+            self._count('active')
+            try:
+                self._count('upstream_fetches')
+                return self._fetch_upstream(video_id, languages)
+            except Exception as error:
+                if attempt >= self.retries or not is_retryable(error):
+                    raise
+            finally:
+                self._count('active', -1)
+                self._slots.release()
+
+            # Full jitter: a random wait up to the exponential backoff, outside of the connection slot.
+            self._count('retried')
+            time.sleep(self._random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+            attempt += 1
+
+    def fetch(self, video_id, languages=('en',)):
+        # The transcript of video_id in the first available language of languages, as a list of segments. Callers
+        # asking for a video which is already being fetched wait for that fetch instead of starting another one.
+        key = (video_id, tuple(languages))
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            transcript = self._fetch_with_retries(video_id, languages)
+            future.set_result(transcript)
+            return transcript
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    @property
+    def queue_depth(self):
+        # Fetches and requests waiting for a free connection or for the rate limit.
+        return self.queued
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self.queued,
+                'active': self.active,
+                'in_flight_videos': len(self._in_flight),
+                'upstream_fetches': self.upstream_fetches,
+                'coalesced': self.coalesced,
+                'retried': self.retried,
+                'rejected': self.rejected,
+            }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,351 @@
+# Per-request Resource Guard (Used by app.py)
+# One huge transcript given to a costly algorithm (dense TextRank or LSA, whose memory grows with the square of the
+# sentence count) can push a worker process to gigabytes and get it killed, along with every other request it serves.
+# Before running an algorithm, the guard estimates its memory and time from the character and sentence counts of the
+# transcript. An algorithm which would not fit in the memory and time budgets is replaced by a cheaper one
+# (FALLBACKS), or the request fails at once with ResourceBudgetExceeded when none fits. Costly algorithms run in an
+# isolated subprocess, which is killed as soon as it uses more memory or time than the budgets: only that request fails
+# (or falls back), the worker process is left untouched.
+# Isolated subprocesses are not forked from the worker process: its request threads may hold locks (imports, stdout,
+# the registry) at that moment, which would stay locked in the subprocess. They are forked by a helper process
+# (IsolationServer), itself forked when the guard is created, before the worker starts any thread.
+
+# Summarizer Import (Our Another File: summarizer.py)
+from summarizer import RANKERS
+
+# Summarizer Timeout Import (Our Another File: workers.py)
+from workers import SummarizerTimeout
+
+# Preprocessed Document Import (Our Another File: document.py)
+from document import TranscriptDocument
+
+# Other Imports
+from multiprocessing.connection import Connection
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import weakref
+
+# Cost model of every algorithm, measured on the benchmark corpus (benchmarks/corpus.py) with peak RSS: estimated
+# memory (MB) and time (seconds) are each base + a * thousands of characters + b * thousands of sentences
+# + c * (thousands of sentences) ** 2, with (base, a, b, c) below. Dense TextRank and LSA grow with the square of the
+# sentence count, in long document mode (long_document.py) they use LONG_DOCUMENT_COSTS instead. gensim's dense
+# TextRank (a graph of Python objects) was not measured with the others and is given conservative values.
+COSTS = {
+    'gensim-sum': {'memory': (20, 0, 0, 150), 'seconds': (0.2, 0, 0, 12)},
+    'spacy-sum': {'memory': (12, 0.013, 0, 0), 'seconds': (0.05, 0.0013, 0, 0)},
+    'nltk-sum': {'memory': (4, 0.004, 0, 0), 'seconds': (0.01, 0.00025, 0, 0)},
+    'sumy-lsa-sum': {'memory': (10, 0, 0, 70), 'seconds': (0.1, 0, 0, 4.2)},
+    'sumy-luhn-sum': {'memory': (1, 0, 1.1, 0), 'seconds': (0.05, 0, 0.9, 0.05)},
+    'sumy-text-rank-sum': {'memory': (5, 0, 0, 22), 'seconds': (0.1, 0, 0, 5)},
+}
+LONG_DOCUMENT_COSTS = {
+    'gensim-sum': {'memory': (52, 0, 0.3, 0), 'seconds': (0.1, 0, 0, 0.02)},
+    'sumy-lsa-sum': {'memory': (13, 0, 3.5, 0), 'seconds': (0.8, 0, 0.06, 0)},
+    'sumy-text-rank-sum': {'memory': (52, 0, 0.3, 0), 'seconds': (0.1, 0, 0, 0.02)},
+}
+
+# Cheaper algorithm used in place of each one when it does not fit in the budgets. nltk-sum, the frequency scoring of
+# the already tokenized transcript, is the cheapest: it has no fallback.
+FALLBACKS = {
+    'gensim-sum': 'sumy-text-rank-sum',  # TextRank as well, on a numpy matrix (or sparse graph) instead of objects
+    'sumy-text-rank-sum': 'nltk-sum',
+    'sumy-lsa-sum': 'nltk-sum',
+    'sumy-luhn-sum': 'nltk-sum',
+    'spacy-sum': 'nltk-sum',  # The same frequency scoring, on the NLTK tokens of the document
+}
+
+# Isolation modes: "auto" isolates the algorithms estimated to need over ISOLATION_SHARE of a budget, "always" every
+# algorithm, "never" none (only the estimates are checked). Isolation needs os.fork, so it is off on Windows.
+ISOLATION_MODES = ('auto', 'always', 'never')
+ISOLATION_SHARE = 0.25
+ISOLATION_AVAILABLE = 'fork' in multiprocessing.get_all_start_methods()
+
+# Seconds between two memory checks of an isolated subprocess.
+POLL_INTERVAL = 0.02
+
+# Seconds between two checks of the isolation server that the process which started it is still running.
+SERVER_CHECK_INTERVAL = 1
+
+# Seconds an isolated subprocess may take to start, the isolation server warming up the registry when it starts. This
+# wait is not part of the algorithm's time budget.
+SUBPROCESS_START_TIMEOUT = 120
+
+
+class ResourceBudgetExceeded(Exception):
+    # Raised when an algorithm needs (or used) more memory or time than the budgets, and no cheaper one fits.
+    pass
+
+
+class CostEstimate:
+    # Estimated peak memory (MB, on top of the worker process) and time (seconds) of one algorithm on one transcript.
+    def __init__(self, memory_mb, seconds):
+        self.memory_mb = memory_mb
+        self.seconds = seconds
+
+    def fits(self, memory_mb, seconds):
+        return self.memory_mb <= memory_mb and self.seconds <= seconds
+
+
+def _evaluate(coefficients, kilo_characters, kilo_sentences):
+    base, per_character, per_sentence, per_sentence_pair = coefficients
+    return base + per_character * kilo_characters + per_sentence * kilo_sentences \
+        + per_sentence_pair * kilo_sentences ** 2
+
+
+def private_memory_mb(pid):
+    # Memory only process pid uses (pages it wrote since it was forked, and its own allocations) in MB, read from
+    # /proc. None where /proc does not give it.
+    try:
+        with open('/proc/{}/smaps_rollup'.format(pid)) as file:
+            kilobytes = sum(int(line.split()[1]) for line in file
+                            if line.startswith(('Private_Clean:', 'Private_Dirty:')))
+    except (OSError, ValueError, IndexError):
+        return None
+    return kilobytes / 1024
+
+
+def _run_isolated_ranker(connection, choice, document, registry):
+    # Runs in the isolated subprocess: sends back (ranking dict, seconds), or (exception, seconds) if it failed.
+    start_time = time.perf_counter()
+    try:
+        result = RANKERS[choice](document.text, registry, document).to_dict()
+    except Exception as error:
+        result = error
+    try:
+        connection.send((result, time.perf_counter() - start_time))
+    except Exception as error:
+        # Exception which can not be pickled.
+        connection.send((RuntimeError(repr(error)), time.perf_counter() - start_time))
+    connection.close()
+
+
+def _serve_isolated(server_socket, registry, parent_pid):
+    # Runs in the isolation server: forks one isolated subprocess per connection, until the process which started it
+    # ends. The registry is warmed up first, so every subprocess starts with the models loaded; connections made
+    # meanwhile wait in the socket's backlog. Subprocesses are reaped by the system (SIGCHLD ignored), their exit is
+    # seen by the worker as the end of the connection.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        registry.warm_up()
+    except Exception as error:
+        # Say the spaCy model is missing: the other objects are built by the subprocesses which need them.
+        print('Isolation server could not warm up the summarizer registry: {}'.format(error))
+        sys.stdout.flush()
+    server_socket.settimeout(SERVER_CHECK_INTERVAL)
+    while os.getppid() == parent_pid:
+        try:
+            client, _ = server_socket.accept()
+        except (socket.timeout, InterruptedError):
+            continue
+        client.setblocking(True)
+        if os.fork() == 0:
+            # Isolated subprocess: sends its pid, then receives the algorithm and the document to rank.
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            server_socket.close()
+            try:
+                connection = Connection(client.detach())
+                connection.send(os.getpid())
+                choice, document_data = connection.recv()
+                _run_isolated_ranker(connection, choice, TranscriptDocument.from_dict(document_data), registry)
+            finally:
+                os._exit(0)
+        client.close()
+
+
+class IsolationServer:
+    # Helper process forking the isolated subprocesses of every worker process (with pre-forked workers, of all of
+    # them): it must be started while the process starting it has a single thread. Workers connect to it through a
+    # Unix socket in a directory only this user can read.
+    def __init__(self, registry):
+        if threading.active_count() > 1:
+            print('Warning: isolation server started by a process with {} threads'.format(threading.active_count()))
+            sys.stdout.flush()
+        self._directory = tempfile.mkdtemp(prefix='ytsum-guard-')
+        self.address = os.path.join(self._directory, 'socket')
+        server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server_socket.bind(self.address)
+        server_socket.listen(64)
+        self.process = multiprocessing.get_context('fork').Process(
+            target=_serve_isolated, args=(server_socket, registry, os.getpid()), name='isolation-server', daemon=True)
+        self.process.start()
+        server_socket.close()
+        # The socket directory is removed when the server object is dropped or at exit.
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self._directory, True)
+
+    def connect(self):
+        # Connection to a new isolated subprocess.
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client.connect(self.address)
+        except OSError:
+            client.close()
+            raise
+        return Connection(client.detach())
+
+    def close(self):
+        # Stops the server, from the process which started it.
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self._finalizer()
+
+
+class ResourceGuard:
+    # Checks and enforces the memory_mb and seconds budgets of the algorithms run for a request. registry is the
+    # SummarizerRegistry of the worker process: isolated subprocesses are forked with it, through an IsolationServer
+    # started here (the guard must be created before the process starts threads).
+    def __init__(self, registry, memory_mb=512, seconds=60, isolation='auto'):
+        if isolation not in ISOLATION_MODES:
+            raise ValueError('isolation must be one of {}.'.format(', '.join(ISOLATION_MODES)))
+        self.registry = registry
+        self.memory_mb = memory_mb
+        self.seconds = seconds
+        self.isolation = isolation if ISOLATION_AVAILABLE else 'never'
+        self.server = IsolationServer(registry) if self.isolation != 'never' else None
+        # Memory of isolated subprocesses is read from /proc: where it can not be, only their time is limited.
+        self.memory_enforced = private_memory_mb(os.getpid()) is not None
+        if self.server is not None and not self.memory_enforced:
+            print('Warning: /proc/<pid>/smaps_rollup can not be read, the memory of isolated algorithms is not limited')
+            sys.stdout.flush()
+        # Counters reported by stats().
+        self._lock = threading.Lock()
+        self.fallbacks = 0
+        self.rejected = 0
+        self.isolated = 0
+        self.killed = 0
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def estimate(self, choice, document):
+        # CostEstimate of running choice on document (a TranscriptDocument).
+        sentences = len(document.sentences)
+        costs = COSTS[choice]
+        if choice in LONG_DOCUMENT_COSTS and sentences > self.registry.long_document_sentences:
+            costs = LONG_DOCUMENT_COSTS[choice]
+        kilo_characters = len(document.text) / 1000
+        kilo_sentences = sentences / 1000
+        return CostEstimate(_evaluate(costs['memory'], kilo_characters, kilo_sentences),
+                            _evaluate(costs['seconds'], kilo_characters, kilo_sentences))
+
+    def _first_fitting(self, algorithm, document):
+        # algorithm, or the first of its fallbacks, whose estimate fits in the budgets. None if none does.
+        while algorithm is not None and not self.estimate(algorithm, document).fits(self.memory_mb, self.seconds):
+            algorithm = FALLBACKS.get(algorithm)
+        return algorithm
+
+    def plan(self, choice, document):
+        # Algorithm to run for choice: choice itself when its estimate fits in the budgets, else the first of its
+        # fallbacks which fits. Raises ResourceBudgetExceeded when none does.
+        algorithm = self._first_fitting(choice, document)
+        if algorithm is None:
+            self._count('rejected')
+            estimate = self.estimate(choice, document)
+            raise ResourceBudgetExceeded('{} needs about {:.0f} MB and {:.0f} seconds for this transcript ({} '
+                                         'sentences), over the budget of {:g} MB and {:g} seconds.'
+                                         .format(choice, estimate.memory_mb, estimate.seconds,
+                                                 len(document.sentences), self.memory_mb, self.seconds))
+        if algorithm != choice:
+            self._count('fallbacks')
+        return algorithm
+
+    def fallback(self, algorithm, document):
+        # Algorithm to run after algorithm went over the budgets while running, or None when it has no fallback
+        # which fits.
+        fallback = self._first_fitting(FALLBACKS.get(algorithm), document)
+        if fallback is not None:
+            self._count('fallbacks')
+        return fallback
+
+    def isolates(self, algorithm, document):
+        # Whether algorithm should run in an isolated subprocess for document.
+        if self.server is None:
+            return False
+        if self.isolation != 'auto':
+            return self.isolation == 'always'
+        estimate = self.estimate(algorithm, document)
+        return not estimate.fits(self.memory_mb * ISOLATION_SHARE, self.seconds * ISOLATION_SHARE)
+
+    def run_isolated(self, algorithm, document, seconds=None):
+        # Ranks document with algorithm in an isolated subprocess, within the memory budget and seconds (the time
+        # budget by default). Returns (ranking dict, seconds) like SummarizerPool.run_many, or (exception, seconds) when
+        # the algorithm failed, used too much memory (ResourceBudgetExceeded) or time (SummarizerTimeout). The time
+        # budget starts once the subprocess is running: waiting for the isolation server to warm up is not part of it.
+        seconds = self.seconds if seconds is None else seconds
+        self._count('isolated')
+        start_time = time.perf_counter()
+        try:
+            connection = self.server.connect()
+        except OSError as error:
+            # Isolation server stopped: later algorithms run in the worker process.
+            print('Isolation server is not running ({}), isolation is turned off'.format(error))
+            sys.stdout.flush()
+            self.server = None
+            return RuntimeError('{} could not be isolated.'.format(algorithm)), time.perf_counter() - start_time
+
+        pid = None
+        stop = False
+        try:
+            while True:
+                if connection.poll(POLL_INTERVAL):
+                    try:
+                        message = connection.recv()
+                    except EOFError:
+                        # Subprocess ended without an answer (say killed by the system).
+                        return (RuntimeError('{} stopped without an answer.'.format(algorithm)),
+                                time.perf_counter() - start_time)
+                    if pid is None:
+                        # First message: the pid of the subprocess, which then waits for its work.
+                        pid = message
+                        connection.send((algorithm, document.to_dict()))
+                        start_time = time.perf_counter()
+                        continue
+                    return message
+
+                if pid is None:
+                    # Isolation server still warming up (or stuck): the algorithm has not started yet.
+                    if time.perf_counter() - start_time > SUBPROCESS_START_TIMEOUT:
+                        return (RuntimeError('{} could not be isolated: no subprocess started.'.format(algorithm)),
+                                time.perf_counter() - start_time)
+                    continue
+
+                used = private_memory_mb(pid)
+                if used is not None and used > self.memory_mb:
+                    self._count('killed')
+                    stop = True
+                    return (ResourceBudgetExceeded('{} used more than {:g} MB and was stopped.'
+                                                   .format(algorithm, self.memory_mb)),
+                            time.perf_counter() - start_time)
+                if time.perf_counter() - start_time > seconds:
+                    self._count('killed')
+                    stop = True
+                    return SummarizerTimeout('Timed out after {:g} seconds.'.format(seconds)), seconds
+        finally:
+            if stop and pid is not None:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            connection.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'memory_mb': self.memory_mb,
+                'seconds': self.seconds,
+                'isolation': self.isolation if self.server is not None else 'never',
+                'memory_enforced': self.memory_enforced,
+                'fallbacks': self.fallbacks,
+                'rejected': self.rejected,
+                'isolated': self.isolated,
+                'killed': self.killed,
+            }
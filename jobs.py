@@ -0,0 +1,128 @@
+# Background Summarization Jobs (Used by app.py)
+# Long transcripts can take longer to summarize than a client or a proxy is willing to wait for one HTTP answer. A job
+# runs the summarization in a bounded pool of background threads while the client polls its status. At most
+# max_pending jobs are queued or running at once, more are refused (HTTP 429) instead of piling up, and identical
+# requests arriving while a job is in flight are given that same job.
+
+# Other Imports
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import threading
+import time
+import uuid
+
+# Stages a job goes through, in order. Progress reported to the client is the position of the current stage.
+STAGES = ['queued', 'fetching', 'summarizing', 'finished']
+
+
+class JobQueueFull(Exception):
+    # Raised by JobManager.submit when max_pending jobs are already queued or running.
+    pass
+
+
+class Job:
+    # One summarization: its stage while it runs, then the response body and status code it produced.
+    def __init__(self, job_id, key):
+        self.id = job_id
+        self.key = key
+        self.stage = 'queued'
+        self.created_at = time.time()
+        self.finished_at = None
+        self.result = None
+        self.status_code = None
+
+    @property
+    def state(self):
+        # 'queued', 'running' or 'finished'
+        if self.stage == 'queued' or self.stage == 'finished':
+            return self.stage
+        return 'running'
+
+    def set_stage(self, stage):
+        self.stage = stage
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'state': self.state,
+            'stage': self.stage,
+            'progress': round(STAGES.index(self.stage) / (len(STAGES) - 1) * 100),
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            # Result of a finished job: the body and status code the synchronous /summarize/ route would have answered.
+            'result': self.result,
+            'status_code': self.status_code
+        }
+
+
+class JobManager:
+    # Runs jobs in max_workers threads (the summarization itself may hand the work to the summarizer process pool).
+    # Finished jobs are kept retention seconds so their result can be read, then forgotten.
+    def __init__(self, max_workers=2, max_pending=16, retention=10 * 60):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self.deduplicated = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='summarize-job')
+        self._jobs = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        # Forgetting finished jobs older than retention seconds. Called with the lock held.
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.retention]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, key, function):
+        # Submits function(job), which returns (response body, status code), as the job of key. Returns (job, created):
+        # when a job of the same key is queued or running it is returned with created False.
+        with self._lock:
+            self._prune(time.time())
+            job = self._in_flight.get(key)
+            if job is not None:
+                self.deduplicated += 1
+                return job, False
+            if len(self._in_flight) >= self.max_pending:
+                self.rejected += 1
+                raise JobQueueFull('{} summarization jobs are already pending.'.format(len(self._in_flight)))
+            job = Job(uuid.uuid4().hex, key)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+        self._executor.submit(self._run, job, function)
+        return job, True
+
+    def _run(self, job, function):
+        try:
+            result, status_code = function(job)
+        except Exception as e:
+            # function is expected to turn its errors into a response body, this is the last resort.
+            print(e)
+            sys.stdout.flush()
+            result, status_code = dict(success=False, message="Some error occurred.", response=None), 500
+        with self._lock:
+            job.result = result
+            job.status_code = status_code
+            job.finished_at = time.time()
+            job.stage = 'finished'
+            del self._in_flight[job.key]
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune(time.time())
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._in_flight),
+                'max_pending': self.max_pending,
+                'jobs': len(self._jobs),
+                'deduplicated': self.deduplicated,
+                'rejected': self.rejected
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
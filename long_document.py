@@ -0,0 +1,122 @@
+# Long Document Mode for TextRank and LSA (Used by summarizer.py)
+# The default TextRank summarizers build a dense graph of every sentence pair and LSA runs a full SVD, so their memory
+# and time grow with the square of the sentence count. Above a configurable number of sentences, summarizer.py uses
+# the functions below instead: a sparse TF-IDF similarity graph computed in chunks (keeping only the top neighbours of
+# every sentence) and a truncated SVD of the sparse term x sentence matrix.
+
+# NumPy and SciPy Imports
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import svds
+
+# Defaults: neighbours kept per sentence, smallest cosine similarity kept as an edge, LSA dimensions, and the largest
+# number of similarity values (sentences in a chunk x all sentences) held in memory at once: 1M values = 8 MB.
+NEIGHBOURS = 20
+SIMILARITY_THRESHOLD = 0.05
+LSA_DIMENSIONS = 100
+CHUNK_CELLS = 1024 * 1024
+
+
+def term_matrix(document):
+    # Sentence x term count matrix of a TranscriptDocument: lowercase word tokens, stop words and punctuation left out.
+    terms = {}
+    rows = []
+    columns = []
+    for index in range(len(document.sentences)):
+        for position in range(document.sentence_bounds[index], document.sentence_bounds[index + 1]):
+            word = document.lower_tokens[position]
+            if not document.stop_mask[position] and any(character.isalnum() for character in word):
+                rows.append(index)
+                columns.append(terms.setdefault(word, len(terms)))
+    # Duplicate (row, column) entries are summed into counts by the constructor.
+    return csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(len(document.sentences), max(len(terms), 1)))
+
+
+def tfidf_rows(counts):
+    # TF-IDF weighting with L2 normalized rows, so that the dot product of two rows is their cosine similarity.
+    document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1
+    matrix = counts.multiply(idf).tocsr()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return csr_matrix(matrix.multiply(1 / norms[:, None]))
+
+
+def similarity_graph(matrix, neighbours=NEIGHBOURS, threshold=SIMILARITY_THRESHOLD, chunk_cells=CHUNK_CELLS):
+    # Sparse sentence graph keeping, for every sentence, its top neighbours above threshold. Similarities are computed
+    # a chunk of rows at a time, so at most chunk_cells values exist at once whatever the sentence count.
+    count = matrix.shape[0]
+    neighbours = min(neighbours, count - 1)
+    chunk_size = max(1, chunk_cells // max(count, 1))
+    transposed = matrix.T.tocsc()
+
+    rows = []
+    columns = []
+    weights = []
+    for start in range(0, count, chunk_size):
+        stop = min(start + chunk_size, count)
+        similarities = (matrix[start:stop] @ transposed).toarray()
+        # A sentence is not its own neighbour.
+        similarities[np.arange(stop - start), np.arange(start, stop)] = 0
+        if neighbours > 0:
+            # Top neighbours of each row without sorting the whole row.
+            top = np.argpartition(-similarities, neighbours - 1, axis=1)[:, :neighbours]
+            top_weights = np.take_along_axis(similarities, top, axis=1)
+            keep = top_weights > threshold
+            rows.append(np.nonzero(keep)[0] + start)
+            columns.append(top[keep])
+            weights.append(top_weights[keep])
+
+    if not rows:
+        return csr_matrix((count, count))
+    graph = csr_matrix((np.concatenate(weights), (np.concatenate(rows), np.concatenate(columns))), shape=(count, count))
+    # Similarity is symmetric: an edge kept by either sentence is kept for both.
+    return graph.maximum(graph.T).tocsr()
+
+
+def pagerank(graph, damping=0.85, iterations=100, tolerance=1.0e-6):
+    # Weighted PageRank by power iteration on the sparse graph. Sentences without edges share their rank uniformly.
+    count = graph.shape[0]
+    out_weights = np.asarray(graph.sum(axis=1)).ravel()
+    dangling = out_weights == 0
+    out_weights[dangling] = 1
+    transition = csr_matrix(graph.multiply(1 / out_weights[:, None])).T.tocsr()
+
+    ranks = np.full(count, 1.0 / count)
+    for _ in range(iterations):
+        new_ranks = (1 - damping) / count + damping * (transition @ ranks + ranks[dangling].sum() / count)
+        if np.abs(new_ranks - ranks).sum() < tolerance:
+            return new_ranks
+        ranks = new_ranks
+    return ranks
+
+
+def text_rank_scores(document, neighbours=NEIGHBOURS, threshold=SIMILARITY_THRESHOLD, chunk_cells=CHUNK_CELLS):
+    # TextRank score of every sentence of the document, on the sparse TF-IDF cosine similarity graph.
+    graph = similarity_graph(tfidf_rows(term_matrix(document)), neighbours, threshold, chunk_cells)
+    return pagerank(graph)
+
+
+def lsa_scores(document, dimensions=LSA_DIMENSIONS, smooth=0.4):
+    # LSA score of every sentence (as sumy's LsaSummarizer rates them) from a truncated SVD of the sparse
+    # term x sentence matrix. Term frequencies are smoothed like sumy does, but only for the words present in a
+    # sentence, which keeps the matrix sparse.
+    counts = term_matrix(document).tocsr()
+    max_counts = counts.max(axis=1).toarray().ravel()
+    max_counts[max_counts == 0] = 1
+    weighted = counts.copy()
+    weighted.data = smooth + (1 - smooth) * weighted.data / np.repeat(max_counts, np.diff(counts.indptr))
+    matrix = weighted.T.tocsc()
+
+    # svds needs k < min(shape); very small matrices fall back to a dense SVD.
+    dimensions = min(dimensions, min(matrix.shape) - 1)
+    if dimensions < 1:
+        _, sigma, v_matrix = np.linalg.svd(matrix.toarray(), full_matrices=False)
+    else:
+        _, sigma, v_matrix = svds(matrix, k=dimensions)
+    return np.sqrt(((sigma ** 2)[:, None] * v_matrix ** 2).sum(axis=0))
+
+
+def rank_by_score(scores):
+    # Sentence indices by score, highest first (ties in transcript order).
+    return np.argsort(-scores, kind='stable')
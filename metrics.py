@@ -0,0 +1,153 @@
+# Latency and Error Metrics (Used by app.py)
+# Histograms of the time spent in each stage of a summarization (transcript fetch, formatting, tokenization and the
+# summarizer itself, labelled by algorithm) and counters of the errors raised, rendered in the Prometheus text format
+# for the /metrics endpoint. Metrics are kept per process: with pre-forked server processes (serve.py) sharing one
+# socket, a scrape is answered by any one of them and shows that process's figures only.
+
+# Other Imports
+from contextlib import contextmanager
+import math
+import threading
+import time
+
+# Upper bounds (seconds) of the histogram buckets: from a cached transcript lookup to a multi-hour talk.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, math.inf)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_names, label_values, extra=()):
+    pairs = list(zip(label_names, label_values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(name, _escape(value)) for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    # Monotonic counter with labels.
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = ['# HELP {} {}'.format(self.name, self.documentation), '# TYPE {} counter'.format(self.name)]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append('{}{} {}'.format(self.name, _format_labels(self.label_names, key), _format_value(value)))
+        return lines
+
+
+class Histogram:
+    # Cumulative bucket histogram with labels, as Prometheus expects it.
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(set(buckets) | {math.inf}))
+        # Labels -> [count per bucket (not cumulative), sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        index = next(index for index, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self):
+        lines = ['# HELP {} {}'.format(self.name, self.documentation), '# TYPE {} histogram'.format(self.name)]
+        with self._lock:
+            for key, (bucket_counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.label_names, key, [('le', _format_value(bound))])
+                    lines.append('{}_bucket{} {}'.format(self.name, labels, cumulative))
+                labels = _format_labels(self.label_names, key)
+                lines.append('{}_sum{} {}'.format(self.name, labels, repr(total)))
+                lines.append('{}_count{} {}'.format(self.name, labels, count))
+        return lines
+
+
+class CallbackMetric:
+    # Gauge (or counter) whose value is read from a function when rendered: for values kept by another object, such
+    # as the queue depth of the transcript fetcher.
+    def __init__(self, name, documentation, function, metric_type='gauge'):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        self.metric_type = metric_type
+
+    def render(self):
+        return ['# HELP {} {}'.format(self.name, self.documentation),
+                '# TYPE {} {}'.format(self.name, self.metric_type),
+                '{} {}'.format(self.name, _format_value(self.function()))]
+
+
+class Metrics:
+    # Metrics of the application. Stage names: fetch, format, tokenize, summarize.
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.stage_seconds = Histogram('ytsum_stage_seconds', 'Time spent in each stage of a summarization.',
+                                       ('stage', 'algorithm'), buckets)
+        self.request_seconds = Histogram('ytsum_request_seconds', 'Time taken to answer HTTP requests.',
+                                         ('endpoint', 'method', 'status'), buckets)
+        self.errors = Counter('ytsum_errors_total', 'Errors raised while fetching or summarizing, by exception type.',
+                              ('exception',))
+        self.callbacks = []
+
+    def observe_stage(self, stage, seconds, algorithm='', timings=None):
+        # Records seconds spent in stage. timings, if given, is a dictionary of the current request which also
+        # receives it (keyed by stage, or stage.algorithm) for the Server-Timing header.
+        self.stage_seconds.observe(seconds, stage=stage, algorithm=algorithm)
+        if timings is not None:
+            name = '{}.{}'.format(stage, algorithm) if algorithm else stage
+            timings[name] = timings.get(name, 0) + seconds
+
+    @contextmanager
+    def stage(self, stage, algorithm='', timings=None):
+        # Times the body of a with statement as stage, whether it raises or not.
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start_time, algorithm, timings)
+
+    def count_error(self, error):
+        self.errors.inc(exception=type(error).__name__)
+
+    def register(self, name, documentation, function, metric_type='gauge'):
+        # Adds a CallbackMetric, its value being function() at every scrape.
+        self.callbacks.append(CallbackMetric(name, documentation, function, metric_type))
+
+    def render(self):
+        # Every metric in the Prometheus text exposition format.
+        lines = []
+        for metric in [self.stage_seconds, self.request_seconds, self.errors] + self.callbacks:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def server_timing_header(timings):
+    # Server-Timing header value (milliseconds) of a timings dictionary filled by Metrics.observe_stage.
+    return ', '.join('{};dur={:.1f}'.format(name, seconds * 1000) for name, seconds in timings.items())
@@ -0,0 +1,42 @@
+# NLTK Data Setup (Run once at build time:  python nltk_setup.py [download directory])
+# The NLTK packages needed by the summarizers are listed in nltk.txt, which the Heroku Python buildpack downloads when
+# building the app. Anywhere else (Docker image, local setup), run this file once. The server does not look for them
+# (or download them) at every start anymore, unless NLTK_DATA_CHECK=1 is set.
+
+# NLTK Imports
+import nltk
+
+# Other Imports
+import os
+import sys
+
+# Resource path of each NLTK package, used to check whether it is installed.
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'wordnet': 'corpora/wordnet',
+    'stopwords': 'corpora/stopwords',
+}
+
+
+def nltk_packages(path=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk.txt')):
+    # Packages listed in nltk.txt, one per line.
+    with open(path) as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def ensure_nltk_data(packages=None, download_dir=None):
+    # Downloads the packages which are not installed yet, returns their names.
+    downloaded = []
+    for package in packages or nltk_packages():
+        try:
+            nltk.data.find(NLTK_RESOURCES.get(package, 'corpora/' + package))
+        except LookupError:
+            print('Downloading {}'.format(package))
+            sys.stdout.flush()
+            nltk.download(package, download_dir=download_dir, quiet=True)
+            downloaded.append(package)
+    return downloaded
+
+
+if __name__ == '__main__':
+    ensure_nltk_data(download_dir=sys.argv[1] if len(sys.argv) > 1 else None)
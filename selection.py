@@ -0,0 +1,122 @@
+# Summary Length Budgets (Used by summarizer.py, workers.py and app.py)
+# The length of a summary is given by a budget: percent of the transcript sentences, and/or at most max_sentences
+# sentences, max_chars characters and max_tokens word tokens. Every summarizer first ranks all the sentences of the
+# transcript once (SentenceRanking), then the summary is a greedy pass over that ranking which takes the best
+# sentences that still fit in the budget. Several budgets for the same transcript are served from one ranking, without
+# running the algorithm again.
+
+# Other Imports
+from array import array
+import base64
+
+# Request arguments of a budget, also the keyword arguments of SummaryBudget and of the *_summarize functions.
+BUDGET_ARGUMENTS = ('percent', 'max_sentences', 'max_chars', 'max_tokens')
+
+
+def word_count(tokens):
+    # Words counted by max_tokens, the same for every summarizer: the NLTK word tokens of a sentence holding a letter or
+    # a digit (punctuation tokens are not words).
+    return sum(1 for token in tokens if any(character.isalnum() for character in token))
+
+
+class SummaryBudget:
+    # Limits of one summary, None for no limit.
+    def __init__(self, percent=None, max_sentences=None, max_chars=None, max_tokens=None):
+        self.percent = percent
+        self.max_sentences = max_sentences
+        self.max_chars = max_chars
+        self.max_tokens = max_tokens
+
+    @classmethod
+    def from_arguments(cls, arguments):
+        # Budget of the request arguments (a mapping of some of BUDGET_ARGUMENTS, as strings or numbers). Raises
+        # ValueError when a value is not a positive whole number (or is another type, such as a JSON list).
+        values = {}
+        for name in BUDGET_ARGUMENTS:
+            value = arguments.get(name)
+            if value is None or value == '':
+                continue
+            if isinstance(value, bool) or not isinstance(value, (str, int)) or int(str(value).strip()) <= 0:
+                raise ValueError('{} must be a positive whole number.'.format(name))
+            values[name] = int(str(value).strip())
+        return cls(**values)
+
+    def sentence_limit(self, total):
+        # Largest number of sentences in the summary of a transcript of total sentences. Percent always keeps at least
+        # one sentence: a small percent of a short transcript used to come out as 0.
+        limit = total
+        if self.percent is not None:
+            limit = min(limit, max(int(total * (self.percent / 100)), 1))
+        if self.max_sentences is not None:
+            limit = min(limit, self.max_sentences)
+        return limit
+
+    def key(self):
+        # Text identifying the budget in cache keys. A percent alone is written as the number, as before budgets.
+        parts = ['' if self.percent is None else str(self.percent)]
+        for name, prefix in (('max_sentences', 's'), ('max_chars', 'c'), ('max_tokens', 't')):
+            if getattr(self, name) is not None:
+                parts.append('{}{}'.format(prefix, getattr(self, name)))
+        return ';'.join(parts)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in BUDGET_ARGUMENTS if getattr(self, name) is not None}
+
+
+class SentenceRanking:
+    # Sentences of one transcript ranked by one summarizer.
+    #  * sentences: the sentence texts, the document's own or the ones the summarizer split itself (gensim, spaCy);
+    #  * order: indices of sentences, best first (sentences the summarizer left unscored are not in it);
+    #  * tokens: word count of every sentence (word_count()), for max_tokens;
+    #  * total: sentence count percent applies to;
+    #  * document_order: summaries list their sentences in transcript order, else best first.
+    # own_sentences is False when sentences are the document's: they are then left out of to_dict().
+    def __init__(self, sentences, order, tokens, total, document_order, own_sentences=True):
+        self.sentences = sentences
+        self.order = array('i', order)
+        self.tokens = array('i', tokens)
+        self.total = total
+        self.document_order = document_order
+        self.own_sentences = own_sentences
+
+    def select(self, budget):
+        # Summary sentences under budget: going through the ranking once, every sentence which still fits in the
+        # character and token budgets is taken, until the sentence limit is reached.
+        limit = budget.sentence_limit(self.total)
+        selected = []
+        characters = 0
+        tokens = 0
+        for index in self.order:
+            if len(selected) >= limit:
+                break
+            # Summary sentences are joined by a space.
+            length = len(self.sentences[index]) + (1 if selected else 0)
+            if budget.max_chars is not None and characters + length > budget.max_chars:
+                continue
+            if budget.max_tokens is not None and tokens + self.tokens[index] > budget.max_tokens:
+                continue
+            selected.append(index)
+            characters += length
+            tokens += self.tokens[index]
+
+        if self.document_order:
+            selected.sort()
+        return [self.sentences[index] for index in selected]
+
+    def to_dict(self):
+        # JSON serializable form, arrays as base64 strings of their bytes (see transcript_index.py).
+        return {
+            'sentences': self.sentences if self.own_sentences else None,
+            'order': base64.b64encode(self.order.tobytes()).decode('ascii'),
+            'tokens': base64.b64encode(self.tokens.tobytes()).decode('ascii'),
+            'total': self.total,
+            'document_order': self.document_order,
+        }
+
+    @classmethod
+    def from_dict(cls, data, document):
+        # document is the TranscriptDocument the ranking was made from, which holds its sentences when not stored.
+        own_sentences = data['sentences'] is not None
+        return cls(data['sentences'] if own_sentences else document.sentences,
+                   array('i', base64.b64decode(data['order'])), array('i', base64.b64decode(data['tokens'])),
+                   data['total'], data['document_order'], own_sentences)
@@ -0,0 +1,123 @@
+# Pre-fork Server (Procfile:  web: python serve.py)
+# Creates the application once in this parent process and loads every summarizer model into it (spaCy, NLTK punkt,
+# sumy, gensim), then forks SERVE_WORKERS worker processes which serve the same listening socket with waitress.
+# Forked workers share the memory pages of the models with the parent (copy-on-write) instead of each loading its own
+# copy, and start serving without any loading time. Workers which die are replaced, SIGTERM or SIGINT stop them all.
+# By default (one worker), or where os.fork does not exist (Windows), the application is served by this process
+# directly. Pre-forking is opt-in because the workers share nothing but the SQLite caches: background jobs, the memory
+# caches, fetch coalescing and the metrics are kept per worker, and a request reaches any one of them. WEB_CONCURRENCY
+# (which Heroku sets by itself) is therefore not used. Each worker also starts its own summarizer process pool: with
+# pre-forked workers, SUMMARIZER_POOL_WORKERS defaults to the CPU count shared out between them.
+
+# Application Import (Our Another File: app.py)
+from app import create_app
+
+# Waitress Import
+from waitress import serve
+
+# Other Imports
+import argparse
+import gc
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+
+
+def listening_socket(host, port, backlog=1024):
+    # Socket bound before forking: every worker accepts connections from it.
+    server_socket = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server_socket.bind((host, port))
+    server_socket.listen(backlog)
+    return server_socket
+
+
+def start_worker(app, server_socket, threads):
+    # Forks one worker process, returns its pid in the parent. The worker never returns.
+    pid = os.fork()
+    if pid:
+        return pid
+    # Worker: default signal handlers (waitress stops on SIGTERM), then serving until stopped.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    try:
+        serve(app, sockets=[server_socket], threads=threads)
+    finally:
+        os._exit(0)
+
+
+def run_prefork(app, host, port, workers, threads):
+    server_socket = listening_socket(host, port)
+    # Objects created so far (the models) are moved out of the garbage collector's generations: otherwise a collection
+    # in a worker writes to their headers and copies the shared pages they are in.
+    gc.collect()
+    gc.freeze()
+
+    children = set()
+    stopping = []
+
+    def stop(signal_number, frame):
+        stopping.append(signal_number)
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        children.add(start_worker(app, server_socket, threads))
+    print('Serving on {}:{} with {} pre-forked workers (parent pid {})'.format(host, port, workers, os.getpid()))
+    sys.stdout.flush()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        if pid not in children:
+            # Another child of this process (the resource guard's isolation server), not a worker.
+            continue
+        children.discard(pid)
+        if not stopping:
+            # Replacing a dead worker, after a short pause so a worker failing at start does not spin the CPU.
+            print('Worker {} exited with status {}, starting a new one'.format(pid, status))
+            sys.stdout.flush()
+            time.sleep(1)
+            if not stopping:
+                children.add(start_worker(app, server_socket, threads))
+    server_socket.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the summarizer with pre-forked waitress workers.')
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8080)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SERVE_WORKERS', 1)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WAITRESS_THREADS', 4)))
+    arguments = parser.parse_args()
+
+    prefork = arguments.workers > 1 and hasattr(os, 'fork')
+    if prefork:
+        # Models are loaded here, once, before forking (SUMMARIZER_PRELOAD=0 still loads them lazily per worker).
+        os.environ.setdefault('SUMMARIZER_PRELOAD', '1')
+        # Summarizer pool processes are spawned (they load their own models): all the workers together start about
+        # one per CPU.
+        os.environ.setdefault('SUMMARIZER_POOL_WORKERS', str(max(1, multiprocessing.cpu_count() // arguments.workers)))
+    app = create_app()
+
+    if prefork:
+        run_prefork(app, arguments.host, arguments.port, arguments.workers, arguments.threads)
+    else:
+        serve(app, host=arguments.host, port=arguments.port, threads=arguments.threads)
+
+
+if __name__ == '__main__':
+    main()
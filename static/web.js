@@ -57,52 +57,88 @@ function initializeSummary() {
 
             // https://ytsum.herokuapp.com
             // http://127.0.0.1:5000
-            // Fetch request to our server. (GET request with arguments received from popup.html
-            fetch("https://ytsum.herokuapp.com/summarize/?id=" + video_id +
-                "&percent=" + percent + "&choice=" + choice)
-                .then(response => response.json()).then(result => {
-                // Result now contains the response in JSON
-                // Sending result back to popup.html
-                process_element.innerHTML = result.message;
-                if (result.success) {
-                    // If result was successfully received. Then, parse the result_response JSON
-                    const response_json = (result.response);
-
-                    // Use the values present in JSON for displaying summary.
-                    text_out_content_element.innerHTML = "<b>Processed Summary:</b> " + response_json.processed_summary
-                        + "<p>In your video, there are <b>" + response_json.length_original + "</b> characters in <b>" + response_json.sentence_original + "</b> sentences."
-                        + "<br>The processed summary has <b>" + response_json.length_summary + "</b> characters in <b>" + response_json.sentence_summary + "</b> sentences."
-                        + "</br><br>";
-
-                    // Populating the globally created dictionary
-                    download_info.script = response_json.processed_summary
-                    download_info.video_id = video_id
-                    download_info.video_algo = choice.replaceAll('-', '_')
-                    download_info.video_percent = percent
-                    // Displaying download button
-                    download_button.style.display = "block";
+            // Streaming request to our server: progress and summary sentences are shown as soon as they arrive.
+            const source = new EventSource("https://ytsum.herokuapp.com/summarize/stream/?id=" + video_id +
+                "&percent=" + percent + "&choice=" + choice);
+            // Summary sentences received so far, in the order they are spoken.
+            const summary_sentences = [];
+            let finished = false;
+
+            source.addEventListener("stage", event => {
+                // Progress of the summarization on the server
+                const stage = JSON.parse(event.data);
+                if (stage.stage === "fetched") {
+                    process_element.innerHTML = "Subtitles fetched. Splitting them into sentences...";
+                } else if (stage.stage === "tokenized") {
+                    process_element.innerHTML = "Found <b>" + stage.sentences + "</b> sentences. Summarizing...";
+                } else if (stage.stage === "scoring") {
+                    process_element.innerHTML = "Selecting the most important sentences...";
+                }
+            });
+
+            source.addEventListener("sentence", event => {
+                // One sentence of the summary: displayed right away, with a link to the moment it is spoken.
+                const sentence = JSON.parse(event.data);
+                if (summary_sentences.length === 0) {
+                    text_out_content_element.innerHTML = "<b>Processed Summary:</b> ";
                     // Text Beautification: Aligning Text to be justified
                     text_out_content_element.style.textAlign = "justify";
                     text_out_content_element.style.textJustify = "inter-word";
-                    // Enabling re-summarize element
-                    re_summarize_element.style.display = "block";
-                } else {
-                    // We failed: Reason is already pushed to UI in process_element (response.result_message has reason)
-                    text_out_content_element.innerHTML = "We failed due to above reason.";
-                    text_out_content_element.style.textAlign = "center";
-                    // Enabling re-summarize element
-                    re_summarize_element.style.display = "block";
                 }
-            }).catch(error => {
-                // Network issue occurred during fetch probably. Logging and sending result backs.
-                console.log(error);
-                process_element.innerHTML = "A network issue was encountered. Please retry.";
-                // We failed to fetch: Reason is already pushed to UI in process_element (response.result_message has reason)
-                text_out_content_element.innerHTML = "We failed due to above reason.";
-                text_out_content_element.style.textAlign = "center";
+                summary_sentences.push(sentence.text);
+
+                // start is null for a sentence which could not be found in the transcript: no link then.
+                if (sentence.start !== null) {
+                    const time_link = document.createElement("a");
+                    time_link.href = "https://www.youtube.com/watch?v=" + video_id + "&t=" + Math.floor(sentence.start) + "s";
+                    time_link.target = "_blank";
+                    time_link.textContent = "[" + format_timestamp(sentence.start) + "]";
+                    text_out_content_element.appendChild(time_link);
+                }
+                text_out_content_element.appendChild(document.createTextNode(" " + sentence.text + " "));
+            });
+
+            source.addEventListener("summary", event => {
+                // Every sentence was received: displaying the lengths and enabling download.
+                finished = true;
+                source.close();
+                const result = JSON.parse(event.data);
+                process_element.innerHTML = result.message;
+                const response_json = (result.response);
+
+                const lengths_element = document.createElement("p");
+                lengths_element.innerHTML = "In your video, there are <b>" + response_json.length_original + "</b> characters in <b>" + response_json.sentence_original + "</b> sentences."
+                    + "<br>The processed summary has <b>" + response_json.length_summary + "</b> characters in <b>" + response_json.sentence_summary + "</b> sentences."
+                    + "</br><br>";
+                text_out_content_element.appendChild(lengths_element);
+
+                // Populating the globally created dictionary
+                download_info.script = summary_sentences.join(" ")
+                download_info.video_id = video_id
+                download_info.video_algo = choice.replaceAll('-', '_')
+                download_info.video_percent = percent
+                // Displaying download button
+                download_button.style.display = "block";
                 // Enabling re-summarize element
                 re_summarize_element.style.display = "block";
-            })
+            });
+
+            source.addEventListener("failure", event => {
+                // Summarization failed on the server: the reason is pushed to UI in process_element.
+                finished = true;
+                source.close();
+                showFailure(JSON.parse(event.data).message);
+            });
+
+            source.onerror = error => {
+                // Network issue occurred during the stream probably (EventSource would reconnect: we stop instead).
+                source.close();
+                if (!finished) {
+                    finished = true;
+                    console.log(error);
+                    showFailure("A network issue was encountered. Please retry.");
+                }
+            };
         } else {
             // Alerting user that they entered wrong URL
             alert("Your YouTube video URL is invalid. Please retry.");
@@ -111,6 +147,25 @@ function initializeSummary() {
     }
 }
 
+function showFailure(message) {
+    // Displaying the reason of a failure, and letting the user summarize again.
+    const text_out_content_element = document.getElementById("text-out");
+    document.getElementById("current_process").innerHTML = message;
+    text_out_content_element.innerHTML = "We failed due to above reason.";
+    text_out_content_element.style.textAlign = "center";
+    // Enabling re-summarize element
+    re_summarize_element.style.display = "block";
+}
+
+function format_timestamp(seconds) {
+    // Start time of a sentence as [h:]mm:ss
+    const total = Math.floor(seconds);
+    const hours = Math.floor(total / 3600);
+    const minutes = String(Math.floor(total / 60) % 60).padStart(2, "0");
+    const rest = String(total % 60).padStart(2, "0");
+    return (hours > 0 ? hours + ":" : "") + minutes + ":" + rest;
+}
+
 function parse_youtube_video_id(url) {
     // This function returns video id if it is a valid youtube video. Else it returns false
     const regExp = /^.*((youtu.be\/)|(v\/)|(\/u\/\w\/)|(embed\/)|(watch\?))\??v?=?([^#&?]*).*/;
@@ -1,218 +1,438 @@
-# Gensim Imports
-from gensim.summarization.summarizer import summarize
-
-# Spacy Imports
-import spacy
-from spacy.lang.en.stop_words import STOP_WORDS
-
-# NLTK Imports
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize, sent_tokenize
-
-# Sumy Imports
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.lsa import LsaSummarizer
-from sumy.summarizers.luhn import LuhnSummarizer
-from sumy.summarizers.text_rank import TextRankSummarizer
-from sumy.nlp.stemmers import Stemmer
-from sumy.utils import get_stop_words
+# Lazy Imports: gensim, spaCy, sumy, NLTK corpora and SciPy (frequency.py, long_document.py) take seconds and hundreds
+# of MB to import, so they are imported inside the functions using them, on first use. A process then starts quickly
+# and only pays for the algorithms it runs; SummarizerRegistry.warm_up() imports and loads everything at once.
+
+# Preprocessed Document Import (Our Another File: document.py)
+from document import TranscriptDocument
+
+# Summary Length Budget Import (Our Another File: selection.py)
+from selection import SummaryBudget, SentenceRanking, word_count
 
 # Other Imports
 from string import punctuation
-from heapq import nlargest
-
+import importlib
+import threading
+import time
+import sys
+
+# Sumy summarizer classes by choice name, (module, class name) imported when the summarizer is first built.
+SUMY_SUMMARIZER_CLASSES = {
+    'lsa': ('sumy.summarizers.lsa', 'LsaSummarizer'),
+    'luhn': ('sumy.summarizers.luhn', 'LuhnSummarizer'),
+    'text-rank': ('sumy.summarizers.text_rank', 'TextRankSummarizer'),
+}
+
+# spaCy pipeline components left out when loading the model: spacy-sum only needs tokens and sentences, which the
+# tokenizer and a rule based sentencizer give, while the parser and NER take most of the time and memory (spaCy warns
+# of about 1 GB per 100,000 characters). Names missing from the model are ignored.
+SPACY_EXCLUDED_COMPONENTS = ['tok2vec', 'tagger', 'morphologizer', 'parser', 'senter', 'attribute_ruler',
+                             'lemmatizer', 'ner']
+
+# spacy-sum processes the transcript in chunks of at most this many characters (cut after a sentence where possible),
+# so only one chunk is held by spaCy at a time and transcripts longer than nlp.max_length can be summarized.
+SPACY_CHUNK_CHARACTERS = 100000
+
+# Modules imported by the summarizers below at call time, imported in advance by SummarizerRegistry.warm_up().
+LAZY_MODULES = [
+    'gensim.summarization.summarizer',
+    'gensim.summarization.textcleaner',
+    'sumy.models.dom',
+    'sumy.utils',
+    'sumy.nlp.tokenizers',
+    'frequency',
+    'long_document',
+]
+
+
+class SummarizerRegistry:
+    # Holds the heavy objects needed by the summarizers (spaCy model, stop word sets, sumy stemmer and summarizers).
+    # One registry is created per worker process, every object is built once (lazily on first use, or eagerly through
+    # warm_up()) and then shared by all the request threads of that process. None of these objects keep per-call state,
+    # so sharing them between waitress threads is safe; only their construction is guarded by a lock.
+    def __init__(self, spacy_model='en_core_web_sm', language='english', long_document_sentences=1000):
+        self.spacy_model = spacy_model
+        self.language = language
+        # Documents with more sentences than this are summarized by the TextRank and LSA algorithms in long document
+        # mode (long_document.py), whose memory does not grow with the square of the sentence count.
+        self.long_document_sentences = long_document_sentences
+        self.build_times = {}
+        self._objects = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name, builder):
+        # Fast path: object was already built, no locking required.
+        built_object = self._objects.get(name)
+        if built_object is not None:
+            return built_object
+
+        # Slow path: build the object once, other threads asking for it meanwhile wait on the lock. The lock is
+        # re-entrant because builders ask the registry for the objects they depend on.
+        with self._lock:
+            if name not in self._objects:
+                start_time = time.perf_counter()
+                self._objects[name] = builder()
+                self.build_times[name] = time.perf_counter() - start_time
+                print('Summarizer registry built {} in {:.3f}s'.format(name, self.build_times[name]))
+                sys.stdout.flush()
+            return self._objects[name]
+
+    @property
+    def nlp(self):
+        # spaCy Language object, loading it costs hundreds of milliseconds so it is done once per process. Only the
+        # tokenizer and a sentencizer are kept (see SPACY_EXCLUDED_COMPONENTS).
+        return self._get('nlp', self._load_spacy_model)
+
+    def _load_spacy_model(self):
+        import spacy
+        nlp = spacy.load(self.spacy_model, exclude=SPACY_EXCLUDED_COMPONENTS)
+        if 'sentencizer' not in nlp.pipe_names:
+            nlp.add_pipe('sentencizer')
+        return nlp
+
+    @property
+    def spacy_stop_words(self):
+        # Stop words as a set for O(1) membership checks.
+        return self._get('spacy_stop_words', self._load_spacy_stop_words)
+
+    @staticmethod
+    def _load_spacy_stop_words():
+        from spacy.lang.en.stop_words import STOP_WORDS
+        return frozenset(STOP_WORDS)
+
+    @property
+    def nltk_stop_words(self):
+        # NLTK returns a list, converting it to a set once for O(1) membership checks.
+        return self._get('nltk_stop_words', self._load_nltk_stop_words)
+
+    def _load_nltk_stop_words(self):
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words(self.language))
+
+    @property
+    def sumy_stemmer(self):
+        return self._get('sumy_stemmer', self._load_sumy_stemmer)
+
+    def _load_sumy_stemmer(self):
+        from sumy.nlp.stemmers import Stemmer
+        return Stemmer(self.language)
+
+    @property
+    def sumy_stop_words(self):
+        return self._get('sumy_stop_words', self._load_sumy_stop_words)
+
+    def _load_sumy_stop_words(self):
+        from sumy.utils import get_stop_words
+        return frozenset(get_stop_words(self.language))
+
+    def sumy_summarizer(self, name):
+        # Returns the shared sumy summarizer ('lsa', 'luhn' or 'text-rank') with its stemmer and stop words set.
+        return self._get('sumy_' + name, lambda: self._build_sumy_summarizer(name))
+
+    def _build_sumy_summarizer(self, name):
+        module_name, class_name = SUMY_SUMMARIZER_CLASSES[name]
+        summarizer = getattr(importlib.import_module(module_name), class_name)(self.sumy_stemmer)
+        summarizer.stop_words = self.sumy_stop_words
+        return summarizer
+
+    def warm_up(self):
+        # Imports every summarizer module and builds every object eagerly (the NLTK sentence tokenizer is loaded by
+        # tokenizing a short text). Returns the time it took in seconds.
+        start_time = time.perf_counter()
+        for module_name in LAZY_MODULES:
+            importlib.import_module(module_name)
+        _ = self.nlp, self.spacy_stop_words, self.nltk_stop_words
+        for name in SUMY_SUMMARIZER_CLASSES:
+            self.sumy_summarizer(name)
+        prepare_document('Warming up. The tokenizers are loaded.', self)
+        return time.perf_counter() - start_time
+
+
+# Registry used when a summarizer is called without one, e.g. from a Python shell.
+default_registry = SummarizerRegistry()
+
+
+def prepare_document(text_content, registry=None, segments=None):
+    # Tokenizes text_content once, the returned document can then be passed to every summarizer below. segments are
+    # the transcript text_content was formatted from, whose timestamps are then kept in the document.
+    if registry is None:
+        registry = default_registry
+    return TranscriptDocument.from_text(text_content, registry.nltk_stop_words, segments)
+
+
+def _summary_output(sentences, split):
+    # Summarizers return the list of summary sentences when split is true, else the sentences joined by a space.
+    return sentences if split else ' '.join(sentences)
+
+
+def _document_ranking(document, order, document_order):
+    # Ranking of the document's own sentences, order being their indices best first.
+    tokens = [word_count(document.sentence_tokens(index)) for index in range(len(document.sentences))]
+    return SentenceRanking(document.sentences, order, tokens, len(document.sentences), document_order,
+                           own_sentences=False)
+
+
+def _word_counts(sentences, document=None):
+    # Word counts (see selection.word_count) of sentences the summarizer split itself. Most of them are sentences of
+    # the document too, whose word tokens are reused; the others are tokenized the way the document's sentences are.
+    from nltk.tokenize import word_tokenize
+    positions = {}
+    if document is not None:
+        for index, sentence in enumerate(document.sentences):
+            positions.setdefault(sentence, index)
+    counts = []
+    for sentence in sentences:
+        index = positions.get(sentence)
+        tokens = document.sentence_tokens(index) if index is not None else word_tokenize(sentence, preserve_line=True)
+        counts.append(word_count(tokens))
+    return counts
+
+
+class _DocumentWordTokenizer:
+    # Sumy tokenizer that answers with the words already tokenized in a TranscriptDocument, so sumy does not
+    # tokenize the transcript again. Words are filtered the same way as sumy's own Tokenizer.to_words().
+    def __init__(self, document, language):
+        from sumy.nlp.tokenizers import Tokenizer
+        self.language = language
+        self._words = {}
+        for index, sentence in enumerate(document.sentences):
+            words = document.sentence_tokens(index)
+            self._words[sentence.strip()] = tuple(word for word in words if Tokenizer._is_word(word))
+
+    def to_words(self, sentence):
+        return self._words[sentence]
+
+
+def _text_chunks(text, size=SPACY_CHUNK_CHARACTERS):
+    # Yields consecutive pieces of text of at most size characters, each cut after the last sentence end (". ", "? "
+    # or "! ") it holds, else after its last space. Pieces joined back give the text.
+    start = 0
+    while len(text) - start > size:
+        window = text[start:start + size]
+        # Cutting after the space, so that the next piece starts with a word.
+        cut = max(window.rfind(mark) for mark in ('. ', '? ', '! '))
+        if cut >= 0:
+            cut += 2
+        elif ' ' in window:
+            cut = window.rfind(' ') + 1
+        else:
+            cut = size
+        yield text[start:start + cut]
+        start += cut
+    if start < len(text):
+        yield text[start:]
+
+
+def _is_long_document(document, registry):
+    return len(document.sentences) > registry.long_document_sentences
+
+
+def _sumy_ranking(name, document, registry):
+    from sumy.models.dom import ObjectDocumentModel, Paragraph, Sentence
+    from sumy.utils import ItemsCount
+
+    # Building sumy's document model from the already tokenized sentences instead of using PlaintextParser.
+    tokenizer = _DocumentWordTokenizer(document, registry.language)
+    sumy_document = ObjectDocumentModel([Paragraph([Sentence(sentence, tokenizer) for sentence in document.sentences])])
+
+    # Shared summarizer, its stemmer and stop words are built once by the registry
+    summarizer = registry.sumy_summarizer(name)
+
+    # Sumy rates every sentence, sorts them by rating and keeps the first sentences_count of them. Passing an
+    # ItemsCount which records that sorted list (and keeps none) gives the whole ranking in one call.
+    ranked = []
+
+    class RankingRecorder(ItemsCount):
+        def __call__(self, sequence):
+            ranked.extend(info.order for info in sequence)
+            return []
 
-def gensim_summarize(text_content, percent):
+    summarizer(sumy_document, sentences_count=RankingRecorder(None))
+    return _document_ranking(document, ranked, document_order=True)
+
+
+def gensim_ranking(text_content, registry=None, document=None):
     # TextRank Summarization using Gensim Library.
-    # Split is false, gensim return strings joined by "\n". if true, gensim will return list
-    summary = summarize(text_content, ratio=(int(percent) / 100), split=False).replace("\n", " ")
-
-    # Returning NLTK Summarization Output
-    return summary
-
-
-def spacy_summarize(text_content, percent):
+    if registry is None:
+        registry = default_registry
+    if document is None:
+        document = prepare_document(text_content, registry)
+
+    if _is_long_document(document, registry):
+        # Long document mode: TextRank on a sparse similarity graph, as gensim compares every pair of sentences.
+        from long_document import text_rank_scores, rank_by_score
+        return _document_ranking(document, rank_by_score(text_rank_scores(document)), document_order=True)
+
+    # The steps of gensim's summarize(), keeping the whole ranking: with ratio 1, summarize_corpus() returns every
+    # sentence by PageRank score where summarize() keeps the first ratio of them. Gensim splits sentences itself.
+    from gensim.summarization.textcleaner import clean_text_by_sentences
+    from gensim.summarization.summarizer import summarize_corpus, _build_corpus, _get_important_sentences
+    units = clean_text_by_sentences(document.text)
+    positions = {unit.index: position for position, unit in enumerate(units)}
+    corpus = _build_corpus(units)
+    important = _get_important_sentences(units, corpus, summarize_corpus(corpus, ratio=1))
+    ranked = [positions[unit.index] for unit in important]
+    sentences = [unit.text for unit in units]
+    return SentenceRanking(sentences, ranked, _word_counts(sentences, document), len(units), document_order=True)
+
+
+def spacy_ranking(text_content, registry=None, document=None):
     # Frequency Based Summarization using Spacy.
-    # Build a List of Stopwords
-    stop_words = list(STOP_WORDS)
+    if registry is None:
+        registry = default_registry
+    if document is not None:
+        text_content = document.text
+
+    # Set of Stopwords, shared through the registry
+    stop_words = registry.spacy_stop_words
 
     # import punctuations from strings library.
     punctuation_items = punctuation + '\n'
 
-    # Loading en_core_web_sm in Spacy
-    nlp = spacy.load('en_core_web_sm')
-
-    # Build an NLP Object
-    nlp_object = nlp(text_content)
-
-    # Create the dictionary with key as words and value as number of times word is repeated.
-    # Scoring words by its occurrence.
-    word_frequencies = {}
-    for word in nlp_object:
-        if word.text.lower() not in stop_words:
-            if word.text.lower() not in punctuation_items:
-                if word.text not in word_frequencies.keys():
-                    word_frequencies[word.text] = 1
-                else:
-                    word_frequencies[word.text] += 1
-
-    # Finding frequency of most occurring word
-    max_frequency = max(word_frequencies.values())
-
-    # Divide Number of occurrences of all words by the max_frequency
-    for word in word_frequencies.keys():
-        word_frequencies[word] = word_frequencies[word] / max_frequency
-
-    # Save a sentence-tokenized copy of text
-    sentence_token = [sentence for sentence in nlp_object.sents]
-
-    # Create the dictionary with key as sentences and value as sum of each important word.
-    # Scoring sentences by its words.
-    sentence_scores = {}
-    for sent in sentence_token:
-        sentence = sent.text.split(" ")
-        for word in sentence:
-            if word.lower() in word_frequencies.keys():
-                if sent not in sentence_scores.keys():
-                    sentence_scores[sent] = word_frequencies[word.lower()]
-                else:
-                    sentence_scores[sent] += word_frequencies[word.lower()]
-
-    # Finding number of sentences and applying percentage on it: since we require to show most X% lines in summary.
-    select_length = int(len(sentence_token) * (int(percent) / 100))
-
-    # Using nlargest library to get the top x% weighted sentences.
-    summary = nlargest(select_length, sentence_scores, key=sentence_scores.get)
-
-    # Later joining it to get the final summarized text.
-    final_summary = [word.text for word in summary]
-    summary = ' '.join(final_summary)
+    # en_core_web_sm is loaded once per process by the registry, with its tokenizer and a sentencizer only
+    nlp = registry.nlp
 
-    # Returning NLTK Summarization Output
-    return summary
+    # Build NLP Objects a chunk of the text at a time: only the words and sentence texts are kept, each Doc is
+    # released before the next chunk is processed.
+    words = []
+    sentence_token = []
+    for nlp_object in nlp.pipe(_text_chunks(text_content), batch_size=1):
+        words.extend(word.text for word in nlp_object)
+        sentence_token.extend(sentence.text for sentence in nlp_object.sents)
+
+    # Scoring words by their occurrence (stop words and punctuation left out), then sentences by their words. Sentence
+    # scoring is vectorized in frequency.py: one sparse sentence x term matrix and a matrix-vector product.
+    from frequency import rank_sentences
+    mask = [lower_word not in stop_words and lower_word not in punctuation_items
+            for lower_word in (word.lower() for word in words)]
+
+    # Sentences ordered by their score, summaries keep that order. Every spaCy sentence is scored on its own, even
+    # when the same text is repeated.
+    ranked = rank_sentences(words, mask, sentence_token, merge_duplicates=False)
+    return SentenceRanking(sentence_token, ranked, _word_counts(sentence_token, document), len(sentence_token),
+                           document_order=False)
 
 
-def nltk_summarize(text_content, percent):
+def nltk_ranking(text_content, registry=None, document=None):
     # Frequency Based Summarization using NLTK
-    # Store a tokenized copy of text, using NLTK's recommended word tokenizer
-    tokens = word_tokenize(text_content)
+    if registry is None:
+        registry = default_registry
 
-    # Import the stop words from NLTK toolkit
-    stop_words = stopwords.words('english')
+    # Tokenized copy of text (NLTK's recommended word tokenizer) with lowercase forms and stop word mask.
+    if document is None:
+        document = prepare_document(text_content, registry)
 
     # import punctuations from strings library.
     punctuation_items = punctuation + '\n'
 
-    # Create the dictionary with key as words and value as number of times word is repeated.
-    # Scoring words by its occurrence.
-    word_frequencies = {}
-    for word in tokens:
-        if word.lower() not in stop_words:
-            if word.lower() not in punctuation_items:
-                if word not in word_frequencies.keys():
-                    word_frequencies[word] = 1
-                else:
-                    word_frequencies[word] += 1
-
-    # Finding frequency of most occurring word
-    max_frequency = max(word_frequencies.values())
-
-    # Divide Number of occurrences of all words by the max_frequency
-    for word in word_frequencies.keys():
-        word_frequencies[word] = word_frequencies[word] / max_frequency
-
-    # Save a sentence-tokenized copy of text
-    sentence_token = sent_tokenize(text_content)
-
-    # Create the dictionary with key as sentences and value as sum of each important word.
-    # Scoring sentences by its words.
-    sentence_scores = {}
-    for sent in sentence_token:
-        sentence = sent.split(" ")
-        for word in sentence:
-            if word.lower() in word_frequencies.keys():
-                if sent not in sentence_scores.keys():
-                    sentence_scores[sent] = word_frequencies[word.lower()]
-                else:
-                    sentence_scores[sent] += word_frequencies[word.lower()]
-
-    # Finding number of sentences and applying percentage on it: since we require to show most X% lines in summary.
-    select_length = int(len(sentence_token) * (int(percent) / 100))
-
-    # Using nlargest library to get the top x% weighted sentences.
-    summary = nlargest(select_length, sentence_scores, key=sentence_scores.get)
-
-    # Later joining it to get the final summarized text.
-    final_summary = [word for word in summary]
-    summary = ' '.join(final_summary)
+    # Scoring words by their occurrence (stop words and punctuation left out), then sentences by their words. Sentence
+    # scoring is vectorized in frequency.py: one sparse sentence x term matrix and a matrix-vector product.
+    from frequency import candidate_mask, rank_sentences
+    mask = candidate_mask(document.lower_tokens, document.stop_mask, punctuation_items)
 
-    # Returning NLTK Summarization Output
-    return summary
+    # Sentences ordered by their score, summaries keep that order. Repeated sentences are scored (and returned) once.
+    return _document_ranking(document, rank_sentences(document.tokens, mask, document.sentences),
+                             document_order=False)
 
 
-def sumy_lsa_summarize(text_content, percent):
+def sumy_lsa_ranking(text_content, registry=None, document=None):
     # Latent Semantic Analysis is a unsupervised learning algorithm that can be used for extractive text summarization.
-    # Initializing the parser
-    parser = PlaintextParser.from_string(text_content, Tokenizer("english"))
-    # Initialize the stemmer
-    stemmer = Stemmer('english')
-    # Initializing the summarizer
-    summarizer = LsaSummarizer(stemmer)
-    summarizer.stop_words = get_stop_words('english')
-
-    # Finding number of sentences and applying percentage on it: since sumy requires number of lines
-    sentence_token = sent_tokenize(text_content)
-    select_length = int(len(sentence_token) * (int(percent) / 100))
-
-    # Evaluating and saving the Summary
-    summary = ""
-    for sentence in summarizer(parser.document, sentences_count=select_length):
-        summary += str(sentence)
-    # Returning NLTK Summarization Output
-    return summary
+    if registry is None:
+        registry = default_registry
+    if document is None:
+        document = prepare_document(text_content, registry)
+
+    if _is_long_document(document, registry):
+        # Long document mode: truncated SVD of the sparse term x sentence matrix instead of a full SVD.
+        from long_document import lsa_scores, rank_by_score
+        return _document_ranking(document, rank_by_score(lsa_scores(document)), document_order=True)
+    return _sumy_ranking('lsa', document, registry)
 
 
-def sumy_luhn_summarize(text_content, percent):
+def sumy_luhn_ranking(text_content, registry=None, document=None):
     # A naive approach based on TF-IDF and looking at the “window size” of non-important words between words of high
     # importance. It also assigns higher weights to sentences occurring near the beginning of a document.
-    # Initializing the parser
-    parser = PlaintextParser.from_string(text_content, Tokenizer("english"))
-    # Initialize the stemmer
-    stemmer = Stemmer('english')
-    # Initializing the summarizer
-    summarizer = LuhnSummarizer(stemmer)
-    summarizer.stop_words = get_stop_words('english')
-
-    # Finding number of sentences and applying percentage on it: since sumy requires number of lines
-    sentence_token = sent_tokenize(text_content)
-    select_length = int(len(sentence_token) * (int(percent) / 100))
-
-    # Evaluating and saving the Summary
-    summary = ""
-    for sentence in summarizer(parser.document, sentences_count=select_length):
-        summary += str(sentence)
-    # Returning NLTK Summarization Output
-    return summary
+    if registry is None:
+        registry = default_registry
+    if document is None:
+        document = prepare_document(text_content, registry)
+    return _sumy_ranking('luhn', document, registry)
 
 
-def sumy_text_rank_summarize(text_content, percent):
+def sumy_text_rank_ranking(text_content, registry=None, document=None):
     # TextRank is an unsupervised text summarization technique that uses the intuition behind the PageRank algorithm.
-    # Initializing the parser
-    parser = PlaintextParser.from_string(text_content, Tokenizer("english"))
-    # Initialize the stemmer
-    stemmer = Stemmer('english')
-    # Initializing the summarizer
-    summarizer = TextRankSummarizer(stemmer)
-    summarizer.stop_words = get_stop_words('english')
-
-    # Finding number of sentences and applying percentage on it: since sumy requires number of lines
-    sentence_token = sent_tokenize(text_content)
-    select_length = int(len(sentence_token) * (int(percent) / 100))
-
-    # Evaluating and saving the Summary
-    summary = ""
-    for sentence in summarizer(parser.document, sentences_count=select_length):
-        summary += str(sentence)
+    if registry is None:
+        registry = default_registry
+    if document is None:
+        document = prepare_document(text_content, registry)
+
+    if _is_long_document(document, registry):
+        # Long document mode: TextRank on a sparse similarity graph instead of the dense one built by sumy.
+        from long_document import text_rank_scores, rank_by_score
+        return _document_ranking(document, rank_by_score(text_rank_scores(document)), document_order=True)
+    return _sumy_ranking('text-rank', document, registry)
+
+
+# The summarizers: the sentences of the ranking of their algorithm which fit in the budget (selection.py). percent
+# may be None when another limit is given. split returns the list of sentences instead of one string.
+def gensim_summarize(text_content, percent, registry=None, document=None, split=False, max_sentences=None,
+                     max_chars=None, max_tokens=None):
+    # Returning Gensim Summarization Output
+    budget = SummaryBudget(None if percent is None else int(percent), max_sentences, max_chars, max_tokens)
+    return _summary_output(gensim_ranking(text_content, registry, document).select(budget), split)
+
+
+def spacy_summarize(text_content, percent, registry=None, document=None, split=False, max_sentences=None,
+                    max_chars=None, max_tokens=None):
+    # Returning Spacy Summarization Output
+    budget = SummaryBudget(None if percent is None else int(percent), max_sentences, max_chars, max_tokens)
+    return _summary_output(spacy_ranking(text_content, registry, document).select(budget), split)
+
+
+def nltk_summarize(text_content, percent, registry=None, document=None, split=False, max_sentences=None,
+                   max_chars=None, max_tokens=None):
     # Returning NLTK Summarization Output
-    return summary
+    budget = SummaryBudget(None if percent is None else int(percent), max_sentences, max_chars, max_tokens)
+    return _summary_output(nltk_ranking(text_content, registry, document).select(budget), split)
+
+
+def sumy_lsa_summarize(text_content, percent, registry=None, document=None, split=False, max_sentences=None,
+                       max_chars=None, max_tokens=None):
+    # Returning Sumy LSA Summarization Output
+    budget = SummaryBudget(None if percent is None else int(percent), max_sentences, max_chars, max_tokens)
+    return _summary_output(sumy_lsa_ranking(text_content, registry, document).select(budget), split)
+
+
+def sumy_luhn_summarize(text_content, percent, registry=None, document=None, split=False, max_sentences=None,
+                        max_chars=None, max_tokens=None):
+    # Returning Sumy Luhn Summarization Output
+    budget = SummaryBudget(None if percent is None else int(percent), max_sentences, max_chars, max_tokens)
+    return _summary_output(sumy_luhn_ranking(text_content, registry, document).select(budget), split)
+
+
+def sumy_text_rank_summarize(text_content, percent, registry=None, document=None, split=False, max_sentences=None,
+                             max_chars=None, max_tokens=None):
+    # Returning Sumy TextRank Summarization Output
+    budget = SummaryBudget(None if percent is None else int(percent), max_sentences, max_chars, max_tokens)
+    return _summary_output(sumy_text_rank_ranking(text_content, registry, document).select(budget), split)
+
+
+# Summarizer functions by request choice. Every function takes (text_content, percent, registry, document, split) and
+# the max_sentences, max_chars and max_tokens keyword arguments.
+SUMMARIZERS = {
+    'gensim-sum': gensim_summarize,  # Gensim Library for TextRank Based Summary.
+    'spacy-sum': spacy_summarize,  # Spacy Library for frequency-based summary.
+    'nltk-sum': nltk_summarize,  # NLTK Library used for frequency-based summary.
+    'sumy-lsa-sum': sumy_lsa_summarize,  # Sumy for extractive summary using LSA.
+    'sumy-luhn-sum': sumy_luhn_summarize,  # Sumy Library for TF-IDF Based Summary.
+    'sumy-text-rank-sum': sumy_text_rank_summarize,  # Sumy for Text Rank Based Summary.
+}
+
+# Ranking functions by request choice, taking (text_content, registry, document). A ranking serves any budget.
+RANKERS = {
+    'gensim-sum': gensim_ranking,
+    'spacy-sum': spacy_ranking,
+    'nltk-sum': nltk_ranking,
+    'sumy-lsa-sum': sumy_lsa_ranking,
+    'sumy-luhn-sum': sumy_luhn_ranking,
+    'sumy-text-rank-sum': sumy_text_rank_ranking,
+}
@@ -0,0 +1,178 @@
+# Flask Route Tests (app.py)
+# Request checking of the summary routes: bad arguments are answered with the usual 400 JSON error, before any
+# transcript is fetched, budgets no sentence fits in with a 400 error which is not cached, and algorithms stopped for
+# going over the resource budgets are replaced down their fallback chain. Run from the repository root:
+#   python -m pytest -q tests
+# The summary tests run nltk-sum on a fixed transcript, they are skipped when the NLTK data is not installed.
+# Flask App Import (Our Another File: app.py)
+import app as flask_app
+
+# Transcript Fetcher Import (Our Another File: fetcher.py)
+import fetcher
+
+# Resource Guard Import (Our Another File: guard.py)
+from guard import ResourceBudgetExceeded
+
+# Summarizer Import (Our Another File: summarizer.py)
+from summarizer import RANKERS
+
+# Other Imports
+from unittest import mock
+import os
+import unittest
+
+TRANSCRIPT = [
+    {'text': 'Python is great. The cat sat on the mat today.', 'start': 0.0, 'duration': 2.0},
+    {'text': 'Python programs are great fun. Dogs bark loudly at night.', 'start': 2.0, 'duration': 2.0},
+    {'text': 'Cats and dogs are pets. Python is used widely in data science.', 'start': 4.0, 'duration': 3.0},
+]
+
+
+def nltk_available():
+    try:
+        from nltk.corpus import stopwords
+        from nltk.tokenize import sent_tokenize
+        return bool(sent_tokenize('Test sentence.') and stopwords.words('english'))
+    except (ImportError, LookupError):
+        return False
+
+
+def make_app(**environment):
+    # App of create_app() with the environment variables of environment, without an isolation server.
+    environment.setdefault('GUARD_ISOLATION', 'never')
+    with mock.patch.dict(os.environ, environment):
+        return flask_app.create_app()
+
+
+class ArgumentTypesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_app()
+        cls.client = cls.app.test_client()
+
+    def assert_bad_request(self, response):
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.get_json()['success'])
+        self.assertIsNone(response.get_json()['response'])
+
+    def test_post_json_arguments_of_other_types(self):
+        for arguments in ({'id': 'abc', 'percent': 20, 'choice': 5},
+                          {'id': 'abc', 'percent': 20, 'choice': ['nltk-sum']},
+                          {'id': ['x'], 'percent': 20, 'choice': 'nltk-sum'},
+                          {'id': {'x': 1}, 'percent': 20, 'choice': 'nltk-sum'},
+                          {'id': 'abc', 'percent': [20], 'choice': 'nltk-sum'},
+                          {'id': 'abc', 'max_chars': {'value': 20}, 'choice': 'nltk-sum'},
+                          {'id': 'abc', 'percent': True, 'choice': 'nltk-sum'},
+                          {'id': 'abc', 'percent': 20.5, 'choice': 'nltk-sum'}):
+            with self.subTest(arguments=arguments):
+                self.assert_bad_request(self.client.post('/summarize/', json=arguments))
+
+    def test_batch_arguments_of_other_types(self):
+        for arguments in ({'ids': ['abc'], 'percent': 20, 'choice': 5},
+                          {'ids': ['abc'], 'percent': 20, 'choice': ['nltk-sum']},
+                          {'ids': ['abc'], 'percent': [20], 'choice': 'nltk-sum'},
+                          {'ids': [['x']], 'percent': 20, 'choice': 'nltk-sum'},
+                          {'ids': ['abc', 5], 'percent': 20, 'choice': 'nltk-sum'},
+                          {'ids': ['abc', ''], 'percent': 20, 'choice': 'nltk-sum'},
+                          {'ids': 'abc', 'percent': 20, 'choice': 'nltk-sum'},
+                          {'ids': [], 'percent': 20, 'choice': 'nltk-sum'}):
+            with self.subTest(arguments=arguments):
+                self.assert_bad_request(self.client.post('/summarize/batch/', json=arguments))
+
+    def test_query_arguments_are_checked(self):
+        for query in ('id=abc&percent=20', 'percent=20&choice=nltk-sum', 'id=abc&choice=nltk-sum',
+                      'id=abc&percent=-1&choice=nltk-sum', 'id=abc&percent=20&choice=unknown-sum'):
+            with self.subTest(query=query):
+                self.assert_bad_request(self.client.get('/summarize/?' + query))
+
+
+@unittest.skipUnless(nltk_available(), 'NLTK punkt and stopwords data not installed')
+class EmptySummaryTest(unittest.TestCase):
+    def setUp(self):
+        self.fetch = mock.patch.object(fetcher.TranscriptFetcher, 'fetch', return_value=TRANSCRIPT)
+        self.fetch.start()
+        self.app = make_app()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.fetch.stop()
+
+    def test_budget_no_sentence_fits_in(self):
+        for query in ('max_chars=5', 'percent=50&max_tokens=1'):
+            with self.subTest(query=query):
+                response = self.client.get('/summarize/?id=abc&choice=nltk-sum&' + query)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['success'])
+        self.assertEqual(self.app.extensions['result_cache'].stats()['memory_entries'], 0)
+
+    def test_several_choices_report_the_empty_one(self):
+        response = self.client.get('/summarize/?id=abc&choice=nltk-sum,sumy-luhn-sum&max_chars=5')
+        self.assertEqual(response.status_code, 200)
+        summaries = response.get_json()['response']['summaries']
+        self.assertFalse(summaries['nltk-sum']['success'])
+        self.assertEqual(self.app.extensions['result_cache'].stats()['memory_entries'], 0)
+
+    def test_budget_one_sentence_fits_in(self):
+        response = self.client.get('/summarize/?id=abc&choice=nltk-sum&max_chars=30')
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(response.get_json()['response']['processed_summary']), 30)
+        self.assertEqual(self.app.extensions['result_cache'].stats()['memory_entries'], 1)
+
+
+@unittest.skipUnless(nltk_available(), 'NLTK punkt and stopwords data not installed')
+class FallbackChainTest(unittest.TestCase):
+    # Every algorithm is "isolated", and the ones in killed are stopped as if they went over the memory budget.
+    def setUp(self):
+        self.fetch = mock.patch.object(fetcher.TranscriptFetcher, 'fetch', return_value=TRANSCRIPT)
+        self.fetch.start()
+        self.app = make_app()
+        self.client = self.app.test_client()
+        self.guard = self.app.extensions['resource_guard']
+        self.killed = set()
+        self.runs = []
+        registry = self.app.extensions['summarizer_registry']
+
+        def run_isolated(algorithm, document, seconds=None):
+            self.runs.append(algorithm)
+            if algorithm in self.killed:
+                return ResourceBudgetExceeded('{} used more than 60 MB and was stopped.'.format(algorithm)), 0.1
+            return RANKERS[algorithm](document.text, registry, document).to_dict(), 0.1
+
+        self.patches = [mock.patch.object(self.guard, 'isolates', return_value=True),
+                        mock.patch.object(self.guard, 'run_isolated', side_effect=run_isolated)]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.fetch.stop()
+
+    def test_fallback_of_a_fallback(self):
+        self.killed.update(['gensim-sum', 'sumy-text-rank-sum'])
+        response = self.client.get('/summarize/?id=abc&percent=50&choice=gensim-sum')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['response']['fallback'], 'nltk-sum')
+        self.assertEqual(self.runs, ['gensim-sum', 'sumy-text-rank-sum', 'nltk-sum'])
+        self.assertEqual(self.app.extensions['result_cache'].stats()['memory_entries'], 0)
+        self.assertEqual(self.guard.stats()['fallbacks'], 2)
+
+    def test_error_names_the_requested_choice(self):
+        self.killed.update(['gensim-sum', 'sumy-text-rank-sum', 'nltk-sum'])
+        response = self.client.get('/summarize/?id=abc&percent=50&choice=gensim-sum')
+        self.assertFalse(response.get_json()['success'])
+        self.assertIn('gensim-sum could not be summarized', response.get_json()['message'])
+        self.assertEqual(self.runs, ['gensim-sum', 'sumy-text-rank-sum', 'nltk-sum'])
+
+    def test_several_choices_share_fallbacks(self):
+        self.killed.update(['gensim-sum', 'sumy-text-rank-sum', 'sumy-lsa-sum'])
+        response = self.client.get('/summarize/?id=abc&percent=50&choice=gensim-sum,sumy-lsa-sum,nltk-sum')
+        summaries = response.get_json()['response']['summaries']
+        self.assertEqual(summaries['gensim-sum']['fallback'], 'nltk-sum')
+        self.assertEqual(summaries['sumy-lsa-sum']['fallback'], 'nltk-sum')
+        self.assertNotIn('fallback', summaries['nltk-sum'])
+        self.assertEqual(self.runs.count('nltk-sum'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
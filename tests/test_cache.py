@@ -0,0 +1,163 @@
+# Cache Tests (cache.py)
+# Transcript and result caches: lifetimes, cached errors, the SQLite tier shared by worker processes, and purges.
+# Run from the repository root:
+#   python -m pytest -q tests
+# Cache Import (Our Another File: cache.py)
+from cache import MemoryBackend, ResultCache, TranscriptCache, TranscriptsDisabled
+
+# Summary Budget Import (Our Another File: selection.py)
+from selection import SummaryBudget
+
+# Other Imports
+from unittest import mock
+import os
+import tempfile
+import unittest
+
+TRANSCRIPT = [{'text': 'Hello there.', 'start': 0.0, 'duration': 1.5}]
+
+
+class Clock:
+    # Stand-in for time.time in cache.py, moved forward by the tests.
+    def __init__(self):
+        self.now = 1000000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patch = mock.patch('cache.time.time', self.clock)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.fetch = mock.Mock(return_value=TRANSCRIPT)
+
+
+class MemoryBackendTest(CacheTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        memory = MemoryBackend(2)
+        memory.set('a', 1, self.clock.now + 10)
+        memory.set('b', 2, self.clock.now + 10)
+        memory.get('a')
+        memory.set('c', 3, self.clock.now + 10)
+        self.assertIsNone(memory.get('b'))
+        self.assertEqual([memory.get(key)[0] for key in ('a', 'c')], [1, 3])
+        self.assertEqual(memory.evictions, 1)
+
+    def test_expired_entry_is_missing(self):
+        memory = MemoryBackend(2)
+        memory.set('a', 1, self.clock.now + 10)
+        self.clock.now += 10
+        self.assertIsNone(memory.get('a'))
+        self.assertEqual(len(memory), 0)
+
+
+class TranscriptCacheTest(CacheTestCase):
+    def test_transcript_is_fetched_once_until_it_expires(self):
+        cache = TranscriptCache(ttl=60)
+        for _ in range(3):
+            self.assertEqual(cache.get_transcript('abc', fetch=self.fetch), TRANSCRIPT)
+        self.assertEqual(self.fetch.call_count, 1)
+        self.clock.now += 61
+        cache.get_transcript('abc', fetch=self.fetch)
+        self.assertEqual(self.fetch.call_count, 2)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_errors_are_cached_for_the_negative_lifetime(self):
+        cache = TranscriptCache(ttl=60, negative_ttl=10)
+        self.fetch.side_effect = TranscriptsDisabled('abc')
+        for _ in range(2):
+            with self.assertRaises(TranscriptsDisabled):
+                cache.get_transcript('abc', fetch=self.fetch)
+        self.assertEqual((self.fetch.call_count, cache.negative_hits), (1, 1))
+
+        self.clock.now += 11
+        self.fetch.side_effect = None
+        self.assertEqual(cache.get_transcript('abc', fetch=self.fetch), TRANSCRIPT)
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_other_errors_are_not_cached(self):
+        cache = TranscriptCache()
+        self.fetch.side_effect = ConnectionError('network down')
+        with self.assertRaises(ConnectionError):
+            cache.get_transcript('abc', fetch=self.fetch)
+        self.fetch.side_effect = None
+        self.assertEqual(cache.get_transcript('abc', fetch=self.fetch), TRANSCRIPT)
+
+    def test_document_and_rankings_live_as_long_as_the_transcript(self):
+        cache = TranscriptCache(ttl=60)
+        build = mock.Mock(return_value={'sentences': ['Hello there.']})
+        for _ in range(2):
+            self.assertEqual(cache.get_document('abc', build, fetch=self.fetch), {'sentences': ['Hello there.']})
+        cache.set_ranking('abc', 'nltk-sum', {'order': 'AAAAAA=='})
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(cache.get_ranking('abc', 'nltk-sum'), {'order': 'AAAAAA=='})
+        self.clock.now += 61
+        self.assertIsNone(cache.get_ranking('abc', 'nltk-sum'))
+
+    def test_purge_of_one_video(self):
+        cache = TranscriptCache()
+        for video_id in ('abc', 'abc_d'):
+            cache.get_transcript(video_id, fetch=self.fetch)
+            cache.set_ranking(video_id, 'nltk-sum', {'order': ''})
+        cache.purge('abc')
+        self.assertIsNone(cache.get_ranking('abc', 'nltk-sum'))
+        self.assertEqual(cache.get_ranking('abc_d', 'nltk-sum'), {'order': ''})
+        cache.get_transcript('abc', fetch=self.fetch)
+        self.assertEqual(self.fetch.call_count, 3)
+        cache.purge()
+        self.assertEqual(cache.stats()['memory_entries'], 0)
+        self.assertEqual(cache.stats()['rankings']['memory_entries'], 0)
+
+
+class SQLiteTierTest(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'cache.sqlite3')
+
+    def test_entries_are_shared_through_the_file(self):
+        # Two caches on one file, as two worker processes would have.
+        first, second = TranscriptCache(path=self.path), TranscriptCache(path=self.path)
+        first.get_transcript('abc', fetch=self.fetch)
+        first.set_ranking('abc', 'nltk-sum', {'order': ''})
+        self.assertEqual(second.get_transcript('abc', fetch=self.fetch), TRANSCRIPT)
+        self.assertEqual(second.get_ranking('abc', 'nltk-sum'), {'order': ''})
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertEqual(second.stats()['disk_entries'], 1)
+
+    def test_purge_reaches_the_memory_of_other_processes(self):
+        first, second = ResultCache(path=self.path), ResultCache(path=self.path)
+        budget = SummaryBudget(20)
+        first.set('abc', budget, ['nltk-sum'], {'processed_summary': 'Hello there.'})
+        self.assertEqual(second.get('abc', budget, ['nltk-sum']), {'processed_summary': 'Hello there.'})
+        first.purge('abc')
+        self.assertIsNone(second.get('abc', budget, ['nltk-sum']))
+
+    def test_disk_entries_expire(self):
+        cache = TranscriptCache(ttl=60, path=self.path)
+        cache.get_transcript('abc', fetch=self.fetch)
+        self.clock.now += 61
+        self.assertEqual(TranscriptCache(ttl=60, path=self.path).stats()['disk_entries'], 1)
+        TranscriptCache(ttl=60, path=self.path).get_transcript('abc', fetch=self.fetch)
+        self.assertEqual(self.fetch.call_count, 2)
+
+
+class ResultCacheTest(CacheTestCase):
+    def test_entries_by_budget_and_choices(self):
+        cache = ResultCache(ttl=60)
+        cache.set('abc', SummaryBudget(20), ['nltk-sum'], {'summary': 1})
+        self.assertEqual(cache.get('abc', SummaryBudget.from_arguments({'percent': '020'}), ['nltk-sum']),
+                         {'summary': 1})
+        self.assertIsNone(cache.get('abc', SummaryBudget(20, max_chars=100), ['nltk-sum']))
+        self.assertIsNone(cache.get('abc', SummaryBudget(20), ['nltk-sum', 'spacy-sum']))
+        self.clock.now += 61
+        self.assertIsNone(cache.get('abc', SummaryBudget(20), ['nltk-sum']))
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
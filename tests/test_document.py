@@ -0,0 +1,62 @@
+# Preprocessed Document Tests (document.py)
+# A transcript is tokenized once into a TranscriptDocument shared by every summarizer: its tokens must be the ones
+# word_tokenize gives for the whole text, and it must survive the JSON round trip of the cache. Run from the
+# repository root:
+#   python -m pytest -q tests
+# The tests are skipped when the NLTK data (punkt) is not installed.
+# Preprocessed Document Import (Our Another File: document.py)
+from document import TranscriptDocument
+
+# Other Imports
+import json
+import unittest
+
+SEGMENTS = [
+    {'text': "Mr. Smith didn't come today.", 'start': 0.0, 'duration': 2.0},
+    {'text': 'The cat sat on the mat... Then it left!', 'start': 2.0, 'duration': 3.0},
+    {'text': 'Was it the cat? "Yes," he said.', 'start': 5.0, 'duration': 2.5},
+]
+TEXT = ' '.join(segment['text'] for segment in SEGMENTS)
+STOP_WORDS = frozenset({'the', 'it', 'on', 'was', 'he', 'then'})
+
+
+def nltk_available():
+    try:
+        from nltk.tokenize import sent_tokenize
+        return bool(sent_tokenize('Test sentence.'))
+    except (ImportError, LookupError):
+        return False
+
+
+@unittest.skipUnless(nltk_available(), 'NLTK punkt data not installed')
+class TranscriptDocumentTest(unittest.TestCase):
+    def setUp(self):
+        self.document = TranscriptDocument.from_text(TEXT, STOP_WORDS, SEGMENTS)
+
+    def test_tokens_are_those_of_the_whole_text(self):
+        from nltk.tokenize import sent_tokenize, word_tokenize
+        self.assertEqual(self.document.sentences, sent_tokenize(TEXT))
+        self.assertEqual(self.document.tokens, word_tokenize(TEXT))
+        self.assertEqual(self.document.lower_tokens, [token.lower() for token in word_tokenize(TEXT)])
+        self.assertEqual(self.document.stop_mask, [token.lower() in STOP_WORDS for token in word_tokenize(TEXT)])
+
+    def test_sentence_tokens(self):
+        from nltk.tokenize import word_tokenize
+        for index, sentence in enumerate(self.document.sentences):
+            self.assertEqual(self.document.sentence_tokens(index), word_tokenize(sentence))
+        self.assertEqual(len(self.document), len(self.document.sentences))
+
+    def test_json_round_trip(self):
+        document = TranscriptDocument.from_dict(json.loads(json.dumps(self.document.to_dict())))
+        self.assertEqual(document.to_dict(), self.document.to_dict())
+        self.assertEqual(document.timeline(document.sentences[-1:]), self.document.timeline(document.sentences[-1:]))
+
+    def test_documents_without_segments_have_no_timeline(self):
+        document = TranscriptDocument.from_text(TEXT, STOP_WORDS)
+        self.assertIsNone(document.index)
+        self.assertIsNone(document.timeline(document.sentences[:1]))
+        self.assertIsNone(TranscriptDocument.from_dict(document.to_dict()).index)
+
+
+if __name__ == '__main__':
+    unittest.main()
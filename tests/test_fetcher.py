@@ -0,0 +1,113 @@
+# Transcript Fetcher Tests (fetcher.py)
+# Rate limiting with the token bucket, coalescing of concurrent fetches of one video, and which errors are retried.
+# YouTube is never called: the upstream fetch of every fetcher is replaced. Run from the repository root:
+#   python -m pytest -q tests
+# Transcript Fetcher Import (Our Another File: fetcher.py)
+from fetcher import TokenBucket, TranscriptFetcher, is_retryable
+
+# YouTubeTranscriptAPI Imports
+from youtube_transcript_api import TooManyRequests, TranscriptsDisabled, YouTubeRequestFailed
+
+# Other Imports
+from unittest import mock
+import requests
+import threading
+import time
+import unittest
+
+TRANSCRIPT = [{'text': 'Hello there.', 'start': 0.0, 'duration': 1.5}]
+
+
+def request_failed(status_code):
+    # YouTubeRequestFailed as the transcript API raises it: while handling the requests.HTTPError of the response.
+    response = requests.Response()
+    response.status_code = status_code
+    try:
+        raise requests.HTTPError(response=response)
+    except requests.HTTPError as http_error:
+        try:
+            raise YouTubeRequestFailed('abc', http_error)
+        except YouTubeRequestFailed as error:
+            return error
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=50, burst=3)
+        self.assertTrue(all(bucket.acquire(timeout=0) for _ in range(3)))
+        self.assertFalse(bucket.acquire(timeout=0))
+        start_time = time.monotonic()
+        self.assertTrue(bucket.acquire(timeout=1))
+        # One token is back after 1 / rate seconds.
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.015)
+
+
+class RetryableTest(unittest.TestCase):
+    def test_classification(self):
+        self.assertTrue(is_retryable(TooManyRequests('abc')))
+        self.assertTrue(is_retryable(requests.ConnectionError()))
+        self.assertTrue(is_retryable(requests.Timeout()))
+        self.assertTrue(is_retryable(request_failed(503)))
+        self.assertTrue(is_retryable(request_failed(429)))
+        self.assertFalse(is_retryable(request_failed(404)))
+        self.assertFalse(is_retryable(TranscriptsDisabled('abc')))
+        self.assertFalse(is_retryable(ValueError()))
+
+
+class TranscriptFetcherTest(unittest.TestCase):
+    def make_fetcher(self, upstream, **options):
+        options.setdefault('backoff', 0)
+        fetcher = TranscriptFetcher(**options)
+        self.addCleanup(fetcher.close)
+        fetcher._fetch_upstream = upstream
+        return fetcher
+
+    def test_concurrent_fetches_of_one_video_are_coalesced(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def upstream(video_id, languages):
+            started.set()
+            release.wait(10)
+            return TRANSCRIPT
+
+        fetcher = self.make_fetcher(mock.Mock(side_effect=upstream))
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(fetcher.fetch('abc'))) for _ in range(4)]
+        threads[0].start()
+        started.wait(10)
+        for thread in threads[1:]:
+            thread.start()
+        deadline = time.monotonic() + 10
+        while fetcher.stats()['coalesced'] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertEqual(results, [TRANSCRIPT] * 4)
+        self.assertEqual(fetcher._fetch_upstream.call_count, 1)
+        self.assertEqual(fetcher.stats()['in_flight_videos'], 0)
+        # Fetches after the first one ended go upstream again (caching is TranscriptCache's job).
+        fetcher.fetch('abc')
+        self.assertEqual(fetcher._fetch_upstream.call_count, 2)
+
+    def test_retryable_errors_are_retried(self):
+        fetcher = self.make_fetcher(mock.Mock(side_effect=[TooManyRequests('abc'), request_failed(502), TRANSCRIPT]))
+        self.assertEqual(fetcher.fetch('abc'), TRANSCRIPT)
+        self.assertEqual((fetcher.stats()['upstream_fetches'], fetcher.stats()['retried']), (3, 2))
+
+    def test_other_errors_and_last_attempt_are_raised(self):
+        fetcher = self.make_fetcher(mock.Mock(side_effect=TranscriptsDisabled('abc')))
+        with self.assertRaises(TranscriptsDisabled):
+            fetcher.fetch('abc')
+        self.assertEqual(fetcher._fetch_upstream.call_count, 1)
+
+        fetcher = self.make_fetcher(mock.Mock(side_effect=TooManyRequests('abc')), retries=2)
+        with self.assertRaises(TooManyRequests):
+            fetcher.fetch('abc')
+        self.assertEqual(fetcher._fetch_upstream.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,236 @@
+# Frequency Scoring Tests (frequency.py)
+# rank_sentences must select the same sentences, in the same order, as the dictionary loops and heapq.nlargest the
+# nltk-sum and spacy-sum summarizers used before scoring was vectorized. Run from the repository root:
+#   python -m pytest -q tests
+# The end-to-end tests run nltk_summarize and spacy_summarize through their real tokenizers; they are skipped when the
+# NLTK data (punkt, stopwords) or the spaCy model (SPACY_MODEL, default en_core_web_sm) is not installed.
+# Frequency Scoring Import (Our Another File: frequency.py)
+from frequency import candidate_mask, rank_sentences
+
+# Summarizer Import (Our Another File: summarizer.py)
+from summarizer import SummarizerRegistry, nltk_summarize, spacy_summarize
+
+# Other Imports
+from heapq import nlargest
+from string import punctuation
+import os
+import re
+import unittest
+
+STOP_WORDS = {'a', 'an', 'and', 'the', 'is', 'it', 'of', 'to', 'in', 'on', 'this', 'that', 'we', 'you', 'was'}
+PUNCTUATION_ITEMS = punctuation + '\n'
+
+# Fixed corpus: repeated sentences (exact and in other case), sentences with exactly the same words in another order
+# (tied scores), mixed case words, punctuation only tokens ("...", "--", "!?") and a sentence with no scored word.
+CORPUS = [
+    'The cat sat on the mat.',
+    'Cats chase mice in the barn.',
+    'Mice chase cats in the barn.',
+    'The cat sat on the mat.',
+    'Python is great... Python is fast!?',
+    'python is GREAT -- and python is fun.',
+    'It was the best of times.',
+    'The barn cat chased the mice.',
+    'And so it is.',
+    'Cats chase mice in the barn.',
+    'The cat sat on the mat.',
+    'THE CAT SAT ON THE MAT.',
+    'Mice, cats and barns: the farm.',
+    '... -- !?',
+]
+
+
+def tokenize(sentence):
+    # Word tokens in the manner of word_tokenize: words, runs of dots or dashes, and single punctuation characters.
+    return re.findall(r"\w+|\.\.\.|--|[^\w\s]", sentence)
+
+
+def baseline_ranking(sentences, count, merge_duplicates):
+    # Copy of the scoring the summarizers used before frequency.py, on the tokens of sentences. With merge_duplicates
+    # sentences are dictionary keys by text (nltk-sum), else every sentence is its own key (spacy-sum's Span objects).
+    # Returns the count best sentences as indices of their first occurrence.
+    tokens = [token for sentence in sentences for token in tokenize(sentence)]
+    word_frequencies = {}
+    for word in tokens:
+        if word.lower() not in STOP_WORDS:
+            if word.lower() not in PUNCTUATION_ITEMS:
+                if word not in word_frequencies.keys():
+                    word_frequencies[word] = 1
+                else:
+                    word_frequencies[word] += 1
+    max_frequency = max(word_frequencies.values())
+    for word in word_frequencies.keys():
+        word_frequencies[word] = word_frequencies[word] / max_frequency
+
+    sentence_scores = {}
+    for index, sent in enumerate(sentences):
+        key = sentences.index(sent) if merge_duplicates else index
+        for word in sent.split(" "):
+            if word.lower() in word_frequencies.keys():
+                if key not in sentence_scores.keys():
+                    sentence_scores[key] = word_frequencies[word.lower()]
+                else:
+                    sentence_scores[key] += word_frequencies[word.lower()]
+    return nlargest(count, sentence_scores, key=sentence_scores.get)
+
+
+def vectorized_ranking(sentences, merge_duplicates):
+    tokens = [token for sentence in sentences for token in tokenize(sentence)]
+    lower_tokens = [token.lower() for token in tokens]
+    mask = candidate_mask(lower_tokens, [token in STOP_WORDS for token in lower_tokens], PUNCTUATION_ITEMS)
+    return [int(index) for index in rank_sentences(tokens, mask, sentences, merge_duplicates)]
+
+
+class RankSentencesTest(unittest.TestCase):
+    def assert_same_summaries(self, sentences, merge_duplicates):
+        ranked = vectorized_ranking(sentences, merge_duplicates)
+        # Every summary length, from one sentence to all the scored ones.
+        for count in range(1, len(ranked) + 1):
+            self.assertEqual(ranked[:count], baseline_ranking(sentences, count, merge_duplicates), count)
+        self.assertEqual(len(ranked), len(baseline_ranking(sentences, len(sentences), merge_duplicates)))
+
+    def test_merged_duplicates_nltk(self):
+        self.assert_same_summaries(CORPUS, merge_duplicates=True)
+
+    def test_unmerged_duplicates_spacy(self):
+        self.assert_same_summaries(CORPUS, merge_duplicates=False)
+
+    def test_exact_ties_keep_first_occurrence_order(self):
+        sentences = ['Mice chase cats.', 'Cats chase mice.', 'Chase mice cats.']
+        for merge_duplicates in (True, False):
+            self.assertEqual(vectorized_ranking(sentences, merge_duplicates), [0, 1, 2])
+            self.assert_same_summaries(sentences, merge_duplicates)
+
+    def test_repeated_sentences_add_up_when_merged(self):
+        sentences = ['alpha beta gamma delta epsilon zeta eta', 'common words', 'common words', 'common words']
+        self.assertEqual(vectorized_ranking(sentences, True), [1, 0])
+        self.assertEqual(vectorized_ranking(sentences, False), [0, 1, 2, 3])
+        for merge_duplicates in (True, False):
+            self.assert_same_summaries(sentences, merge_duplicates)
+
+    def test_punctuation_only_tokens(self):
+        # "..." and "--" are not single punctuation characters: the baseline counted them as words.
+        sentences = ['Wait... what -- really?', 'Wait for it.', '... --', 'Really now.']
+        for merge_duplicates in (True, False):
+            self.assert_same_summaries(sentences, merge_duplicates)
+
+    def test_no_words_to_score(self):
+        with self.assertRaises(ValueError):
+            vectorized_ranking(['The.', 'And it is.'], True)
+
+
+# Transcript-like text for the end-to-end tests: repeated sentences, mixed case and punctuation between sentences.
+TRANSCRIPT = ' '.join(CORPUS[:-1] + [
+    'Today we talk about cats, mice and the barn.',
+    'The farm has a barn and the barn has mice.',
+    'Python is great for counting words.',
+    'Cats chase mice in the barn.',
+    'Counting words is what this summarizer does.',
+    'That is all for today.',
+])
+
+REGISTRY = SummarizerRegistry(spacy_model=os.environ.get('SPACY_MODEL', 'en_core_web_sm'))
+
+
+def nltk_available():
+    try:
+        from nltk.tokenize import sent_tokenize, word_tokenize
+        word_tokenize(sent_tokenize('Test sentence.')[0])
+        return bool(REGISTRY.nltk_stop_words)
+    except (ImportError, LookupError):
+        return False
+
+
+def spacy_available():
+    try:
+        return REGISTRY.nlp is not None
+    except (ImportError, OSError):
+        return False
+
+
+def baseline_nltk_summarize(text_content, percent):
+    # Copy of nltk_summarize before frequency.py (dictionary loops and heapq.nlargest), on NLTK's tokenizers.
+    from nltk.corpus import stopwords
+    from nltk.tokenize import sent_tokenize, word_tokenize
+    tokens = word_tokenize(text_content)
+    stop_words = stopwords.words('english')
+    punctuation_items = punctuation + '\n'
+    word_frequencies = {}
+    for word in tokens:
+        if word.lower() not in stop_words:
+            if word.lower() not in punctuation_items:
+                if word not in word_frequencies.keys():
+                    word_frequencies[word] = 1
+                else:
+                    word_frequencies[word] += 1
+    max_frequency = max(word_frequencies.values())
+    for word in word_frequencies.keys():
+        word_frequencies[word] = word_frequencies[word] / max_frequency
+
+    sentence_token = sent_tokenize(text_content)
+    sentence_scores = {}
+    for sent in sentence_token:
+        for word in sent.split(" "):
+            if word.lower() in word_frequencies.keys():
+                if sent not in sentence_scores.keys():
+                    sentence_scores[sent] = word_frequencies[word.lower()]
+                else:
+                    sentence_scores[sent] += word_frequencies[word.lower()]
+    select_length = int(len(sentence_token) * (int(percent) / 100))
+    return ' '.join(nlargest(select_length, sentence_scores, key=sentence_scores.get))
+
+
+def baseline_spacy_summarize(text_content, percent):
+    # Copy of spacy_summarize before frequency.py, on the registry's spaCy pipeline (the one spacy_summarize uses, the
+    # model without the components it does not need).
+    from spacy.lang.en.stop_words import STOP_WORDS
+    stop_words = list(STOP_WORDS)
+    punctuation_items = punctuation + '\n'
+    nlp_object = REGISTRY.nlp(text_content)
+    word_frequencies = {}
+    for word in nlp_object:
+        if word.text.lower() not in stop_words:
+            if word.text.lower() not in punctuation_items:
+                if word.text not in word_frequencies.keys():
+                    word_frequencies[word.text] = 1
+                else:
+                    word_frequencies[word.text] += 1
+    max_frequency = max(word_frequencies.values())
+    for word in word_frequencies.keys():
+        word_frequencies[word] = word_frequencies[word] / max_frequency
+
+    sentence_token = [sentence for sentence in nlp_object.sents]
+    sentence_scores = {}
+    for sent in sentence_token:
+        for word in sent.text.split(" "):
+            if word.lower() in word_frequencies.keys():
+                if sent not in sentence_scores.keys():
+                    sentence_scores[sent] = word_frequencies[word.lower()]
+                else:
+                    sentence_scores[sent] += word_frequencies[word.lower()]
+    select_length = int(len(sentence_token) * (int(percent) / 100))
+    return ' '.join(sent.text for sent in nlargest(select_length, sentence_scores, key=sentence_scores.get))
+
+
+class SummarizeEndToEndTest(unittest.TestCase):
+    # Percents from one sentence to all of them. Below one sentence the baseline returned an empty summary, the
+    # summarizers now keep the best sentence (SummaryBudget.sentence_limit), so those percents are not compared.
+    PERCENTS = (10, 20, 25, 33, 50, 75, 90, 100)
+
+    def assert_same_summaries(self, summarize, baseline_summarize):
+        for percent in self.PERCENTS:
+            expected = baseline_summarize(TRANSCRIPT, percent)
+            if expected:
+                self.assertEqual(summarize(TRANSCRIPT, percent, REGISTRY), expected, percent)
+
+    @unittest.skipUnless(nltk_available(), 'NLTK punkt and stopwords data not installed')
+    def test_nltk_summarize_matches_baseline(self):
+        self.assert_same_summaries(nltk_summarize, baseline_nltk_summarize)
+
+    @unittest.skipUnless(nltk_available() and spacy_available(), 'spaCy model or NLTK data not installed')
+    def test_spacy_summarize_matches_baseline(self):
+        self.assert_same_summaries(spacy_summarize, baseline_spacy_summarize)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+# Resource Guard Tests (guard.py)
+# Cost estimates of the algorithms, the algorithm planned for each choice down the fallback table, and isolated
+# subprocesses: the isolation server warms the registry up when it starts, and that time is not taken from the budget
+# of the first algorithm. Run from the repository root:
+#   python -m pytest -q tests
+# The isolation tests need os.fork and the NLTK data, they are skipped without them.
+# Resource Guard Import (Our Another File: guard.py)
+from guard import COSTS, FALLBACKS, ISOLATION_AVAILABLE, ResourceBudgetExceeded, ResourceGuard
+
+# Summarizer Import (Our Another File: summarizer.py)
+from summarizer import SummarizerRegistry, prepare_document
+
+# Other Imports
+from types import SimpleNamespace
+import time
+import unittest
+
+TEXT = ('Python is great. The cat sat on the mat today. Python programs are great fun. Dogs bark loudly at night. '
+        'Cats and dogs are pets. Python is used widely in data science.')
+
+
+def nltk_available():
+    try:
+        from nltk.corpus import stopwords
+        from nltk.tokenize import sent_tokenize
+        return bool(sent_tokenize('Test sentence.') and stopwords.words('english'))
+    except (ImportError, LookupError):
+        return False
+
+
+def make_document(sentences, characters_per_sentence=100):
+    # Stand-in for a TranscriptDocument of sentences sentences: estimates only use its sentence count and text length.
+    return SimpleNamespace(sentences=['x'] * sentences, text='x' * (sentences * characters_per_sentence))
+
+
+def make_guard(memory_mb=512, seconds=60):
+    return ResourceGuard(SummarizerRegistry(long_document_sentences=1000), memory_mb, seconds, isolation='never')
+
+
+class CostEstimateTest(unittest.TestCase):
+    def test_estimates(self):
+        guard = make_guard()
+        # gensim-sum builds a graph of every sentence pair: 20 MB + 150 MB per million pairs (1000 sentences squared).
+        estimate = guard.estimate('gensim-sum', make_document(500))
+        self.assertAlmostEqual(estimate.memory_mb, 20 + 150 * 0.25)
+        self.assertAlmostEqual(estimate.seconds, 0.2 + 12 * 0.25)
+        # nltk-sum grows with the text only.
+        estimate = guard.estimate('nltk-sum', make_document(2000))
+        self.assertAlmostEqual(estimate.memory_mb, 4 + 0.004 * 200)
+        self.assertTrue(estimate.fits(5, 1))
+        self.assertFalse(estimate.fits(4, 1))
+
+    def test_long_documents_use_their_own_costs(self):
+        guard = make_guard()
+        self.assertAlmostEqual(guard.estimate('gensim-sum', make_document(1000)).memory_mb, 170)
+        self.assertAlmostEqual(guard.estimate('gensim-sum', make_document(2000)).memory_mb, 52 + 0.3 * 2)
+        self.assertAlmostEqual(guard.estimate('sumy-lsa-sum', make_document(2000)).memory_mb, 13 + 3.5 * 2)
+
+
+class FallbackTableTest(unittest.TestCase):
+    def test_every_chain_ends_at_nltk_sum(self):
+        for choice in COSTS:
+            seen = [choice]
+            while seen[-1] in FALLBACKS:
+                seen.append(FALLBACKS[seen[-1]])
+                self.assertEqual(len(seen), len(set(seen)), seen)
+            self.assertEqual(seen[-1], 'nltk-sum', choice)
+
+    def test_plan_takes_the_first_fitting_algorithm(self):
+        document = make_document(1000)
+        self.assertEqual(make_guard(memory_mb=512).plan('gensim-sum', document), 'gensim-sum')
+        # gensim-sum needs 170 MB, sumy-text-rank-sum 27 MB and nltk-sum about 4 MB.
+        self.assertEqual(make_guard(memory_mb=60).plan('gensim-sum', document), 'sumy-text-rank-sum')
+        guard = make_guard(memory_mb=20)
+        self.assertEqual(guard.plan('gensim-sum', document), 'nltk-sum')
+        self.assertEqual(guard.plan('spacy-sum', make_document(200)), 'spacy-sum')
+        self.assertEqual(guard.stats()['fallbacks'], 1)
+
+    def test_plan_rejects_when_nothing_fits(self):
+        guard = make_guard(memory_mb=1)
+        with self.assertRaises(ResourceBudgetExceeded) as context:
+            guard.plan('sumy-lsa-sum', make_document(1000))
+        self.assertIn('sumy-lsa-sum', str(context.exception))
+        self.assertEqual(guard.stats()['rejected'], 1)
+
+    def test_fallback_after_a_run_over_the_budgets(self):
+        guard = make_guard(memory_mb=20)
+        document = make_document(1000)
+        # sumy-text-rank-sum (27 MB) does not fit in 20 MB: gensim-sum falls back straight to nltk-sum.
+        self.assertEqual(guard.fallback('gensim-sum', document), 'nltk-sum')
+        self.assertEqual(make_guard().fallback('gensim-sum', document), 'sumy-text-rank-sum')
+        self.assertIsNone(guard.fallback('nltk-sum', document))
+        self.assertFalse(guard.isolates('gensim-sum', document))
+
+
+class SlowWarmUpRegistry(SummarizerRegistry):
+    # Registry whose warm-up takes warm_up_seconds, building only what nltk-sum needs.
+    warm_up_seconds = 1.0
+
+    def warm_up(self):
+        start_time = time.perf_counter()
+        prepare_document('Warming up. The tokenizers are loaded.', self)
+        time.sleep(self.warm_up_seconds)
+        return time.perf_counter() - start_time
+
+
+@unittest.skipUnless(ISOLATION_AVAILABLE and nltk_available(), 'os.fork or NLTK data not available')
+class IsolationTest(unittest.TestCase):
+    def setUp(self):
+        self.guard = ResourceGuard(SlowWarmUpRegistry(), memory_mb=512, seconds=0.5, isolation='always')
+
+    def tearDown(self):
+        self.guard.server.close()
+
+    def test_warm_up_is_not_part_of_the_time_budget(self):
+        # The first run starts while the server is still warming up, for longer than the 0.5 seconds budget.
+        document = prepare_document(TEXT, SlowWarmUpRegistry())
+        ranking, seconds = self.guard.run_isolated('nltk-sum', document)
+        self.assertIsInstance(ranking, dict)
+        self.assertLess(seconds, 0.5)
+        self.assertEqual(self.guard.stats()['killed'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# Background Job Tests (jobs.py)
+# Identical requests share one job while it is queued or running, the number of pending jobs is bounded, and finished
+# jobs are forgotten after their retention time. Run from the repository root:
+#   python -m pytest -q tests
+# Background Jobs Import (Our Another File: jobs.py)
+from jobs import JobManager, JobQueueFull
+
+# Other Imports
+from unittest import mock
+import threading
+import time
+import unittest
+
+# Seconds to wait for a job to finish before failing the test.
+TIMEOUT = 10
+
+
+class JobManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = JobManager(max_workers=2, max_pending=2, retention=60)
+        self.addCleanup(self.manager.shutdown)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def blocked(self, body):
+        # Job function which reports its stages and waits for the test to release it.
+        def function(job):
+            job.set_stage('fetching')
+            self.release.wait(TIMEOUT)
+            job.set_stage('summarizing')
+            return body, 200
+        return function
+
+    def wait_finished(self, job):
+        for _ in range(TIMEOUT * 100):
+            if job.state == 'finished':
+                return
+            time.sleep(0.01)
+        self.fail('job {} did not finish'.format(job.id))
+
+    def test_identical_requests_share_the_job(self):
+        job, created = self.manager.submit(('abc', '20', ('nltk-sum',)), self.blocked({'summary': 1}))
+        same, same_created = self.manager.submit(('abc', '20', ('nltk-sum',)), self.blocked({'summary': 2}))
+        self.assertEqual((created, same_created), (True, False))
+        self.assertIs(same, job)
+        self.assertEqual(self.manager.stats()['deduplicated'], 1)
+
+        self.release.set()
+        self.wait_finished(job)
+        self.assertEqual((job.result, job.status_code), ({'summary': 1}, 200))
+        self.assertEqual(job.to_dict()['progress'], 100)
+        # Finished: the next identical request starts a new job.
+        again, again_created = self.manager.submit(('abc', '20', ('nltk-sum',)), self.blocked({'summary': 3}))
+        self.assertTrue(again_created)
+        self.assertIsNot(again, job)
+
+    def test_pending_jobs_are_bounded(self):
+        self.manager.submit('a', self.blocked({}))
+        self.manager.submit('b', self.blocked({}))
+        with self.assertRaises(JobQueueFull):
+            self.manager.submit('c', self.blocked({}))
+        self.assertEqual(self.manager.stats()['rejected'], 1)
+        self.assertEqual(self.manager.stats()['pending'], 2)
+
+    def test_failed_function_gives_a_500_result(self):
+        job, _ = self.manager.submit('a', mock.Mock(side_effect=RuntimeError('boom')))
+        self.wait_finished(job)
+        self.assertEqual(job.status_code, 500)
+        self.assertFalse(job.result['success'])
+
+    def test_finished_jobs_expire_after_retention(self):
+        job, _ = self.manager.submit('a', lambda job: ({'summary': 1}, 200))
+        self.wait_finished(job)
+        self.assertIs(self.manager.get(job.id), job)
+        with mock.patch('jobs.time.time', return_value=job.finished_at + 61):
+            self.assertIsNone(self.manager.get(job.id))
+        self.assertEqual(self.manager.stats()['jobs'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+# Lazy Import Tests (summarizer.py, document.py and app.py)
+# Starting the app must not import the summarizer libraries: they are imported on first use, or by
+# SummarizerRegistry.warm_up() with SUMMARIZER_PRELOAD=1. Each check runs in a new Python process, since this one
+# may have imported them already. Run from the repository root:
+#   python -m pytest -q tests
+# Other Imports
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top level packages which only the summarizers need.
+SUMMARIZER_LIBRARIES = ('gensim', 'nltk', 'numpy', 'scipy', 'spacy', 'sumy')
+
+
+# Printed by the new process once code ran: the SUMMARIZER_LIBRARIES (its arguments) it imported.
+REPORT = """
+import json, sys
+print(json.dumps(sorted({name.split('.')[0] for name in sys.modules} & set(sys.argv[1:]))))
+"""
+
+
+def imported_libraries(code, **environment):
+    # Runs code in a new Python process from the repository root, returns the SUMMARIZER_LIBRARIES it imported.
+    completed = subprocess.run([sys.executable, '-c', code + REPORT] + list(SUMMARIZER_LIBRARIES), cwd=REPOSITORY,
+                               capture_output=True, text=True, env=dict(os.environ, **environment), timeout=120)
+    if completed.returncode != 0:
+        raise AssertionError(completed.stderr)
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_summarizer_modules(self):
+        self.assertEqual(imported_libraries('import summarizer, document, workers, guard'), [])
+
+    def test_app_start(self):
+        self.assertEqual(imported_libraries('import app\napp.create_app()', GUARD_ISOLATION='never',
+                                            SUMMARIZER_PRELOAD='0', NLTK_DATA_CHECK='0'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
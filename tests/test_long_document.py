@@ -0,0 +1,100 @@
+# Long Document Mode Tests (long_document.py)
+# The sparse, chunked TextRank and the truncated SVD of LSA must score sentences as their dense computations do.
+# Run from the repository root:
+#   python -m pytest -q tests
+# Long Document Mode Import (Our Another File: long_document.py)
+from long_document import lsa_scores, rank_by_score, similarity_graph, term_matrix, text_rank_scores, tfidf_rows
+
+# Preprocessed Document Import (Our Another File: document.py)
+from document import TranscriptDocument
+
+# NumPy Imports
+import numpy as np
+
+# Other Imports
+import re
+import unittest
+
+STOP_WORDS = {'a', 'an', 'and', 'the', 'is', 'it', 'of', 'to', 'in', 'on', 'we', 'was'}
+WORDS = ['cat', 'dog', 'barn', 'mice', 'python', 'code', 'farm', 'night', 'data', 'graph', 'rank', 'matrix']
+
+
+def make_document(sentences):
+    # TranscriptDocument of sentences, word tokens split by a regular expression instead of NLTK.
+    tokens = []
+    bounds = [0]
+    for sentence in sentences:
+        tokens.extend(re.findall(r"\w+|[^\w\s]", sentence))
+        bounds.append(len(tokens))
+    lower_tokens = [token.lower() for token in tokens]
+    return TranscriptDocument(' '.join(sentences), sentences, tokens, lower_tokens,
+                              [token in STOP_WORDS for token in lower_tokens], bounds)
+
+
+def random_sentences(count, seed=7):
+    generator = np.random.default_rng(seed)
+    return ['The {} and the {} of {} {}.'.format(*generator.choice(WORDS, 4)) for _ in range(count)]
+
+
+def dense_pagerank(graph, damping=0.85, iterations=100, tolerance=1.0e-6):
+    # The same power iteration on a dense matrix.
+    count = graph.shape[0]
+    out_weights = graph.sum(axis=1)
+    dangling = out_weights == 0
+    out_weights[dangling] = 1
+    transition = (graph / out_weights[:, None]).T
+    ranks = np.full(count, 1.0 / count)
+    for _ in range(iterations):
+        new_ranks = (1 - damping) / count + damping * (transition @ ranks + ranks[dangling].sum() / count)
+        if np.abs(new_ranks - ranks).sum() < tolerance:
+            return new_ranks
+        ranks = new_ranks
+    return ranks
+
+
+class LongDocumentTest(unittest.TestCase):
+    def test_term_matrix(self):
+        counts = term_matrix(make_document(['The cat and the cat.', 'A dog, a barn!', 'It is.']))
+        self.assertEqual(counts.toarray().tolist(), [[2, 0, 0], [0, 1, 1], [0, 0, 0]])
+
+    def test_chunks_give_the_same_graph(self):
+        matrix = tfidf_rows(term_matrix(make_document(random_sentences(60))))
+        whole = similarity_graph(matrix, neighbours=5)
+        for chunk_cells in (60, 7 * 60, 1):
+            chunked = similarity_graph(matrix, neighbours=5, chunk_cells=chunk_cells)
+            self.assertTrue(np.allclose(chunked.toarray(), whole.toarray()), chunk_cells)
+        self.assertTrue(np.allclose(whole.toarray(), whole.toarray().T))
+
+    def test_text_rank_with_every_neighbour_is_dense_text_rank(self):
+        document = make_document(random_sentences(40))
+        matrix = tfidf_rows(term_matrix(document)).toarray()
+        graph = matrix @ matrix.T
+        np.fill_diagonal(graph, 0)
+        graph[graph <= 0.05] = 0
+        scores = text_rank_scores(document, neighbours=40, chunk_cells=100)
+        self.assertTrue(np.allclose(scores, dense_pagerank(graph)))
+
+    def test_lsa_is_the_truncated_dense_svd(self):
+        document = make_document(random_sentences(50))
+        counts = term_matrix(document).toarray()
+        max_counts = counts.max(axis=1)
+        max_counts[max_counts == 0] = 1
+        weighted = np.where(counts > 0, 0.4 + 0.6 * counts / max_counts[:, None], 0).T
+        _, sigma, v_matrix = np.linalg.svd(weighted, full_matrices=False)
+        for dimensions in (3, 100):
+            # 100 dimensions is more than the 12 terms allow: svds keeps one less than the smaller side of the matrix.
+            kept = min(dimensions, min(weighted.shape) - 1)
+            expected = np.sqrt(((sigma[:kept] ** 2)[:, None] * v_matrix[:kept] ** 2).sum(axis=0))
+            self.assertTrue(np.allclose(lsa_scores(document, dimensions), expected), dimensions)
+
+    def test_lsa_of_a_tiny_document_uses_the_dense_svd(self):
+        # One term: svds can not be used, every dimension of the dense SVD is kept.
+        document = make_document(['The cat.', 'A cat, a cat.', 'It is.'])
+        self.assertTrue(np.allclose(lsa_scores(document), [1.0, 1.0, 0.0]))
+
+    def test_rank_by_score_keeps_ties_in_transcript_order(self):
+        self.assertEqual(rank_by_score(np.array([0.1, 0.5, 0.1, 0.5, 0.3])).tolist(), [1, 3, 4, 0, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
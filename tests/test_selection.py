@@ -0,0 +1,81 @@
+# Summary Budget Tests (selection.py)
+# Parsing of the budget arguments, the sentence limit of percent and max_sentences, and the greedy selection of the
+# best sentences which fit in max_chars and max_tokens. Run from the repository root:
+#   python -m pytest -q tests
+# Summary Budget Import (Our Another File: selection.py)
+from selection import SentenceRanking, SummaryBudget, word_count
+
+# Other Imports
+import unittest
+
+SENTENCES = ['Short one.', 'A much longer sentence with many words in it.', 'Medium sized sentence.', 'Tiny.']
+TOKENS = [2, 9, 3, 1]
+
+
+def make_ranking(document_order=False):
+    # Sentences ranked 1, 0, 2, 3 (best first).
+    return SentenceRanking(SENTENCES, [1, 0, 2, 3], TOKENS, len(SENTENCES), document_order)
+
+
+class SummaryBudgetTest(unittest.TestCase):
+    def test_from_arguments(self):
+        budget = SummaryBudget.from_arguments({'percent': ' 20 ', 'max_chars': 300})
+        self.assertEqual((budget.percent, budget.max_sentences, budget.max_chars, budget.max_tokens),
+                         (20, None, 300, None))
+        self.assertEqual(budget.key(), '20;c300')
+        self.assertEqual(SummaryBudget.from_arguments({'percent': '020'}).key(), '20')
+        self.assertEqual(SummaryBudget.from_arguments({'max_tokens': 50}).key(), ';t50')
+
+    def test_invalid_values(self):
+        for value in ('0', '-3', 'ten', '2.5', 2.0, True, [20], {'percent': 20}):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                SummaryBudget.from_arguments({'percent': value})
+
+    def test_sentence_limit(self):
+        self.assertEqual(SummaryBudget(percent=20).sentence_limit(50), 10)
+        # A small percent of a short transcript still keeps one sentence.
+        self.assertEqual(SummaryBudget(percent=10).sentence_limit(4), 1)
+        self.assertEqual(SummaryBudget(percent=50, max_sentences=3).sentence_limit(50), 3)
+        self.assertEqual(SummaryBudget(max_sentences=80).sentence_limit(50), 50)
+        self.assertEqual(SummaryBudget(max_chars=10).sentence_limit(50), 50)
+
+
+class SentenceRankingTest(unittest.TestCase):
+    def test_best_sentences_in_ranking_order(self):
+        self.assertEqual(make_ranking().select(SummaryBudget(percent=50)), [SENTENCES[1], SENTENCES[0]])
+        self.assertEqual(make_ranking().select(SummaryBudget(max_sentences=10)), [SENTENCES[i] for i in (1, 0, 2, 3)])
+
+    def test_document_order(self):
+        self.assertEqual(make_ranking(document_order=True).select(SummaryBudget(max_sentences=3)), SENTENCES[:3])
+
+    def test_sentences_over_max_chars_are_skipped(self):
+        # The best sentence (45 characters) does not fit, the next ones do, joined by a space.
+        summary = make_ranking().select(SummaryBudget(max_chars=33))
+        self.assertEqual(summary, ['Short one.', 'Medium sized sentence.'])
+        self.assertLessEqual(len(' '.join(summary)), 33)
+        self.assertEqual(make_ranking().select(SummaryBudget(max_chars=32)), ['Short one.', 'Tiny.'])
+
+    def test_sentences_over_max_tokens_are_skipped(self):
+        self.assertEqual(make_ranking().select(SummaryBudget(max_tokens=5)), ['Short one.', 'Medium sized sentence.'])
+        self.assertEqual(make_ranking().select(SummaryBudget(percent=50, max_tokens=5)),
+                         ['Short one.', 'Medium sized sentence.'])
+
+    def test_nothing_fits(self):
+        self.assertEqual(make_ranking().select(SummaryBudget(max_chars=4)), [])
+
+    def test_dict_round_trip(self):
+        class Document:
+            sentences = SENTENCES
+
+        data = SentenceRanking(SENTENCES, [1, 0, 2, 3], TOKENS, 4, False, own_sentences=False).to_dict()
+        self.assertIsNone(data['sentences'])
+        ranking = SentenceRanking.from_dict(data, Document())
+        budget = SummaryBudget(max_tokens=5)
+        self.assertEqual(ranking.select(budget), make_ranking().select(budget))
+
+    def test_word_count(self):
+        self.assertEqual(word_count(['Hello', ',', 'world', '...', "n't", '42', '!']), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# Transcript Index Tests (transcript_index.py)
+# Linking summary sentences to the segments (and video times) they are spoken in. Run from the repository root:
+#   python -m pytest -q tests
+# Transcript Index Import (Our Another File: transcript_index.py)
+from transcript_index import TranscriptIndex
+
+# Other Imports
+from types import SimpleNamespace
+import unittest
+
+SEGMENTS = [
+    {'text': 'Welcome to the show. Today we', 'start': 0.0, 'duration': 4.0},
+    {'text': 'talk about cats. Cats sleep a lot.', 'start': 4.0, 'duration': 3.5},
+    {'text': 'Welcome to the show.', 'start': 7.5, 'duration': 2.0},
+    {'text': 'Dr. Smith said hello. Bye now.', 'start': 9.5, 'duration': 3.0},
+]
+TEXT = ' '.join(segment['text'] for segment in SEGMENTS)
+SENTENCES = ['Welcome to the show.', 'Today we talk about cats.', 'Cats sleep a lot.', 'Welcome to the show.',
+             'Dr. Smith said hello.', 'Bye now.']
+
+
+def make_document():
+    # Document with the fields timeline uses (text and sentences) and the index built from SEGMENTS.
+    index = TranscriptIndex.build(SEGMENTS, TEXT, SENTENCES)
+    return SimpleNamespace(text=TEXT, sentences=SENTENCES, index=index)
+
+
+class TimelineTest(unittest.TestCase):
+    def setUp(self):
+        self.document = make_document()
+
+    def timeline(self, summary_sentences):
+        return self.document.index.timeline(self.document, summary_sentences)
+
+    def test_sentences_in_spoken_order_with_segment_start(self):
+        self.assertEqual(self.timeline(['Bye now.', 'Today we talk about cats.', 'Cats sleep a lot.']), [
+            {'index': 1, 'text': 'Today we talk about cats.', 'start': 0.0},
+            {'index': 2, 'text': 'Cats sleep a lot.', 'start': 4.0},
+            {'index': 5, 'text': 'Bye now.', 'start': 9.5},
+        ])
+
+    def test_repeated_sentence_uses_each_occurrence_once(self):
+        timeline = self.timeline(['Welcome to the show.', 'Welcome to the show.'])
+        self.assertEqual([(item['index'], item['start']) for item in timeline], [(0, 0.0), (3, 7.5)])
+
+    def test_sentences_split_differently(self):
+        # "Dr." split from its sentence, and two sentences merged in one.
+        timeline = self.timeline(['Dr.', 'Cats sleep a lot. Welcome to the show.'])
+        self.assertEqual(timeline, [
+            {'index': None, 'text': 'Cats sleep a lot. Welcome to the show.', 'start': 4.0},
+            {'index': None, 'text': 'Dr.', 'start': 9.5},
+        ])
+
+    def test_sentence_not_in_the_transcript(self):
+        timeline = self.timeline(['Not said at all.', 'Bye now.'])
+        self.assertEqual(timeline, [
+            {'index': 5, 'text': 'Bye now.', 'start': 9.5},
+            {'index': None, 'text': 'Not said at all.', 'start': None},
+        ])
+
+    def test_segment_at(self):
+        index = self.document.index
+        self.assertEqual([index.segment_at(TEXT.index(text)) for text in ('Today', 'talk', 'Dr.', 'Bye')], [0, 1, 3, 3])
+
+    def test_dict_round_trip(self):
+        index = TranscriptIndex.from_dict(self.document.index.to_dict())
+        self.assertEqual(list(index.sentence_offsets), list(self.document.index.sentence_offsets))
+        self.assertEqual(list(index.segment_starts), [0.0, 4.0, 7.5, 9.5])
+        self.assertEqual(index.timeline(self.document, ['Bye now.']), self.timeline(['Bye now.']))
+
+
+if __name__ == '__main__':
+    unittest.main()
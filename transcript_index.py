@@ -0,0 +1,129 @@
+# Transcript Index (Used by document.py and app.py)
+# The summarizers work on the transcript segments joined into one text, which loses their timestamps. The index keeps
+# them: where every segment starts in the text and in the video, where every sentence starts in the text and in which
+# segment, and the sentences in sorted order. Everything is held in typed arrays (a few bytes per segment or sentence)
+# and stored with the cached document, so linking the summary sentences of any summarizer to video positions only
+# takes a few binary searches per request.
+
+# Other Imports
+from array import array
+from bisect import bisect_right
+import base64
+
+# Array type codes of the fields: character offsets and sentence indices ('i'), seconds ('d').
+FIELDS = {
+    'segment_offsets': 'i',
+    'segment_starts': 'd',
+    'segment_durations': 'd',
+    'sentence_offsets': 'i',
+    'sentence_segments': 'i',
+    'sentence_order': 'i',
+}
+
+
+class TranscriptIndex:
+    def __init__(self, segment_offsets, segment_starts, segment_durations, sentence_offsets, sentence_segments,
+                 sentence_order):
+        # Character offset, start and duration (seconds) of every segment.
+        self.segment_offsets = segment_offsets
+        self.segment_starts = segment_starts
+        self.segment_durations = segment_durations
+        # Character offset of every sentence, and the segment it starts in.
+        self.sentence_offsets = sentence_offsets
+        self.sentence_segments = sentence_segments
+        # Sentence indices ordered by sentence text (equal texts in document order), for binary search by text.
+        self.sentence_order = sentence_order
+
+    @classmethod
+    def build(cls, segments, text, sentences):
+        # segments: transcript as returned by YouTubeTranscriptApi.get_transcript; text: their texts joined by one
+        # character (as app.py formats them); sentences: sentence tokenization of text, in order.
+        segment_offsets = array('i')
+        position = 0
+        for segment in segments:
+            segment_offsets.append(position)
+            position += len(segment['text']) + 1
+        segment_starts = array('d', (float(segment['start']) for segment in segments))
+        segment_durations = array('d', (float(segment.get('duration', 0)) for segment in segments))
+
+        # Sentences are substrings of the text, in order: finding each one after the previous one.
+        sentence_offsets = array('i')
+        position = 0
+        for sentence in sentences:
+            position = max(text.find(sentence, position), position)
+            sentence_offsets.append(position)
+            position += len(sentence)
+        sentence_segments = array('i', (max(bisect_right(segment_offsets, offset) - 1, 0)
+                                        for offset in sentence_offsets))
+        sentence_order = array('i', sorted(range(len(sentences)), key=sentences.__getitem__))
+        return cls(segment_offsets, segment_starts, segment_durations, sentence_offsets, sentence_segments,
+                   sentence_order)
+
+    def segment_at(self, offset):
+        # Index of the segment holding the character at offset of the text.
+        return max(bisect_right(self.segment_offsets, offset) - 1, 0)
+
+    def _lower_bound(self, sentences, sentence):
+        # First position in sentence_order of a sentence text not less than sentence (binary search on the texts).
+        order = self.sentence_order
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if sentences[order[middle]] < sentence:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _first_unused(self, sentences, position, matches, used):
+        # Index of the first sentence from position of sentence_order on which matches and is not in used, or None.
+        order = self.sentence_order
+        while position < len(order) and matches(sentences[order[position]]):
+            if order[position] not in used:
+                return order[position]
+            position += 1
+        return None
+
+    def _find_split(self, sentences, sentence, used):
+        # Index of the document sentence at which a sentence split differently (gensim splits sentences on its own)
+        # begins: a document sentence starting with it (the summarizer split that one in more sentences), else the
+        # document sentence it starts with (the summarizer merged that one with the next ones). None if neither.
+        position = self._lower_bound(sentences, sentence)
+        index = self._first_unused(sentences, position, lambda text: text.startswith(sentence), used)
+        if index is None and position > 0:
+            previous = sentences[self.sentence_order[position - 1]]
+            if previous and sentence.startswith(previous):
+                index = self._first_unused(sentences, self._lower_bound(sentences, previous),
+                                           lambda text: text == previous, used)
+        return index
+
+    def timeline(self, document, summary_sentences):
+        # Summary sentences in the order they are spoken: [{'index', 'text', 'start'}], where index is the position of
+        # the sentence in the document and start the time (seconds) of the segment it begins in. A sentence split
+        # differently from the document's is linked to the document sentence it begins with (its index stays None);
+        # when there is none, its start is None and it is listed last.
+        used = set()
+        items = []
+        for sentence in summary_sentences:
+            # Repeated sentence: taking the first occurrence not used yet.
+            index = self._first_unused(document.sentences, self._lower_bound(document.sentences, sentence),
+                                       lambda text: text == sentence, used)
+            position = index
+            if position is None:
+                position = self._find_split(document.sentences, sentence, used)
+
+            if position is None:
+                items.append((len(document.text), {'index': None, 'text': sentence, 'start': None}))
+                continue
+            used.add(position)
+            start = self.segment_starts[self.sentence_segments[position]] if self.segment_starts else 0.0
+            items.append((self.sentence_offsets[position], {'index': index, 'text': sentence, 'start': start}))
+        return [item for _, item in sorted(items, key=lambda pair: pair[0])]
+
+    def to_dict(self):
+        # Arrays as base64 strings of their bytes: compact, and JSON serializable for the disk cache.
+        return {name: base64.b64encode(getattr(self, name).tobytes()).decode('ascii') for name in FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: array(typecode, base64.b64decode(data[name])) for name, typecode in FIELDS.items()})
@@ -0,0 +1,134 @@
+# Summarizer Process Pool (Used by app.py)
+# Summarizer Import (Our Another File: summarizer.py)
+from summarizer import RANKERS, SUMMARIZERS, SummarizerRegistry
+
+# Preprocessed Document Import (Our Another File: document.py)
+from document import TranscriptDocument
+
+# Other Imports
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import threading
+import time
+
+# Registry of the current worker process, created once by the pool initializer.
+_worker_registry = None
+
+
+def _initialize_worker(registry_options, preload):
+    # Runs once in every worker process: each process builds its own registry (spaCy model, sumy summarizers, ...).
+    global _worker_registry
+    _worker_registry = SummarizerRegistry(**registry_options)
+    if preload:
+        _worker_registry.warm_up()
+
+
+def _run_ranker(choice, document_data):
+    # Runs in a worker process: returns the sentence ranking of one algorithm (as a dict, see selection.py) and the
+    # time it took.
+    start_time = time.perf_counter()
+    document = TranscriptDocument.from_dict(document_data)
+    ranking = RANKERS[choice](document.text, _worker_registry, document)
+    return ranking.to_dict(), time.perf_counter() - start_time
+
+
+class SummarizerTimeout(Exception):
+    # Raised in place of a result when an algorithm did not finish within its time limit.
+    pass
+
+
+class SummarizerPool:
+    # Runs several summarizers on one document in parallel worker processes. The CPU heavy algorithms (LSA SVD,
+    # TextRank, spaCy parsing) hold the GIL, so threads would run them one after another.
+    # The process pool is created on first use and re-created if a worker process dies.
+    def __init__(self, max_workers=None, registry_options=None, preload=False, start_method='spawn'):
+        self.max_workers = max_workers or min(len(SUMMARIZERS), multiprocessing.cpu_count())
+        # Keyword arguments of the SummarizerRegistry built in every worker process.
+        self.registry_options = registry_options or {}
+        self.preload = preload
+        self.start_method = start_method
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context(self.start_method),
+                                                     initializer=_initialize_worker,
+                                                     initargs=(self.registry_options, self.preload))
+            return self._executor
+
+    def _reset_executor(self, executor, terminate=False):
+        # Dropping a broken pool, the next call creates a new one. With terminate, its worker processes are stopped as
+        # well, for tasks which can not be cancelled any more.
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        processes = list((getattr(executor, '_processes', None) or {}).values()) if terminate else []
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def run_many(self, choices, document, timeout):
+        # Ranks the sentences of document with every algorithm in choices. Returns {choice: (ranking, seconds)}, where
+        # ranking is a SentenceRanking dict or, for a failed algorithm, its exception. Every algorithm gets timeout
+        # seconds from the moment it is submitted; slow ones are reported as SummarizerTimeout without holding back the
+        # others.
+        document_data = document.to_dict()
+        submitted_at = time.perf_counter()
+        deadline = submitted_at + timeout
+        results = self._run_attempt(choices, document_data, submitted_at, deadline, timeout)
+
+        # Algorithms which failed only because the pool was replaced under them (another request's algorithm ran past
+        # its deadline, or a worker process died) run once more in the new pool, within the same deadline.
+        retried = [choice for choice in choices if isinstance(results[choice][0], BrokenProcessPool)]
+        if retried and time.perf_counter() < deadline:
+            results.update(self._run_attempt(retried, document_data, submitted_at, deadline, timeout))
+
+        # Returning results in the requested order
+        return {choice: results[choice] for choice in choices}
+
+    def _run_attempt(self, choices, document_data, submitted_at, deadline, timeout):
+        # Submits the algorithms of choices to the pool, waits for them until deadline: {choice: (ranking, seconds)}.
+        executor = self._get_executor()
+        try:
+            futures = {executor.submit(_run_ranker, choice, document_data): choice for choice in choices}
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise
+
+        results = {}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(deadline - time.perf_counter(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                try:
+                    results[futures[future]] = future.result()
+                except BrokenProcessPool as error:
+                    self._reset_executor(executor)
+                    results[futures[future]] = (error, time.perf_counter() - submitted_at)
+                except Exception as error:
+                    results[futures[future]] = (error, time.perf_counter() - submitted_at)
+
+        # Algorithms still running (or waiting for a free worker) after the deadline. A running one can not be
+        # cancelled and would keep its worker busy, making the next requests time out as well: the pool is replaced
+        # and its processes are terminated. Algorithms of other requests running in it at that moment fail with
+        # BrokenProcessPool, and are run again by their own run_many.
+        running = False
+        for future in pending:
+            running = not future.cancel() or running
+            results[futures[future]] = (SummarizerTimeout('Timed out after {} seconds.'.format(timeout)), timeout)
+        if running:
+            self._reset_executor(executor, terminate=True)
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)